@@ -0,0 +1,77 @@
+"""
+冷启动耗时测试：测量从启动进程到服务器响应第一个请求的时间。
+
+用法:
+    python benchmarks/cold_start.py                       # 测试 python web/app.py
+    python benchmarks/cold_start.py dist/MCC_Tool.exe     # 测试打包后的可执行文件
+    python benchmarks/cold_start.py --runs 10 --port 5123
+"""
+import os
+import sys
+import time
+import socket
+import tempfile
+import argparse
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_once(command, port, timeout, workdir):
+    """启动一次服务器并返回首个请求成功响应的耗时 (秒)。"""
+    env = dict(os.environ, MCC_PORT=str(port), MCC_NO_BROWSER="1")
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"服务器进程提前退出 (返回码 {proc.returncode})")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.01)
+        raise TimeoutError(f"{timeout} 秒内服务器未响应")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description="测量 MCC Tool 的冷启动耗时")
+    parser.add_argument("executable", nargs="?", help="打包后的可执行文件 (默认运行 web/app.py)")
+    parser.add_argument("--runs", type=int, default=5, help="重复次数")
+    parser.add_argument("--port", type=int, default=0, help="监听端口 (默认自动选择)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单次启动的超时时间 (秒)")
+    args = parser.parse_args()
+
+    if args.executable:
+        command = [os.path.abspath(args.executable)]
+    else:
+        command = [sys.executable, os.path.join(ROOT, "web", "app.py")]
+
+    timings = []
+    # 服务器会在工作目录下创建临时上传/输出目录，使用独立的临时目录避免污染仓库
+    with tempfile.TemporaryDirectory() as workdir:
+        for i in range(args.runs):
+            elapsed = measure_once(command, args.port or free_port(), args.timeout, workdir)
+            timings.append(elapsed)
+            print(f"第 {i + 1} 次: {elapsed * 1000:.0f} ms")
+
+    print(f"最短 {min(timings) * 1000:.0f} ms, 中位数 {statistics.median(timings) * 1000:.0f} ms, "
+          f"最长 {max(timings) * 1000:.0f} ms ({len(timings)} 次)")
+
+if __name__ == '__main__':
+    main()
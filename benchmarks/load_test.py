@@ -0,0 +1,335 @@
+"""
+负载测试：启动本地服务器，用生成的不同大小的物品包并发请求 /api/analyze、/api/convert 和 /api/download，
+报告每个接口的吞吐量和 p50/p95/p99 延迟，以及服务器进程 (含转换工作进程) 的峰值内存和临时目录的峰值磁盘占用。
+
+每个并发用户循环执行完整的流程: 上传并分析 -> 转换 (使用分析返回的 session_id) -> 下载转换结果。
+每种物品包大小使用新启动的服务器和新的临时目录，结果互不影响。
+
+用法:
+    python benchmarks/load_test.py                                # 默认 50,500,2000 个物品, 并发 4
+    python benchmarks/load_test.py --sizes 100,1000 --concurrency 8 --flows 40
+    python benchmarks/load_test.py --server async --form parallel=1 --json result.json
+"""
+import io
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import zlib
+import socket
+import struct
+import zipfile
+import tempfile
+import argparse
+import threading
+import subprocess
+import urllib.parse
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ENDPOINTS = ("analyze", "convert", "download")
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def png(width, height):
+    """生成全透明的 RGBA PNG。"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+    raw = b"".join(b"\x00" + b"\x00\x00\x00\x00" * width for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+def generate_pack(item_count, namespace="loadtest"):
+    """
+    生成包含 item_count 个物品的 ItemsAdder 物品包 (zip 字节)。
+    物品依次为: 自动生成模型的普通物品、使用自定义模型的物品和家具，每个物品有自己的纹理。
+    """
+    import yaml
+    base = f"ItemsAdder/contents/{namespace}"
+    assets = f"{base}/resourcepack/assets/{namespace}"
+    texture = png(16, 16)
+    items = {}
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(item_count):
+            name = f"item_{i}"
+            kind = i % 3
+            if kind == 0:
+                items[name] = {"display_name": f"Item {i}", "resource": {
+                    "material": "PAPER", "generate": True, "textures": [f"item/{name}.png"]
+                }}
+                zf.writestr(f"{assets}/textures/item/{name}.png", texture)
+                continue
+            model = {
+                "textures": {"0": f"{namespace}:block/{name}", "particle": f"{namespace}:block/{name}"},
+                "elements": [{"from": [0, 0, 0], "to": [16, 16, 16], "faces": {
+                    face: {"uv": [0, 0, 16, 16], "texture": "#0"} for face in ("north", "south", "east", "west", "up", "down")
+                }}]
+            }
+            zf.writestr(f"{assets}/models/block/{name}.json", json.dumps(model))
+            zf.writestr(f"{assets}/textures/block/{name}.png", texture)
+            items[name] = {"display_name": f"Item {i}", "resource": {"material": "PAPER", "model_path": f"block/{name}"}}
+            if kind == 2:
+                items[name]["behaviours"] = {"furniture": {"solid": True, "hitbox": {"width": 1, "height": 1, "length": 1}}}
+        zf.writestr(f"{base}/configs/items.yml", yaml.safe_dump(
+            {"info": {"namespace": namespace}, "items": items}, sort_keys=False
+        ))
+    return buf.getvalue()
+
+def encode_multipart(fields, files=()):
+    """编码 multipart/form-data 请求体。:param files: [(字段名, 文件名, 内容)]"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    for name, filename, content in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/zip\r\n\r\n'.encode("utf-8") + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+class ResourceSampler(threading.Thread):
+    """
+    定期采样服务器进程树 (服务器及其转换工作进程) 的常驻内存和工作目录的磁盘占用，记录峰值。
+    内存从 /proc 读取，只在 Linux 上可用，其他平台只记录磁盘占用。
+    """
+
+    def __init__(self, pid, workdir, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.workdir = workdir
+        self.interval = interval
+        self.peak_rss = None
+        self.peak_disk = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = self._tree_rss()
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss or 0, rss)
+            self.peak_disk = max(self.peak_disk, self._disk_usage())
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def _tree_rss(self):
+        if not os.path.isdir("/proc"):
+            return None
+        parents = {}
+        for name in os.listdir("/proc"):
+            if not name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{name}/stat", "rb") as f:
+                    # 进程名可能包含空格和括号，父进程号位于最后一个 ")" 之后的第二个字段
+                    parents[int(name)] = int(f.read().rsplit(b")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+        tree = {self.pid}
+        changed = True
+        while changed:
+            changed = False
+            for pid, ppid in parents.items():
+                if ppid in tree and pid not in tree:
+                    tree.add(pid)
+                    changed = True
+        total = 0
+        for pid in tree:
+            try:
+                with open(f"/proc/{pid}/status", "r") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            total += int(line.split()[1]) * 1024
+                            break
+            except (OSError, ValueError):
+                continue
+        return total
+
+    def _disk_usage(self):
+        total = 0
+        for root, _, files in os.walk(self.workdir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+        return total
+
+class LoadClient:
+    """执行 分析 -> 转换 -> 下载 流程并记录每个请求的延迟 (秒) 和失败。"""
+
+    def __init__(self, base_url, pack, form, timeout):
+        self.base_url = base_url
+        self.pack = pack
+        self.form = form
+        self.timeout = timeout
+        self.latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        self.errors = {endpoint: {} for endpoint in ENDPOINTS}
+        self._lock = threading.Lock()
+
+    def _request(self, endpoint, path, body=None, content_type=None):
+        """发送请求并读取完整的响应。:return: 成功时返回响应内容，失败时返回 None"""
+        request = urllib.request.Request(self.base_url + path, data=body, method="POST" if body is not None else "GET")
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+                data = resp.read()
+            error = None
+        except urllib.error.HTTPError as e:
+            data, error = None, str(e.code)
+        except (urllib.error.URLError, ConnectionError, socket.timeout) as e:
+            data, error = None, type(e).__name__
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if error is None:
+                self.latencies[endpoint].append(elapsed)
+            else:
+                self.errors[endpoint][error] = self.errors[endpoint].get(error, 0) + 1
+        return data
+
+    def flow(self, _=None):
+        body, content_type = encode_multipart({}, [("file", "loadtest.zip", self.pack)])
+        data = self._request("analyze", "/api/analyze", body, content_type)
+        if data is None:
+            return
+        session_id = json.loads(data)["session_id"]
+
+        body, content_type = encode_multipart({"session_id": session_id, "target_format": "CraftEngine", **self.form})
+        data = self._request("convert", "/api/convert", body, content_type)
+        if data is None:
+            return
+        download_url = json.loads(data)["download_url"]
+        self._request("download", urllib.parse.quote(download_url))
+
+def percentile(values, fraction):
+    """最近秩法计算百分位数。"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def start_server(command, port, workdir, timeout):
+    env = dict(os.environ, MCC_PORT=str(port), MCC_NO_BROWSER="1")
+    proc = subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"服务器进程提前退出 (返回码 {proc.returncode})")
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return proc
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.05)
+    proc.kill()
+    raise TimeoutError(f"{timeout} 秒内服务器未响应")
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+def run_size(command, item_count, args, form):
+    """用一个新启动的服务器测试一种物品包大小。"""
+    pack = generate_pack(item_count)
+    with tempfile.TemporaryDirectory() as workdir:
+        port = free_port()
+        proc = start_server(command, port, workdir, args.timeout)
+        sampler = ResourceSampler(proc.pid, workdir, args.sample_interval)
+        sampler.start()
+        client = LoadClient(f"http://127.0.0.1:{port}", pack, form, args.timeout)
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                list(executor.map(client.flow, range(args.flows)))
+            elapsed = time.perf_counter() - start
+        finally:
+            sampler.stop()
+            stop_server(proc)
+
+    return {
+        "items": item_count,
+        "pack_bytes": len(pack),
+        "concurrency": args.concurrency,
+        "flows": args.flows,
+        "seconds": elapsed,
+        "peak_rss_bytes": sampler.peak_rss,
+        "peak_disk_bytes": sampler.peak_disk,
+        "endpoints": {
+            endpoint: {
+                "requests": len(client.latencies[endpoint]),
+                "errors": client.errors[endpoint],
+                "throughput": len(client.latencies[endpoint]) / elapsed if elapsed else None,
+                "p50_ms": _ms(percentile(client.latencies[endpoint], 0.50)),
+                "p95_ms": _ms(percentile(client.latencies[endpoint], 0.95)),
+                "p99_ms": _ms(percentile(client.latencies[endpoint], 0.99))
+            } for endpoint in ENDPOINTS
+        }
+    }
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+def _mb(size):
+    return "-" if size is None else f"{size / 1024 / 1024:.1f} MB"
+
+def print_result(result):
+    print(f"\n物品数 {result['items']} (物品包 {_mb(result['pack_bytes'])}), 并发 {result['concurrency']}, "
+          f"{result['flows']} 次流程, 耗时 {result['seconds']:.1f} s")
+    print(f"  {'接口':<10}{'成功':>6}{'失败':>6}{'吞吐 (次/秒)':>14}{'p50 (ms)':>11}{'p95 (ms)':>11}{'p99 (ms)':>11}")
+    for endpoint, stats in result["endpoints"].items():
+        failures = sum(stats["errors"].values())
+        print(f"  {endpoint:<10}{stats['requests']:>6}{failures:>6}{stats['throughput'] or 0:>14.2f}"
+              + "".join(f"{'-' if stats[key] is None else stats[key]:>11}" for key in ("p50_ms", "p95_ms", "p99_ms")))
+        if stats["errors"]:
+            print(f"    失败原因: {', '.join(f'{reason} x{count}' for reason, count in stats['errors'].items())}")
+    print(f"  峰值内存 (服务器及工作进程) {_mb(result['peak_rss_bytes'])}, 峰值临时磁盘占用 {_mb(result['peak_disk_bytes'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="MCC Tool Web 接口负载测试")
+    parser.add_argument("--sizes", default="50,500,2000", help="物品包的物品数，逗号分隔")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发用户数")
+    parser.add_argument("--flows", type=int, default=20, help="每种物品包大小执行的流程 (分析 -> 转换 -> 下载) 总数")
+    parser.add_argument("--server", choices=("flask", "async"), default="flask", help="测试 web/app.py 或 web/async_app.py")
+    parser.add_argument("--form", action="append", default=[], metavar="KEY=VALUE", help="附加的转换参数，可以重复")
+    parser.add_argument("--timeout", type=float, default=300.0, help="单个请求和服务器启动的超时时间 (秒)")
+    parser.add_argument("--sample-interval", type=float, default=0.2, help="内存和磁盘占用的采样间隔 (秒)")
+    parser.add_argument("--json", help="将结果另外保存为 JSON 文件")
+    args = parser.parse_args()
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+        form = dict(item.split("=", 1) for item in args.form)
+    except ValueError:
+        parser.error("--sizes 必须是逗号分隔的整数，--form 必须是 KEY=VALUE")
+
+    script = "async_app.py" if args.server == "async" else "app.py"
+    command = [sys.executable, os.path.join(ROOT, "web", script)]
+    results = []
+    for item_count in sizes:
+        result = run_size(command, item_count, args, form)
+        print_result(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
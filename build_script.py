@@ -1,8 +1,13 @@
 # build.py
 import PyInstaller.__main__
 import os
+import sys
 import shutil
 
+# 使用 --onedir 构建单目录版本：启动时无需先解压到临时目录，启动更快
+# 用法: python build_script.py [--onedir]
+onedir = "--onedir" in sys.argv[1:]
+
 # 清理以前的构建
 if os.path.exists('build'):
     shutil.rmtree('build')
@@ -13,7 +18,7 @@ if os.path.exists('dist'):
 args = [
     'web/app.py',                      # 主脚本
     '--name=MCC_Tool',                 # 可执行文件名称
-    '--onefile',                       # 创建单个可执行文件
+    '--onedir' if onedir else '--onefile', # 单目录 / 单个可执行文件
     '--icon=icon.png',                 # 使用自定义图标
     # '--noconsole',                   # 建议保留控制台以便查看服务器日志和关闭程序
     '--add-data=web/templates;templates', # 包含 HTML 模板
@@ -27,4 +32,7 @@ args = [
 
 print("开始构建过程...")
 PyInstaller.__main__.run(args)
-print("构建完成。可执行文件在 'dist' 文件夹中。")
+if onedir:
+    print("构建完成。可执行文件在 'dist/MCC_Tool' 文件夹中。")
+else:
+    print("构建完成。可执行文件在 'dist' 文件夹中。")
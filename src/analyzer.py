@@ -1,9 +1,17 @@
 import os
-import yaml
+import json
+import time
+from src.textures import texture_info, texture_report
 
 class PackageAnalyzer:
-    def __init__(self, extract_path):
+    def __init__(self, extract_path, manifest=None):
+        """
+        :param manifest: 解压目录的文件清单 (FileManifest) 或压缩包文件系统 (ZipFS)，
+                         提供时从中获取目录结构和读取文件，而不访问文件系统
+        """
         self.extract_path = extract_path
+        self.manifest = manifest
+        self._open = manifest.open if manifest is not None else open
         self.report = {
             "formats": [],          # [IA, CE, NEXO]
             "content_types": set(), # {装饰, 贴图, 装备, 模型}
@@ -18,13 +26,29 @@ class PackageAnalyzer:
                 "model_count": 0
             }
         }
+        self._textures = {}       # 纹理引用 -> TextureInfo (只读取 PNG 头)
+        self._model_files = {}    # 模型引用 -> 模型文件路径
+        self._item_resources = [] # (物品 ID, 命名空间, IA resource 配置)
 
     def analyze(self):
+        for report in self.analyze_iter():
+            pass
+        return report
+
+    def analyze_iter(self, interval=0.2):
+        """
+        逐步分析，边扫描边产出部分结果 (报告快照)。
+        检测到新的格式时立即产出，其余情况每隔 interval 秒产出一次，最后产出完整报告 (即 self.report)。
+        """
+        self._formats_emitted = 0
+        self._last_emit = time.monotonic()
+
         # 1. 扫描文件结构和 YAML 内容
         has_ia_structure = False
         has_ce_structure = False
         
-        for root, dirs, files in os.walk(self.extract_path):
+        walk = self.manifest.walk if self.manifest is not None else os.walk
+        for root, dirs, files in walk(self.extract_path):
             # 0. 基于文件夹名称的启发式检测
             # 检查当前目录名是否具有特定特征
             current_dir_name = os.path.basename(root).lower()
@@ -45,26 +69,133 @@ class PackageAnalyzer:
             if "textures" in dirs or "textures" in root:
                 self.report["content_types"].add("贴图")
                 self.report["details"]["texture_count"] += len([f for f in files if f.endswith(".png")])
+                self._scan_textures(root, files)
                 
             if "models" in dirs or "models" in root:
                 self.report["content_types"].add("模型")
                 self.report["details"]["model_count"] += len([f for f in files if f.endswith(".json")])
+                for file in files:
+                    ref = self._asset_ref(root, file, "models", ".json")
+                    if ref:
+                        self._model_files[ref] = os.path.join(root, file)
 
             if "resourcepack" in dirs:
                 self.report["completeness"]["resource_files"] = True
 
+            if self._should_emit(interval):
+                yield self._snapshot()
+
             for file in files:
                 if file.endswith((".yml", ".yaml")):
                     self._analyze_yaml(os.path.join(root, file))
+                    if self._should_emit(interval):
+                        yield self._snapshot()
 
         # 转换 set 为 list 以便 JSON 序列化
         self.report["content_types"] = list(self.report["content_types"])
+
+        # 纹理内存估算和超出预算的纹理 (只为超出预算的纹理查找使用它们的物品)
+        textures = texture_report(self._textures)
+        if textures["oversized"]:
+            items_by_texture = self._items_by_texture({entry["texture"] for entry in textures["oversized"]})
+            for entry in textures["oversized"]:
+                entry["items"] = sorted(items_by_texture.get(entry["texture"], ()))
+        self.report["textures"] = textures
         
-        return self.report
+        yield self.report
+
+    def _scan_textures(self, root, files):
+        """读取目录中 PNG 文件的尺寸和 .mcmeta 动画帧信息 (不解码像素)。"""
+        for file in files:
+            if not file.endswith(".png"):
+                continue
+            ref = self._asset_ref(root, file, "textures", ".png")
+            if ref is None:
+                continue
+            mcmeta = f"{file}.mcmeta"
+            info = texture_info(
+                os.path.join(root, file),
+                os.path.join(root, mcmeta) if mcmeta in files else None,
+                opener=self._open
+            )
+            if info is not None:
+                self._textures[ref] = info
+
+    def _asset_ref(self, root, file, resource_type, suffix):
+        """assets/<命名空间>/<resource_type>/<路径><suffix> -> "命名空间:路径"，不在该结构中时返回 None。"""
+        if not file.endswith(suffix):
+            return None
+        parts = os.path.relpath(os.path.join(root, file[:-len(suffix)]), self.extract_path).split(os.sep)
+        for i in range(len(parts) - 3, -1, -1):
+            if parts[i] == "assets" and parts[i + 2] == resource_type:
+                return f"{parts[i + 1]}:{'/'.join(parts[i + 3:])}"
+        return None
+
+    def _items_by_texture(self, texture_refs):
+        """
+        查找使用指定纹理的物品: 物品直接引用的纹理 (resource.texture / textures)，
+        以及物品模型 (resource.model_path) 中引用的纹理。
+        :return: {纹理引用: 物品 ID 集合}
+        """
+        def normalize(ref, namespace, default_namespace):
+            if not isinstance(ref, str):
+                return None
+            if ref.endswith(".png"):
+                ref = ref[:-4]
+            return ref if ":" in ref else f"{namespace or default_namespace}:{ref}"
+
+        result = {}
+        model_textures = {}
+        for item_id, namespace, resource in self._item_resources:
+            refs = []
+            textures = resource.get("textures") or resource.get("texture") or []
+            if isinstance(textures, str):
+                textures = [textures]
+            if isinstance(textures, list):
+                refs.extend(normalize(ref, namespace, "minecraft") for ref in textures)
+
+            model_ref = normalize(resource.get("model_path"), namespace, "minecraft")
+            if model_ref in self._model_files:
+                if model_ref not in model_textures:
+                    model_textures[model_ref] = self._read_model_textures(self._model_files[model_ref])
+                # 模型中未写命名空间的纹理属于 minecraft (与游戏的解析规则一致)
+                refs.extend(normalize(ref, None, "minecraft") for ref in model_textures[model_ref])
+
+            for ref in refs:
+                if ref in texture_refs:
+                    result.setdefault(ref, set()).add(item_id)
+        return result
+
+    def _read_model_textures(self, model_file):
+        try:
+            with self._open(model_file, 'r', encoding='utf-8') as f:
+                textures = json.load(f).get("textures", {})
+            return [ref for ref in textures.values() if isinstance(ref, str) and not ref.startswith("#")]
+        except Exception:
+            return []
+
+    def _should_emit(self, interval):
+        """检测到新格式或距上次产出已超过 interval 秒时返回 True。"""
+        now = time.monotonic()
+        if len(self.report["formats"]) != self._formats_emitted or now - self._last_emit >= interval:
+            self._formats_emitted = len(self.report["formats"])
+            self._last_emit = now
+            return True
+        return False
+
+    def _snapshot(self):
+        """当前分析结果的副本 (可以 JSON 序列化)。"""
+        return {
+            "formats": list(self.report["formats"]),
+            "content_types": list(self.report["content_types"]),
+            "completeness": dict(self.report["completeness"]),
+            "details": dict(self.report["details"])
+        }
 
     def _analyze_yaml(self, file_path):
+        import yaml
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with self._open(file_path, 'r', encoding='utf-8') as f:
                 data = yaml.safe_load(f)
                 if not data: return
 
@@ -86,8 +217,12 @@ class PackageAnalyzer:
                         self.report["content_types"].add("装备")
                         if isinstance(data["items"], dict):
                             self.report["details"]["item_count"] += len(data["items"])
+                            namespace = (data.get("info") or {}).get("namespace")
                             # 进一步检测类型
-                            for item in data["items"].values():
+                            for key, item in data["items"].items():
+                                if isinstance(item.get("resource"), dict):
+                                    item_id = f"{namespace}:{key}" if namespace else key
+                                    self._item_resources.append((item_id, namespace, item["resource"]))
                                 if "behaviours" in item:
                                     if "furniture" in item["behaviours"]:
                                         self.report["content_types"].add("装饰")
@@ -1,11 +1,99 @@
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 import os
-import yaml
+
+YAML_FOOTER = "\n#该配置由 MCC Tool 自动生成 \n#MCC Tool由闲鱼店铺：快乐售货铺 提供\n"
+# 并行序列化时，每个分块包含的顶层映射条目数
+YAML_CHUNK_SIZE = 500
+
+_yaml_dumper = None
+
+def _get_yaml_dumper():
+    """返回能够直接序列化 IR 节点的 Dumper (首次使用时创建，yaml 延迟导入)。"""
+    global _yaml_dumper
+    if _yaml_dumper is None:
+        import yaml
+        from .ir import Node
+
+        class IRDumper(yaml.Dumper):
+            pass
+
+        # IR 节点按字段顺序序列化为普通映射
+        IRDumper.add_multi_representer(Node, lambda dumper, node: dumper.represent_dict(node))
+        _yaml_dumper = IRDumper
+    return _yaml_dumper
+
+def dump_yaml(data):
+    """将数据序列化为 YAML 文本 (所有配置文件使用相同的格式)。"""
+    import yaml
+    return yaml.dump(data, Dumper=_get_yaml_dumper(), sort_keys=False, allow_unicode=True, default_flow_style=False)
+
+def _dump_yaml_chunk(key, chunk, continuation):
+    """
+    序列化顶层映射 key 的一个分块。
+    块格式下各条目的输出互不影响，后续分块去掉 "key:" 行后即可直接拼接在前一个分块之后。
+    """
+    text = dump_yaml({key: chunk})
+    return text.split("\n", 1)[1] if continuation else text
+
+def iter_yaml_sections(stream, stream_key="items"):
+    """
+    逐步解析 YAML 文档的顶层映射，每个条目解析完成后立即产出，不会先构建整个文档。
+    stream_key 对应的映射按条目产出 (stream_key, 键, 值)，其余顶层条目整体产出 (None, 键, 值)。
+    每个条目构建完成后即释放其节点，峰值内存只与单个条目的大小相关。
+    空文档或顶层不是映射的文档不产出任何条目。
+    与 yaml.safe_load 不同，重复的键会分别产出 (safe_load 只保留最后一个值)。
+    """
+    import yaml
+    loader = yaml.SafeLoader(stream)
+    try:
+        loader.get_event() # StreamStart
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+        loader.get_event() # DocumentStart
+        if not loader.check_event(yaml.MappingStartEvent):
+            return
+        loader.get_event()
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = loader.construct_document(loader.compose_node(None, None))
+            event = loader.peek_event()
+            # 带锚点的映射可能被后面的别名引用，需要完整构建
+            if key == stream_key and isinstance(event, yaml.MappingStartEvent) and event.anchor is None:
+                loader.get_event()
+                while not loader.check_event(yaml.MappingEndEvent):
+                    item_key = loader.construct_document(loader.compose_node(None, None))
+                    yield stream_key, item_key, loader.construct_document(loader.compose_node(None, None))
+                loader.get_event()
+                continue
+            value = loader.construct_document(loader.compose_node(None, None))
+            if key == stream_key and isinstance(value, Mapping):
+                for item_key, item_value in value.items():
+                    yield stream_key, item_key, item_value
+            else:
+                yield None, key, value
+    finally:
+        loader.dispose()
+
+def _has_shared_nodes(data, seen=None):
+    """检查数据中是否有被多次引用的容器对象 (yaml.dump 会为其生成跨分块的锚点/别名)。"""
+    if seen is None:
+        seen = {} # id -> 对象，保持引用以免 IR 节点临时生成的容器被回收后 id 被复用
+    if isinstance(data, (Mapping, list, tuple)):
+        if id(data) in seen:
+            return True
+        seen[id(data)] = data
+        values = data.values() if isinstance(data, Mapping) else data
+        return any(_has_shared_nodes(value, seen) for value in values)
+    return False
 
 class BaseConverter(ABC):
     def __init__(self):
         self.config = {}
         self.namespace = "converted"
+        # 为 True 时，内容未变化的输出文件不会被重写 (用于监视模式的增量转换)
+        self.skip_unchanged = False
+        # 本次转换产生的所有输出文件 (含迁移的资源)，打包时无需再遍历输出目录
+        self.output_files = set()
 
     @abstractmethod
     def convert(self, data, namespace=None):
@@ -31,17 +119,66 @@ class BaseConverter(ABC):
         :param file_path: 文件路径
         :return: 加载的数据
         """
+        import yaml
         with open(file_path, 'r', encoding='utf-8') as f:
             return yaml.safe_load(f)
 
+    def iter_config(self, file_path, stream_key="items"):
+        """
+        逐条目加载 YAML 配置文件 (见 iter_yaml_sections)，用于无法一次性载入内存的超大配置。
+        :param file_path: 文件路径
+        :param stream_key: 按条目产出的顶层映射
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from iter_yaml_sections(f, stream_key)
+
     def _write_yaml_with_footer(self, data, file_path):
         """
         写入带有页脚注释的 YAML 文件。
         :param data: 要写入的数据
         :param file_path: 文件路径
         """
+        self._write_text(self._dump_yaml(data) + YAML_FOOTER, file_path)
+
+    def _dump_yaml(self, data):
+        """将数据序列化为 YAML 文本 (与写入配置文件使用相同的格式)。"""
+        return dump_yaml(data)
+
+    def _submit_yaml(self, data, executor, chunk_size=YAML_CHUNK_SIZE):
+        """
+        将 YAML 文档的序列化提交到 executor (通常是进程池)，返回按输出顺序排列的 Future 列表。
+        较大的顶层映射按条目拆分为多个任务，按顺序拼接结果后与 _dump_yaml(data) 逐字节相同。
+        数据中存在共享对象时 (需要锚点/别名) 整个文档作为一个任务序列化。
+        """
+        if _has_shared_nodes(data):
+            return [executor.submit(dump_yaml, data)]
+
+        futures = []
+        for key, value in data.items():
+            if isinstance(value, dict) and len(value) > chunk_size:
+                entries = list(value.items())
+                for start in range(0, len(entries), chunk_size):
+                    chunk = dict(entries[start:start + chunk_size])
+                    futures.append(executor.submit(_dump_yaml_chunk, key, chunk, start > 0))
+            else:
+                futures.append(executor.submit(dump_yaml, {key: value}))
+        return futures
+
+    def _write_yaml_futures(self, futures, file_path):
+        """等待 _submit_yaml 提交的任务完成，按顺序拼接并写入带有页脚注释的 YAML 文件。"""
+        self._write_text("".join(future.result() for future in futures) + YAML_FOOTER, file_path)
+
+    def _write_text(self, content, file_path):
+        """
+        写入文本文件。启用 skip_unchanged 时，内容相同的已有文件不会被重写。
+        :return: 是否实际写入了文件
+        """
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        self.output_files.add(file_path)
+        if self.skip_unchanged and os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    return False
         with open(file_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, sort_keys=False, allow_unicode=True, default_flow_style=False)
-            f.write("\n#该配置由 MCC Tool 自动生成 \n")
-            f.write("#MCC Tool由闲鱼店铺：快乐售货铺 提供\n")
+            f.write(content)
+        return True
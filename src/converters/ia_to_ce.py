@@ -1,12 +1,40 @@
 import os
 import json
-from turtle import position
-from .base import BaseConverter
-from src.migrators.ia_to_ce import IAMigrator
+from .base import BaseConverter, YAML_CHUNK_SIZE, iter_yaml_sections
+from .ir import (
+    intern_id, Item, ItemData, Equippable, ItemSettings, EquipmentRef, ModelRef, TemplateModel,
+    FurnitureBehavior, Placement, FurnitureElement, Hitbox, Equipment, Category
+)
+from src.overlay import PathOverlay
+from src.geometry import ModelGeometryIndex
+from src.namespaces import NamespaceMap
+
+# 物品数量低于此值时始终串行转换，避免进程池的启动和序列化开销
+PARALLEL_MIN_ITEMS = 2000
+
+# 分类的说明文字 (所有分类共用)
+CATEGORY_LORE = (
+    "<!i><gray>该配置由 <#FFFF00>MCC TOOL</#FFFF00> 生成",
+    "<!i><gray>闲鱼店铺: <#FFFF00>快乐售货铺</#FFFF00>",
+    "<!i><dark_gray>感谢您的支持！</dark_gray>"
+)
+DEFAULT_CATEGORY_LORE = (
+    "<!i><gray>该配置由 <#FFFF00>MCC TOOL</#FFFF00> 自动生成",
+    "<!i><gray>闲鱼店铺: <#FFFF00>快乐售货铺</#FFFF00>",
+    "<!i><dark_gray>感谢您的支持！</dark_gray>"
+)
+
+def _dump_json_batch(contents):
+    """进程池工作函数：序列化一组生成的模型。"""
+    return [json.dumps(content, indent=4) for content in contents]
 
 class IAConverter(BaseConverter):
-    def __init__(self):
+    def __init__(self, max_workers=None):
+        """
+        :param max_workers: 并行转换的最大进程数 (None 或 1 表示串行转换)
+        """
         super().__init__()
+        self.max_workers = max_workers
         self.ce_config = {
             "items": {},
             "equipments": {},
@@ -15,13 +43,46 @@ class IAConverter(BaseConverter):
         }
         self.ia_resourcepack_root = None
         self.ce_resourcepack_root = None
+        self.fs = PathOverlay() # 读取 IA 配置和资源包使用的路径重映射层
         self.generated_models = {} # 存储需要生成的模型
+        # 为 True 时，迁移资源时排除未被引用的纹理和模型
+        self.prune_unreferenced = False
+        # 为 True 时，只迁移已转换物品的依赖闭包，并按需解析引用 (用于单物品预览)
+        self.closure_only = False
+        self.reference_report = None # 迁移后的引用检查结果 (悬空引用等)
+        self.model_geometry = None # 模型几何索引 (首次使用时创建，见 _get_model_geometry)
+        self.model_budget = None # 模型复杂度预算 (None 使用 DEFAULT_MODEL_BUDGET)
+        self.model_report = None # 迁移后超出复杂度预算的模型
+        self.texture_budget = None # 纹理预算 (None 使用 DEFAULT_TEXTURE_BUDGET)
+        self.texture_report = None # 迁移后的纹理内存估算和超出预算的纹理
+        # 命名空间映射表 (NamespaceMap)，多命名空间物品包按命名空间分组转换时设置。
+        # 未设置时所有非 minecraft 命名空间的引用都指向当前命名空间
+        self.namespace_map = None
+        self._scoped_namespace_map = None
 
-    def set_resource_paths(self, ia_root, ce_root):
+    def load_config(self, file_path):
+        """加载 YAML 配置文件 (通过路径重映射层读取，配置文件可以位于压缩包文件系统中)。"""
+        import yaml
+        with self.fs.open(file_path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
+
+    def iter_config(self, file_path, stream_key="items"):
+        """逐条目加载 YAML 配置文件 (通过路径重映射层读取)。"""
+        with self.fs.open(file_path, 'r', encoding='utf-8') as f:
+            yield from iter_yaml_sections(f, stream_key)
+
+    def set_resource_paths(self, ia_root, ce_root, fs=None):
+        """
+        :param ia_root: IA 资源包根目录 (可以是 fs 中的虚拟路径)
+        :param ce_root: CE 资源包输出目录
+        :param fs: 路径重映射层 (PathOverlay)，默认直接访问真实路径
+        """
         self.ia_resourcepack_root = ia_root
         self.ce_resourcepack_root = ce_root
+        if fs is not None:
+            self.fs = fs
 
-    def save_config(self, output_dir):
+    def save_config(self, output_dir, migrate=True):
         """
         保存转换后的配置到输出目录中的多个文件。
         结构:
@@ -29,6 +90,7 @@ class IAConverter(BaseConverter):
           items.yml       (物品, 模板)
           armor.yml       (物品 - 护甲类型, 装备)
           categories.yml  (分类)
+        :param migrate: 是否同时迁移整个资源包 (增量转换时由调用方自行迁移变化的资源)
         """
         # 如果目录不存在则创建
         os.makedirs(output_dir, exist_ok=True)
@@ -49,48 +111,126 @@ class IAConverter(BaseConverter):
             else:
                 other_items[key] = value
 
-        # 1. 保存 items.yml (其他物品 + 模板)
+        # 1. items.yml (其他物品 + 模板)
         items_data = {}
         if self.ce_config["templates"]:
             items_data["templates"] = self.ce_config["templates"]
         if other_items:
             items_data["items"] = other_items
-            
-        if items_data:
-            self._write_yaml_with_footer(items_data, os.path.join(output_dir, "items.yml"))
 
-        # 2. 保存 armor.yml (护甲物品 + 装备)
+        # 2. armor.yml (护甲物品 + 装备)
         armor_data = {}
         if armor_items:
              armor_data["items"] = armor_items
         if self.ce_config["equipments"]:
              armor_data["equipments"] = self.ce_config["equipments"]
              
-        if armor_data:
-            self._write_yaml_with_footer(armor_data, os.path.join(output_dir, "armor.yml"))
-
-        # 3. 保存 categories.yml (分类)
+        # 3. categories.yml (分类)
+        cat_data = {}
         if self.ce_config["categories"]:
             cat_data = {"categories": self.ce_config["categories"]}
-            self._write_yaml_with_footer(cat_data, os.path.join(output_dir, "categories.yml"))
 
-        # 如果设置了路径，触发资源迁移
+        documents = [
+            (os.path.join(output_dir, "items.yml"), items_data),
+            (os.path.join(output_dir, "armor.yml"), armor_data),
+            (os.path.join(output_dir, "categories.yml"), cat_data)
+        ]
+        documents = [(file_path, data) for file_path, data in documents if data]
+
+        if self._parallel_enabled(len(self.ce_config["items"])):
+            self._save_config_parallel(documents, migrate)
+            return
+
+        for file_path, data in documents:
+            self._write_yaml_with_footer(data, file_path)
+
+        if migrate:
+            self._migrate_resources()
+        self._write_generated_models()
+
+    def _save_config_parallel(self, documents, migrate):
+        """
+        在进程池中序列化配置文件和生成的模型，同时在主进程中迁移资源。
+        序列化结果按固定顺序拼接后写入，文件内容与串行写入逐字节相同；
+        写入顺序 (先迁移资源，再写入生成的模型) 也与串行路径一致。
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = [(file_path, self._submit_yaml(data, executor)) for file_path, data in documents]
+
+            model_futures = []
+            if self.ce_resourcepack_root and self.generated_models:
+                contents = list(self.generated_models.values())
+                model_futures = [
+                    executor.submit(_dump_json_batch, contents[i:i + YAML_CHUNK_SIZE])
+                    for i in range(0, len(contents), YAML_CHUNK_SIZE)
+                ]
+
+            if migrate:
+                self._migrate_resources()
+
+            for file_path, futures in pending:
+                self._write_yaml_futures(futures, file_path)
+
+            if model_futures:
+                texts = [text for future in model_futures for text in future.result()]
+                self._write_generated_models(dict(zip(self.generated_models, texts)))
+
+    def _migrate_resources(self, graph=None):
+        """
+        如果设置了资源路径，执行资源迁移。
+        :param graph: 资源引用图 (默认根据当前 ce_config 构建)
+        """
         if self.ia_resourcepack_root and self.ce_resourcepack_root:
+            # 迁移器只在首次需要时导入，以缩短启动时间
+            from src.migrators.ia_to_ce import IAMigrator
+            from src.migrators.references import ReferenceGraph
+
+            if graph is None:
+                graph = ReferenceGraph()
+                graph.add_ce_config(self.ce_config, self.generated_models, self.namespace)
             migrator = IAMigrator(
                 self.ia_resourcepack_root, 
                 self.ce_resourcepack_root, 
-                self.namespace
+                self.namespace,
+                fs=self.fs
             )
-            migrator.migrate()
-            
-        # 写入生成的模型
+            migrator.skip_unchanged = self.skip_unchanged
+            migrator.prune = self.prune_unreferenced
+            migrator.texture_budget = self.texture_budget
+            migrator.namespace_map = self._namespaces()
+            migrator.migrate(graph, closure_only=self.closure_only)
+            self.output_files.update(migrator.output_files)
+            self.reference_report = migrator.reference_report
+            self.texture_report = migrator.texture_report
+            # 单物品预览只迁移依赖闭包，不检查整个资源包
+            if not self.closure_only:
+                self._check_model_budget()
+
+    def _get_model_geometry(self):
+        if self.model_geometry is None or self.model_geometry.resourcepack_root != self.ia_resourcepack_root:
+            self.model_geometry = ModelGeometryIndex(self.ia_resourcepack_root, self.fs)
+        return self.model_geometry
+
+    def _check_model_budget(self):
+        """检查源资源包中所有模型的复杂度，结果保存在 model_report 中。"""
+        self.model_report = self._get_model_geometry().check_budget(self.model_budget)
+        for entry in self.model_report["over_budget"]:
+            print(f"警告: 模型 {entry['model']} 超出复杂度预算 ({', '.join(entry['exceeded'])}): "
+                  f"{entry['elements']} 个元素, {entry['faces']} 个面, 尺寸 {entry['size']}")
+
+    def _write_generated_models(self, texts=None):
+        """
+        写入生成的模型。
+        :param texts: 已序列化的模型文本 {相对路径: JSON 文本} (默认在此处序列化)
+        """
         if self.ce_resourcepack_root and self.generated_models:
             models_root = os.path.join(self.ce_resourcepack_root, "assets", self.namespace, "models")
             for rel_path, content in self.generated_models.items():
                 full_path = os.path.join(models_root, rel_path)
-                os.makedirs(os.path.dirname(full_path), exist_ok=True)
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    json.dump(content, f, indent=4)
+                text = texts[rel_path] if texts is not None else json.dumps(content, indent=4)
+                self._write_text(text, full_path)
 
     def convert(self, ia_data, namespace=None):
         if namespace:
@@ -120,48 +260,260 @@ class IAConverter(BaseConverter):
 
         return self.ce_config
 
-    def _generate_default_category(self):
+    def convert_stream(self, config_paths, output_dir, source_root=None, namespace=None,
+                       categories_data=None, chunk_size=None):
+        """
+        流式转换模式：逐个源配置文件 (或每 chunk_size 个物品为一组) 转换，
+        并立即写入对应的分片文件，写完即释放，峰值内存只与单个分组的大小相关。
+        源配置文件逐个物品解析 (见 iter_config)，解析出的物品立即转换，不会先载入整个文档。
+        分片文件沿用 IA 源文件的目录结构:
+        output_dir/
+          <源文件相对路径>.yml          (物品, 模板, 装备)
+          <源文件相对路径>_part<N>.yml  (设置了 chunk_size 且物品超出时)
+          categories.yml                (分类)
+        注意: 不同源文件中的同名物品不会像合并模式那样互相覆盖，而是分别写入各自的分片。
+        :param config_paths: IA 物品配置文件路径列表
+        :param output_dir: CE 配置输出目录
+        :param source_root: 计算分片相对路径的源根目录 (默认只使用文件名)
+        :param namespace: 命名空间
+        :param categories_data: 合并后的 IA 分类数据 (可选)
+        :param chunk_size: 每个分片的最大物品数 (None 表示每个源文件一个分片)
+        :return: 已转换的物品 ID 列表
+        """
+        if namespace:
+            self.namespace = namespace
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        # 每个分片的引用都汇总到引用图中，资源在所有分片写完后统一迁移
+        # (迁移时会跳过已由转换器生成的同名模型，结果与 save_config 的顺序一致)
+        from src.migrators.references import ReferenceGraph
+        graph = ReferenceGraph()
+        all_item_ids = []
+        default_icon = None
+        emitted_templates = set()
+
+        # 源配置文件按条目流式解析: 每个物品解析完成后立即转换 (并行模式下按批转换)，
+        # 不会先构建整个文档，超大的单个配置文件也只需要保存当前分片的转换结果
+        batch_limit = PARALLEL_MIN_ITEMS * self.max_workers if self._parallel_enabled(PARALLEL_MIN_ITEMS) else 1
+
+        def close_shard(shard_name):
+            """记录当前分片的物品和引用、写入生成的模型并释放分片，返回 (分片文件路径, 分片数据)。"""
+            nonlocal default_icon
+            for item_id, ce_item in self.ce_config["items"].items():
+                if default_icon is None:
+                    default_icon = self._default_category_icon(item_id, ce_item)
+                all_item_ids.append(item_id)
+
+            shard = (os.path.join(output_dir, f"{shard_name}.yml"), self._shard_data(emitted_templates))
+            self._write_generated_models()
+            graph.add_ce_config(self.ce_config, self.generated_models, self.namespace)
+
+            self.ce_config["items"] = {}
+            self.ce_config["templates"] = {}
+            self.generated_models = {}
+            return shard
+
+        def write_shard(shard):
+            file_path, shard_data = shard
+            if shard_data:
+                self._write_yaml_with_footer(shard_data, file_path)
+
+        for config_path in config_paths:
+            if source_root:
+                rel_name = os.path.splitext(os.path.relpath(config_path, source_root))[0]
+            else:
+                rel_name = os.path.splitext(os.path.basename(config_path))[0]
+
+            size = chunk_size if chunk_size and chunk_size > 0 else None
+            shard_count = 0 # 已结束的分片数
+            shard_items = 0 # 当前分片中的物品数 (含尚未转换的批)
+            # 装备写入第一个分片，而装备可能位于物品之后，因此第一个分片在源文件解析完后才写出
+            first_shard = None
+            batch = {}
+            categories = []
+            loaded = False
+            for section, key, value in self.iter_config(config_path):
+                loaded = True
+                if section == "items":
+                    if size and shard_items == size:
+                        # 当前分片已满且还有后续物品，结束为 _part<N> (只有一个分片时在文件结束后使用 <rel_name>)
+                        self._convert_items(batch)
+                        batch = {}
+                        shard_count += 1
+                        shard = close_shard(f"{rel_name}_part{shard_count}")
+                        if first_shard is None:
+                            first_shard = shard
+                        else:
+                            write_shard(shard)
+                        shard_items = 0
+                    batch[key] = value
+                    shard_items += 1
+                    if len(batch) >= batch_limit:
+                        self._convert_items(batch)
+                        batch = {}
+                elif key == "equipments":
+                    self._convert_equipments(value)
+                elif key == "armors_rendering":
+                    self._convert_armors_rendering(value)
+                elif key == "categories":
+                    categories.append(value)
+            if not loaded:
+                continue
+
+            self._convert_items(batch)
+            shard = close_shard(rel_name if shard_count == 0 else f"{rel_name}_part{shard_count + 1}")
+            if first_shard is None:
+                first_shard = shard
+            else:
+                write_shard(shard)
+            if self.ce_config["equipments"]:
+                first_shard[1]["equipments"] = self.ce_config["equipments"]
+                graph.add_ce_config(self.ce_config)
+                self.ce_config["equipments"] = {}
+            write_shard(first_shard)
+
+            for data in categories:
+                self._convert_categories(data)
+
+        if categories_data:
+            self._convert_categories(categories_data)
+
+        if not self.ce_config["categories"] and all_item_ids:
+            self._generate_default_category(all_item_ids, default_icon)
+
+        if self.ce_config["categories"]:
+            cat_data = {"categories": self.ce_config["categories"]}
+            self._write_yaml_with_footer(cat_data, os.path.join(output_dir, "categories.yml"))
+
+        self._migrate_resources(graph)
+
+        return all_item_ids
+
+    def _shard_data(self, emitted_templates):
+        """
+        当前 ce_config 中的物品和模板组成的分片数据 (装备由调用方加入第一个分片)。
+        已在之前分片中写出的模板不会重复写入。
+        """
+        shard_data = {}
+        templates = {
+            key: value for key, value in self.ce_config["templates"].items()
+            if key not in emitted_templates
+        }
+        if templates:
+            shard_data["templates"] = templates
+            emitted_templates.update(templates)
+        if self.ce_config["items"]:
+            shard_data["items"] = self.ce_config["items"]
+        return shard_data
+
+    def _generate_default_category(self, items_list=None, icon=None):
         """
         当输入未提供分类时，生成一个包含所有物品的默认分类。
+        :param items_list: 物品 ID 列表 (流式模式下传入，默认取当前 ce_config 中的物品)
+        :param icon: 分类图标 (流式模式下传入，默认根据第一个物品推断)
         """
         cat_id = f"{self.namespace}:default"
         
         # 收集所有物品 ID
-        items_list = list(self.ce_config["items"].keys())
+        if items_list is None:
+            items_list = list(self.ce_config["items"].keys())
         
         # 尝试寻找合适的图标 (第一个物品)
-        icon = "minecraft:chest"
-        if items_list:
-            first_item = self.ce_config["items"][items_list[0]]
-            # 如果物品有自定义模型，尝试使用该物品作为图标
-            if "model" in first_item:
-                 icon = items_list[0]
-            else:
-                 icon = first_item.get("material", "minecraft:chest")
-
-        ce_category = {
-            "name": f"<!i>{self.namespace.capitalize()}",
-            "lore": [
-                "<!i><gray>该配置由 <#FFFF00>MCC TOOL</#FFFF00> 自动生成",
-                "<!i><gray>闲鱼店铺: <#FFFF00>快乐售货铺</#FFFF00>",
-                "<!i><dark_gray>感谢您的支持！</dark_gray>"
-            ],
-            "priority": 1,
-            "icon": icon,
-            "list": items_list,
-            "hidden": False
-        }
+        if icon is None:
+            icon = "minecraft:chest"
+            if items_list:
+                icon = self._default_category_icon(items_list[0], self.ce_config["items"][items_list[0]])
+
+        ce_category = Category(
+            name=f"<!i>{self.namespace.capitalize()}",
+            lore_lines=DEFAULT_CATEGORY_LORE,
+            icon=icon,
+            item_ids=items_list,
+            hidden=False
+        )
         
-        self.ce_config["categories"][cat_id] = ce_category
+        self.ce_config["categories"][intern_id(cat_id)] = ce_category
+
+    def _default_category_icon(self, item_id, ce_item):
+        # 如果物品有自定义模型，尝试使用该物品作为图标
+        if "model" in ce_item:
+            return item_id
+        return ce_item.get("material", "minecraft:chest")
+
+    def _parallel_enabled(self, item_count):
+        """是否使用进程池处理 item_count 个物品 (物品较少时进程池的开销大于收益)。"""
+        return bool(self.max_workers and self.max_workers > 1 and item_count >= PARALLEL_MIN_ITEMS)
+
+    @classmethod
+    def convert_item_shard(cls, namespace, ia_resourcepack_root, items_data, fs=None, model_geometry=None, namespace_map=None):
+        """
+        在独立的转换器中转换一组物品，返回 (items, templates, generated_models)。
+        并行转换的进程池和增量转换 (src/watcher.py) 都通过它转换单个分片。
+        :param model_geometry: 已完成分析的模型几何索引 (避免每个进程重复分析)
+        :param namespace_map: 命名空间映射表 (NamespaceMap)
+        """
+        converter = cls()
+        converter.namespace = namespace
+        converter.namespace_map = namespace_map
+        converter.ia_resourcepack_root = ia_resourcepack_root
+        if fs is not None:
+            converter.fs = fs
+        converter.model_geometry = model_geometry
+        converter._convert_items(items_data)
+        return converter.ce_config["items"], converter.ce_config["templates"], converter.generated_models
 
     def _convert_items(self, items_data):
+        if self._parallel_enabled(len(items_data)):
+            self._convert_items_parallel(items_data)
+            return
+
         for item_key, item_data in items_data.items():
             self._convert_item(item_key, item_data)
 
+    def _convert_items_parallel(self, items_data):
+        """
+        将物品按原顺序切分为连续的分片，在进程池中并行转换，
+        再按分片顺序合并 items、templates 和 generated_models。
+        合并顺序与串行转换的插入顺序一致，因此输出与串行路径逐字节相同。
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import repeat
+
+        keys = list(items_data.keys())
+        # 每个进程分配多个分片，以平衡不同物品的转换耗时
+        shard_count = self.max_workers * 4
+        shard_size = max(1, -(-len(keys) // shard_count))
+        shards = [
+            {key: items_data[key] for key in keys[i:i + shard_size]}
+            for i in range(0, len(keys), shard_size)
+        ]
+
+        # 在主进程中一次性分析所有模型，工作进程直接使用结果
+        model_geometry = self._get_model_geometry() if self.ia_resourcepack_root else None
+        if model_geometry is not None:
+            model_geometry.analyze_all()
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(
+                IAConverter.convert_item_shard,
+                repeat(self.namespace),
+                repeat(self.ia_resourcepack_root),
+                shards,
+                repeat(self.fs),
+                repeat(model_geometry),
+                repeat(self.namespace_map)
+            )
+            for items, templates, generated_models in results:
+                self.ce_config["items"].update(items)
+                self.ce_config["templates"].update(templates)
+                self.generated_models.update(generated_models)
+
     def _convert_categories(self, categories_data):
         """
         将 ItemsAdder 分类转换为 CraftEngine 分类
         """
+        namespaces = self._namespaces()
         for cat_key, cat_data in categories_data.items():
             ce_cat_id = f"{self.namespace}:{cat_key}"
             
@@ -170,11 +522,10 @@ class IAConverter(BaseConverter):
             ce_items = []
             for item in ia_items:
                 if ":" in item:
-                    # 如果包含了命名空间，则尝试替换为当前命名空间
+                    # 如果包含了命名空间，则替换为映射后的目标命名空间
                     parts = item.split(":")
                     if len(parts) == 2:
-                        # 强制替换命名空间为当前目标命名空间
-                        ce_items.append(f"{self.namespace}:{parts[1]}")
+                        ce_items.append(f"{namespaces.target(parts[0])}:{parts[1]}")
                     else:
                          ce_items.append(item)
                 else:
@@ -184,46 +535,39 @@ class IAConverter(BaseConverter):
             icon = cat_data.get("icon", "minecraft:stone")
             if ":" in icon:
                  parts = icon.split(":")
-                 if len(parts) == 2 and parts[0] != "minecraft":
-                      icon = f"{self.namespace}:{parts[1]}"
+                 if len(parts) == 2:
+                      icon = f"{namespaces.target(parts[0])}:{parts[1]}"
             else:
                  icon = f"{self.namespace}:{icon}"
 
-            ce_category = {
-                "name": f"<!i>{cat_data.get('name', cat_key)}",
-                "lore": [
-                    "<!i><gray>该配置由 <#FFFF00>MCC TOOL</#FFFF00> 生成",
-                    "<!i><gray>闲鱼店铺: <#FFFF00>快乐售货铺</#FFFF00>",
-                    "<!i><dark_gray>感谢您的支持！</dark_gray>"
-                ],
-                "priority": 1, # 默认值
-                "icon": icon,
-                "list": ce_items,
-                "hidden": not cat_data.get("enabled", True)
-            }
+            ce_category = Category(
+                name=f"<!i>{cat_data.get('name', cat_key)}",
+                lore_lines=CATEGORY_LORE,
+                icon=icon,
+                item_ids=ce_items,
+                hidden=not cat_data.get("enabled", True)
+            )
             
-            self.ce_config["categories"][ce_cat_id] = ce_category
+            self.ce_config["categories"][intern_id(ce_cat_id)] = ce_category
 
     def _convert_item(self, key, data):
-        ce_id = f"{self.namespace}:{key}"
+        ce_id = intern_id(f"{self.namespace}:{key}")
         
         resource = data.get("resource", {})
         material = resource.get("material", "STONE")
         display_name = data.get("display_name", key)
         
-        ce_item = {
-            "material": material,
-            "data": {
-                "item-name": self._format_display_name(display_name, data)
-            }
-        }
+        ce_item = Item(
+            material=material,
+            data=ItemData(item_name=self._format_display_name(display_name, data))
+        )
 
         # 根据材质或行为处理特定类型
         behaviours = data.get("behaviours", {})
         
         # 优先处理 Hat 或 带有 equipment 但无 ID 的物品 (视为简单装备/帽子)
         if behaviours.get("hat") or ("equipment" in data and "id" not in data["equipment"]):
-             ce_item["data"]["equippable"] = {"slot": "head"}
+             ce_item.data.equippable = Equippable("head")
              self._handle_generic_model(ce_item, resource)
         elif self._is_armor(material, data):
             self._handle_armor(ce_item, data)
@@ -265,30 +609,27 @@ class IAConverter(BaseConverter):
                 slot = armor_props["slot"]
 
         # 如果需要，从材质推断槽位 (尽管 specific_properties 通常会设置它)
-        material = ce_item["material"]
+        material = ce_item.material
         if material.endswith("_CHESTPLATE"): slot = "chest"
         elif material.endswith("_LEGGINGS"): slot = "legs"
         elif material.endswith("_BOOTS"): slot = "feet"
         
         if equipment_id:
             # 如果材质是默认的 STONE，更新材质以确保其可穿戴
-            if ce_item["material"] == "STONE":
-                if slot == "head": ce_item["material"] = "LEATHER_HELMET"
-                elif slot == "chest": ce_item["material"] = "LEATHER_CHESTPLATE"
-                elif slot == "legs": ce_item["material"] = "LEATHER_LEGGINGS"
-                elif slot == "feet": ce_item["material"] = "LEATHER_BOOTS"
+            if ce_item.material == "STONE":
+                if slot == "head": ce_item.material = "LEATHER_HELMET"
+                elif slot == "chest": ce_item.material = "LEATHER_CHESTPLATE"
+                elif slot == "legs": ce_item.material = "LEATHER_LEGGINGS"
+                elif slot == "feet": ce_item.material = "LEATHER_BOOTS"
             
             # 处理 ID 中可能存在的命名空间
             # 形式: namespace:id -> 移除 namespace 部分
             if ":" in equipment_id:
                  equipment_id = equipment_id.split(":")[1]
 
-            ce_item["settings"] = {
-                "equipment": {
-                    "asset-id": f"{self.namespace}:{equipment_id}",
-                    "slot": slot
-                }
-            }
+            ce_item.settings = ItemSettings(
+                EquipmentRef(asset_id=f"{self.namespace}:{equipment_id}", slot=slot)
+            )
         
         # 如果存在则添加模型
         self._handle_generic_model(ce_item, ia_data.get("resource", {}))
@@ -298,31 +639,16 @@ class IAConverter(BaseConverter):
         sit_data = ia_data.get("behaviours", {}).get("furniture_sit")
         entity_type = furniture_data.get("entity", "armor_stand")
         
-        # 通过JSON模型计算Y轴偏移量
+        # 通过模型的几何信息计算Y轴偏移量和默认碰撞箱尺寸
         model_path = ia_data.get("resource", {}).get("model_path")
-        translation_y = self._calculate_model_y_translation(model_path)
+        geometry = self._model_geometry_for(model_path)
+        translation_y = self._calculate_model_y_translation(geometry)
         
-        ce_item["behavior"] = {
-            "type": "furniture_item",
-            "furniture": {
-                "settings": {
-                    "item": ce_id,
-                    "sounds": {
-                        "break": "minecraft:block.stone.break",
-                        "place": "minecraft:block.stone.place"
-                    }
-                },
-                "loot": {
-                    "template": "default:loot_table/furniture",
-                    "arguments": {
-                        "item": ce_id
-                    }
-                }
-            }
-        }
+        # 设置和掉落物部分由 FurnitureBehavior 根据物品 ID 生成
+        ce_item.behavior = FurnitureBehavior(ce_id)
         
         # 处理放置规则 (Placement)
-        placement = {}
+        placement = ce_item.behavior.placement
         placeable_on = furniture_data.get("placeable_on", {})
         
         # 如果未指定，默认为地面
@@ -330,66 +656,50 @@ class IAConverter(BaseConverter):
             placeable_on = {"floor": True}
 
         if placeable_on.get("floor"):
-            placement["ground"] = self._create_placement_block(ce_id, furniture_data, "ground", sit_data, entity_type, translation_y)
+            placement["ground"] = self._create_placement_block(ce_id, furniture_data, "ground", sit_data, entity_type, translation_y, geometry)
         if placeable_on.get("walls"):
-            placement["wall"] = self._create_placement_block(ce_id, furniture_data, "wall", sit_data, entity_type, translation_y)
+            placement["wall"] = self._create_placement_block(ce_id, furniture_data, "wall", sit_data, entity_type, translation_y, geometry)
         if placeable_on.get("ceiling"):
-            placement["ceiling"] = self._create_placement_block(ce_id, furniture_data, "ceiling", sit_data, entity_type, translation_y)
-            
-        ce_item["behavior"]["furniture"]["placement"] = placement
+            placement["ceiling"] = self._create_placement_block(ce_id, furniture_data, "ceiling", sit_data, entity_type, translation_y, geometry)
 
         self._handle_generic_model(ce_item, ia_data.get("resource", {}))
 
-    def _calculate_model_y_translation(self, model_path):
+    def _model_geometry_for(self, model_path):
+        """获取 IA 模型路径对应模型的几何信息 (ModelGeometry)，模型不存在时返回 None。"""
+        if not model_path or not self.ia_resourcepack_root:
+            return None
+        if ":" in model_path:
+            model_id = model_path
+        else:
+            model_id = f"{self.namespace}:{model_path}"
+        return self._get_model_geometry().get(model_id)
+
+    def _calculate_model_y_translation(self, geometry):
         """
-        根据模型元素的 Y 轴坐标计算 Y 轴偏移。
+        根据模型包围盒 (已应用元素旋转) 的最低点计算 Y 轴偏移。
         默认 = 0.5
-        如果有负数 Y 坐标且小于 -2.0 -> += 1 (即 1.5)
-        如果是正数或微小负数 -> 0.5
+        如果最低点小于 -2.0 -> += 1 (即 1.5)
+        如果是正数或微小负数 (防止误差) -> 0.5
         """
-        if not model_path or not self.ia_resourcepack_root:
-            return 0.5
-            
-        target_namespace = self.namespace
-        clean_path = model_path
-        if ":" in model_path:
-            parts = model_path.split(":")
-            target_namespace = parts[0]
-            clean_path = parts[1]
-            
-        full_path = os.path.join(self.ia_resourcepack_root, "assets", target_namespace, "models", f"{clean_path}.json")
-        print(f"Full path: {full_path}")
-        if not os.path.exists(full_path):
-            return 0.5
-            
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                model_data = json.load(f)
-                
-            elements = model_data.get("elements", [])
-            has_negative = False
-            for el in elements:
-                # 检查 from/to Y 坐标是否小于 -2.0 (索引 1)
-                from_y = el.get("from", [0,0,0])[1]
-                to_y = el.get("to", [0,0,0])[1]
-                
-                # 如果 Y 坐标小于 -2.0，认为模型有负数 Y 坐标，防止误差
-                if from_y < -2.0 or to_y < -2.0:
-                    has_negative = True
-                    break
-            
-            if has_negative:
-                return 1.5
-            else:
-                return 0.5
-                
-        except Exception as e:
-            print(f"Error reading model {full_path}: {e}")
-            return 0.5
+        if geometry is not None and geometry.min[1] < -2.0:
+            return 1.5
+        return 0.5
 
-    def _create_placement_block(self, ce_id, furniture_data, placement_type, sit_data=None, entity_type="armor_stand", custom_translation_y=None):
+    def _hitbox_from_geometry(self, geometry, scale):
+        """
+        IA 配置未指定 hitbox 时，根据模型包围盒推算碰撞箱尺寸 (格数，向上取整，至少 1)。
+        """
+        import math
+        width, height, length = (
+            max(1, math.ceil(extent * factor / 16 - 1e-6))
+            for extent, factor in zip(geometry.size, scale)
+        )
+        return {"width": width, "height": height, "length": length}
+
+    def _create_placement_block(self, ce_id, furniture_data, placement_type, sit_data=None, entity_type="armor_stand", custom_translation_y=None, geometry=None):
         """
         创建家具放置块 (ground, wall, ceiling) 的通用配置
+        :param geometry: 模型的几何信息，IA 配置未指定 hitbox 时用于推算碰撞箱尺寸
         """
         # 计算 Translation
         height = 1
@@ -429,6 +739,12 @@ class IAConverter(BaseConverter):
             max_scale = max(s_x, s_y, s_z)
             translation_y = translation_y * max_scale
 
+        # IA 配置未指定 hitbox 时，按模型包围盒 (乘以显示缩放) 推算碰撞箱尺寸
+        ia_hitbox = furniture_data.get("hitbox")
+        if ia_hitbox is None and geometry is not None:
+            ia_hitbox = self._hitbox_from_geometry(geometry, (s_x, s_y, s_z))
+            width, height, length = ia_hitbox["width"], ia_hitbox["height"], ia_hitbox["length"]
+
         translation_x = 0
         translation_z = 0
         # X/Z 轴偏移: 针对偶数尺寸的家具进行中心修正
@@ -440,39 +756,29 @@ class IAConverter(BaseConverter):
         if height == 2 and width == 3 and length == 2:
             translation_z = 0.5
 
-        element_entry = {
-            "item": ce_id,
-            "display-transform": "NONE",
-            # "shadow-radius": 0.4,
-            # "shadow-strength": 0.5,
-            "billboard": "FIXED",
-            "translation": f"{translation_x:g},{translation_y:g},{translation_z:g}"
-        }
+        # display-transform 固定为 NONE，billboard 固定为 FIXED
+        element_entry = FurnitureElement(
+            item=ce_id,
+            translation=f"{translation_x:g},{translation_y:g},{translation_z:g}"
+        )
 
         # 针对墙面家具的修正
         if placement_type == "wall":
-            element_entry["position"] = "0,0,0.5"
+            element_entry.position = "0,0,0.5"
         # 针对天花板家具的修正
         elif placement_type == "ceiling":
-            element_entry["position"] = "0,-2,0"
+            element_entry.position = "0,-2,0"
 
         if scale_data:
-            element_entry["scale"] = f"{s_x:g},{s_y:g},{s_z:g}"
-
-        block_config = {
-            "loot-spawn-offset": "0,0.4,0",
-            "rules": {
-                "rotation": "eight",
-                "alignment": "center"
-            },
-            "elements": [element_entry]
-        }
+            element_entry.scale = f"{s_x:g},{s_y:g},{s_z:g}"
+
+        # loot-spawn-offset 与 rules 为固定值
+        block_config = Placement(elements=[element_entry])
         
         # 处理 Hitbox
         #将家具拆分为多个 1x1 的 Shulker 碰撞箱
         # 墙面家具不需要碰撞箱
-        if "hitbox" in furniture_data and placement_type != "wall":
-            ia_hitbox = furniture_data["hitbox"]
+        if ia_hitbox is not None and placement_type != "wall":
             is_solid = furniture_data.get("solid", True)
             
             # 获取 IA 偏移
@@ -510,15 +816,14 @@ class IAConverter(BaseConverter):
                         offset_x = i - (w_range - 1) / 2.0
                         seats.append(f"{offset_x:g},{ce_seat_y:g},0")
 
-                hitboxes.append({
-                    "position": f"{w_offset:g},{h_offset:g},{l_offset:g}",
-                    "type": "interaction",
-                    "blocks-building": is_solid,
-                    "width": width,
-                    "height": height,
-                    "interactive": True,
-                    "seats": seats
-                })
+                hitboxes.append(Hitbox(
+                    position=f"{w_offset:g},{h_offset:g},{l_offset:g}",
+                    type="interaction",
+                    blocks_building=is_solid,
+                    width=width,
+                    height=height,
+                    seats=seats
+                ))
 
             elif is_solid:
                 # 遍历体积生成 1x1 碰撞箱
@@ -552,30 +857,30 @@ class IAConverter(BaseConverter):
                             # Shulker 位置应该是整数 (格式化去除 .0)
                             pos_str = f"{final_x:g},{final_y:g},{final_z:g}"
                             
-                            hitboxes.append({
-                                "position": pos_str,
-                                "type": "shulker",
-                                "blocks-building": True,
-                                "interactive": True
-                            })
+                            hitboxes.append(Hitbox(position=pos_str, type="shulker", blocks_building=True))
             else:
                 # 非实体，生成一个交互框
-                hitboxes.append({
-                    "position": f"{w_offset:g},{h_offset:g},{l_offset:g}",
-                    "type": "interaction",
-                    "blocks-building": False,
-                    "width": width,
-                    "height": height,
-                    "interactive": True
-                })
-
-            block_config["hitboxes"] = hitboxes
+                hitboxes.append(Hitbox(
+                    position=f"{w_offset:g},{h_offset:g},{l_offset:g}",
+                    type="interaction",
+                    blocks_building=False,
+                    width=width,
+                    height=height
+                ))
+
+            block_config.hitboxes = hitboxes
             
         return block_config
 
     def _is_complex_item(self, material):
         return material in ["BOW", "CROSSBOW", "FISHING_ROD", "SHIELD"]
 
+    def _namespaces(self):
+        """当前命名空间的映射表 (NamespaceMap)，default 为当前命名空间。"""
+        if self._scoped_namespace_map is None or self._scoped_namespace_map.default != self.namespace:
+            self._scoped_namespace_map = (self.namespace_map or NamespaceMap()).scoped(self.namespace)
+        return self._scoped_namespace_map
+
     def _get_model_ref(self, path):
         """
         获取 CraftEngine 格式的模型引用，自动处理 item/ 前缀
@@ -585,9 +890,8 @@ class IAConverter(BaseConverter):
         return f"{self.namespace}:item/{path}"
 
     def _handle_complex_item(self, ce_item, key, ia_data, material):
-        # 为此物品创建一个模板
-        template_id = f"models:{self.namespace}_{key}_model"
-        
+        # 同一命名空间下相同材质的物品共享一个模板，物品之间只有 arguments 不同
+        template_id = f"models:{self.namespace}_{material.lower()}_model"
         
         template_def = {}
         args = {}
@@ -667,40 +971,27 @@ class IAConverter(BaseConverter):
              args["path"] = self._get_model_ref(base_model_path)
              args["cast_path"] = self._get_model_ref(f"{base_model_path}_cast")
 
-        # 注册模板
-        self.ce_config["templates"][template_id] = template_def
+        # 注册模板 (每种材质只注册一次)
+        if template_id not in self.ce_config["templates"]:
+            self.ce_config["templates"][template_id] = template_def
         
         # 分配给物品
-        ce_item["model"] = {
-            "template": template_id,
-            "arguments": args
-        }
+        ce_item.model = TemplateModel(template_id, args)
 
     def _handle_generic_model(self, ce_item, resource):
         model_path = resource.get("model_path")
         
         # 情况 1: 显式模型路径
         if model_path:
-            # 如果 model_path 中包含命名空间 (例如 "namespace:path")，则移除命名空间部分
-            # 因为 CraftEngine 会自动拼接当前命名空间，或者我们手动拼接时避免重复
-            if ":" in model_path:
-                model_path = model_path.split(":")[1]
-            
             # 移除 .json 后缀
             if model_path.endswith(".json"):
                 model_path = model_path[:-5]
 
-            # 检查 model_path 是否已经包含 item/ 前缀，避免双重嵌套
-            parts = model_path.split("/")
-            if parts[0] == "item":
-                final_path = model_path
-            else:
-                final_path = f"item/{model_path}"
-                
-            ce_item["model"] = {
-                "type": "minecraft:model",
-                "path": f"{self.namespace}:{final_path}"
-            }
+            # 未写命名空间的路径属于当前命名空间；
+            # 映射表负责替换命名空间 (包括指向其他命名空间的引用) 并添加 item/ 前缀
+            if ":" not in model_path:
+                model_path = f"{self.namespace}:{model_path}"
+            ce_item.model = ModelRef(self._namespaces().model(model_path))
         
         # 情况 2: 从纹理生成模型
         elif resource.get("generate") is True:
@@ -729,10 +1020,7 @@ class IAConverter(BaseConverter):
                 else:
                     final_path = f"item/{texture_path}"
                     
-                ce_item["model"] = {
-                    "type": "minecraft:model",
-                    "path": f"{self.namespace}:{final_path}"
-                }
+                ce_item.model = ModelRef(f"{self.namespace}:{final_path}")
 
                 # 注册此模型以进行生成
                 
@@ -746,17 +1034,22 @@ class IAConverter(BaseConverter):
 
     def _convert_equipments(self, equipments_data):
         for eq_key, eq_data in equipments_data.items():
-            ce_eq_id = f"{self.namespace}:{eq_key}"
+            ce_eq_id = intern_id(f"{self.namespace}:{eq_key}")
             
             # 映射 IA 图层到 CE Humanoid 图层
-            ce_eq = {
-                "type": "component"
-            }
+            ce_eq = Equipment()
             
+            # 旧格式的图层路径可能带有 .png 扩展名 (与 armors_rendering 相同)
             if "layer_1" in eq_data:
-                ce_eq["humanoid"] = f"{self.namespace}:{eq_data['layer_1']}"
+                layer_1_path = eq_data["layer_1"]
+                if layer_1_path.endswith(".png"):
+                    layer_1_path = layer_1_path[:-4]
+                ce_eq.humanoid = intern_id(f"{self.namespace}:{layer_1_path}")
             if "layer_2" in eq_data:
-                ce_eq["humanoid-leggings"] = f"{self.namespace}:{eq_data['layer_2']}"
+                layer_2_path = eq_data["layer_2"]
+                if layer_2_path.endswith(".png"):
+                    layer_2_path = layer_2_path[:-4]
+                ce_eq.humanoid_leggings = intern_id(f"{self.namespace}:{layer_2_path}")
                 
             self.ce_config["equipments"][ce_eq_id] = ce_eq
 
@@ -765,11 +1058,9 @@ class IAConverter(BaseConverter):
         将 IA 的 'armors_rendering' 转换为 CraftEngine 的 'equipments'。
         """
         for armor_name, armor_data in armors_rendering_data.items():
-            ce_key = f"{self.namespace}:{armor_name}"
+            ce_key = intern_id(f"{self.namespace}:{armor_name}")
             
-            ce_entry = {
-                "type": "component"
-            }
+            ce_entry = Equipment()
             
             # 映射 layer_1 -> humanoid
             if "layer_1" in armor_data:
@@ -780,14 +1071,14 @@ class IAConverter(BaseConverter):
                 if layer_1_path.endswith(".png"):
                      layer_1_path = layer_1_path[:-4]
                 
-                ce_entry["humanoid"] = f"{self.namespace}:{layer_1_path}"
+                ce_entry.humanoid = intern_id(f"{self.namespace}:{layer_1_path}")
 
             # 映射 layer_2 -> humanoid-leggings
             if "layer_2" in armor_data:
                 layer_2_path = armor_data["layer_2"]
                 if layer_2_path.endswith(".png"):
                      layer_2_path = layer_2_path[:-4]
-                ce_entry["humanoid-leggings"] = f"{self.namespace}:{layer_2_path}"
+                ce_entry.humanoid_leggings = intern_id(f"{self.namespace}:{layer_2_path}")
 
             self.ce_config["equipments"][ce_key] = ce_entry
 
@@ -0,0 +1,234 @@
+import sys
+from collections.abc import Mapping
+
+# CraftEngine 配置的中间表示 (IR)。
+# 转换器构建这些对象而不是嵌套字典：字段保存在 __slots__ 中，常量字段 (例如 "display-transform: NONE"、
+# 家具的掉落物模板) 只在类中保存一份，标识符字符串经过驻留，相同的 ID 在内存中只保存一份。
+# 节点实现只读的映射接口 (键名与 CE 配置一致)，读取 ce_config 的代码无需区分 IR 和普通字典；
+# YAML 序列化时按 KEYS 的顺序输出，结果与原先的嵌套字典逐字节相同。
+
+def intern_id(value):
+    """驻留标识符字符串 (物品 ID、带命名空间的引用等)。"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Node(Mapping):
+    """
+    IR 节点基类。
+    KEYS 为 (CE 键名, 属性名) 的有序元组，值为 None 的字段视为不存在 (不会输出)。
+    属性名可以是类属性 (常量) 或 property (每次访问生成新的容器，避免 YAML 输出锚点/别名)。
+    """
+    __slots__ = ()
+    KEYS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRS = dict(cls.KEYS)
+
+    def __getitem__(self, key):
+        attr = self._ATTRS.get(key)
+        if attr is not None:
+            value = getattr(self, attr)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self):
+        for key, attr in self.KEYS:
+            if getattr(self, attr) is not None:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+class Item(Node):
+    __slots__ = ("material", "data", "behavior", "settings", "model")
+    KEYS = (
+        ("material", "material"),
+        ("data", "data"),
+        ("behavior", "behavior"),
+        ("settings", "settings"),
+        ("model", "model")
+    )
+
+    def __init__(self, material, data, behavior=None, settings=None, model=None):
+        self.material = intern_id(material)
+        self.data = data
+        self.behavior = behavior
+        self.settings = settings
+        self.model = model
+
+class ItemData(Node):
+    __slots__ = ("item_name", "equippable")
+    KEYS = (("item-name", "item_name"), ("equippable", "equippable"))
+
+    def __init__(self, item_name, equippable=None):
+        self.item_name = item_name
+        self.equippable = equippable
+
+class Equippable(Node):
+    __slots__ = ("slot",)
+    KEYS = (("slot", "slot"),)
+
+    def __init__(self, slot):
+        self.slot = intern_id(slot)
+
+class ItemSettings(Node):
+    """物品的 settings (目前只有引用装备的 equipment)。"""
+    __slots__ = ("equipment",)
+    KEYS = (("equipment", "equipment"),)
+
+    def __init__(self, equipment):
+        self.equipment = equipment
+
+class EquipmentRef(Node):
+    __slots__ = ("asset_id", "slot")
+    KEYS = (("asset-id", "asset_id"), ("slot", "slot"))
+
+    def __init__(self, asset_id, slot):
+        self.asset_id = intern_id(asset_id)
+        self.slot = intern_id(slot)
+
+class ModelRef(Node):
+    """直接引用单个模型的物品模型定义。"""
+    __slots__ = ("path",)
+    KEYS = (("type", "model_type"), ("path", "path"))
+    model_type = "minecraft:model"
+
+    def __init__(self, path):
+        self.path = intern_id(path)
+
+class TemplateModel(Node):
+    """引用共享模板的物品模型定义，物品之间只有 arguments 不同。"""
+    __slots__ = ("template", "arguments")
+    KEYS = (("template", "template"), ("arguments", "arguments"))
+
+    def __init__(self, template, arguments):
+        self.template = intern_id(template)
+        self.arguments = {key: intern_id(value) for key, value in arguments.items()}
+
+class FurnitureBehavior(Node):
+    """家具物品的 behavior。设置和掉落物部分只由物品 ID 决定，在访问时生成。"""
+    __slots__ = ("item_id", "placement")
+    KEYS = (("type", "behavior_type"), ("furniture", "furniture"))
+    behavior_type = "furniture_item"
+
+    def __init__(self, item_id, placement=None):
+        self.item_id = intern_id(item_id)
+        self.placement = placement if placement is not None else {}
+
+    @property
+    def furniture(self):
+        return {
+            "settings": {
+                "item": self.item_id,
+                "sounds": {
+                    "break": "minecraft:block.stone.break",
+                    "place": "minecraft:block.stone.place"
+                }
+            },
+            "loot": {
+                "template": "default:loot_table/furniture",
+                "arguments": {
+                    "item": self.item_id
+                }
+            },
+            "placement": self.placement
+        }
+
+class Placement(Node):
+    """家具的一种放置方式 (ground / wall / ceiling)。"""
+    __slots__ = ("elements", "hitboxes")
+    KEYS = (
+        ("loot-spawn-offset", "loot_spawn_offset"),
+        ("rules", "rules"),
+        ("elements", "elements"),
+        ("hitboxes", "hitboxes")
+    )
+    loot_spawn_offset = "0,0.4,0"
+
+    def __init__(self, elements, hitboxes=None):
+        self.elements = elements
+        self.hitboxes = hitboxes
+
+    @property
+    def rules(self):
+        return {"rotation": "eight", "alignment": "center"}
+
+class FurnitureElement(Node):
+    __slots__ = ("item", "translation", "position", "scale")
+    KEYS = (
+        ("item", "item"),
+        ("display-transform", "display_transform"),
+        ("billboard", "billboard"),
+        ("translation", "translation"),
+        ("position", "position"),
+        ("scale", "scale")
+    )
+    display_transform = "NONE"
+    billboard = "FIXED"
+
+    def __init__(self, item, translation, position=None, scale=None):
+        self.item = intern_id(item)
+        self.translation = translation
+        self.position = intern_id(position)
+        self.scale = scale
+
+class Hitbox(Node):
+    __slots__ = ("position", "type", "blocks_building", "width", "height", "seats")
+    KEYS = (
+        ("position", "position"),
+        ("type", "type"),
+        ("blocks-building", "blocks_building"),
+        ("width", "width"),
+        ("height", "height"),
+        ("interactive", "interactive"),
+        ("seats", "seats")
+    )
+    interactive = True
+
+    def __init__(self, position, type, blocks_building, width=None, height=None, seats=None):
+        self.position = intern_id(position)
+        self.type = intern_id(type)
+        self.blocks_building = blocks_building
+        self.width = width
+        self.height = height
+        self.seats = seats
+
+class Equipment(Node):
+    __slots__ = ("humanoid", "humanoid_leggings")
+    KEYS = (
+        ("type", "equipment_type"),
+        ("humanoid", "humanoid"),
+        ("humanoid-leggings", "humanoid_leggings")
+    )
+    equipment_type = "component"
+
+    def __init__(self, humanoid=None, humanoid_leggings=None):
+        self.humanoid = intern_id(humanoid)
+        self.humanoid_leggings = intern_id(humanoid_leggings)
+
+class Category(Node):
+    __slots__ = ("name", "lore_lines", "icon", "item_ids", "hidden")
+    KEYS = (
+        ("name", "name"),
+        ("lore", "lore"),
+        ("priority", "priority"),
+        ("icon", "icon"),
+        ("list", "item_ids"),
+        ("hidden", "hidden")
+    )
+    priority = 1
+
+    def __init__(self, name, lore_lines, icon, item_ids, hidden=False):
+        self.name = name
+        self.lore_lines = lore_lines # 多个分类共用的元组
+        self.icon = intern_id(icon)
+        self.item_ids = [intern_id(item_id) for item_id in item_ids]
+        self.hidden = hidden
+
+    @property
+    def lore(self):
+        return list(self.lore_lines)
@@ -0,0 +1,224 @@
+import os
+import json
+import math
+
+# 模型复杂度预算的默认值:
+# elements / faces 为元素数和面数上限 (元素过多的 Blockbench 模型会明显降低客户端帧率)，
+# size 为任意轴上的最大跨度 (模型单位，16 = 1 格；原版元素坐标范围为 -16 到 32，即最大 48)
+DEFAULT_MODEL_BUDGET = {
+    "elements": 512,
+    "faces": 3072,
+    "size": 48
+}
+
+_AXES = {"x": 0, "y": 1, "z": 2}
+
+class ModelGeometry:
+    """单个模型的几何信息: 包围盒 (已应用元素旋转)、元素数和面数。坐标为模型单位。"""
+    __slots__ = ("min", "max", "element_count", "face_count")
+
+    def __init__(self, min, max, element_count, face_count):
+        self.min = min
+        self.max = max
+        self.element_count = element_count
+        self.face_count = face_count
+
+    @property
+    def size(self):
+        return tuple(hi - lo for lo, hi in zip(self.min, self.max))
+
+    def __repr__(self):
+        return (f"ModelGeometry(min={self.min}, max={self.max}, "
+                f"elements={self.element_count}, faces={self.face_count})")
+
+def _rotation_params(rotation):
+    """元素旋转 -> (轴索引, 原点, cos, sin, 缩放系数)，无旋转时返回 None。"""
+    if not isinstance(rotation, dict):
+        return None
+    axis = _AXES.get(rotation.get("axis"))
+    angle = rotation.get("angle", 0) or 0
+    if axis is None or not angle:
+        return None
+    radians = math.radians(angle)
+    cos, sin = math.cos(radians), math.sin(radians)
+    # rescale: 旋转后在另外两个轴上按 1/cos 放大，使元素仍然占满原来的范围
+    rescale = 1.0 / abs(cos) if rotation.get("rescale") and cos else 1.0
+    return axis, rotation.get("origin", [8, 8, 8]), cos, sin, rescale
+
+def measure_elements(elements):
+    """
+    批量计算一组元素的几何信息。
+    每个元素的 8 个角点绕旋转原点变换后参与包围盒计算，因此旋转元素的范围是精确的。
+    :return: ModelGeometry，没有有效元素时返回 None
+    """
+    lo = [math.inf, math.inf, math.inf]
+    hi = [-math.inf, -math.inf, -math.inf]
+    element_count = 0
+    face_count = 0
+    for element in elements:
+        if not isinstance(element, dict):
+            continue
+        try:
+            start = [float(v) for v in element["from"]]
+            end = [float(v) for v in element["to"]]
+        except (KeyError, TypeError, ValueError):
+            continue
+        element_count += 1
+        faces = element.get("faces")
+        if isinstance(faces, dict):
+            face_count += len(faces)
+
+        params = _rotation_params(element.get("rotation"))
+        if params is None:
+            for i in range(3):
+                lo[i] = min(lo[i], start[i], end[i])
+                hi[i] = max(hi[i], start[i], end[i])
+            continue
+
+        axis, origin, cos, sin, rescale = params
+        # 旋转平面内的两个轴 (按右手系顺序，与游戏中的旋转方向一致)
+        u, v = (axis + 1) % 3, (axis + 2) % 3
+        for x in (start[0], end[0]):
+            for y in (start[1], end[1]):
+                for z in (start[2], end[2]):
+                    corner = [x, y, z]
+                    du = corner[u] - origin[u]
+                    dv = corner[v] - origin[v]
+                    corner[u] = origin[u] + (du * cos - dv * sin) * rescale
+                    corner[v] = origin[v] + (du * sin + dv * cos) * rescale
+                    for i in range(3):
+                        lo[i] = min(lo[i], corner[i])
+                        hi[i] = max(hi[i], corner[i])
+
+    if not element_count:
+        return None
+    return ModelGeometry(
+        tuple(round(value, 4) for value in lo),
+        tuple(round(value, 4) for value in hi),
+        element_count,
+        face_count
+    )
+
+class ModelGeometryIndex:
+    """
+    资源包中模型的几何信息索引 (键为 "命名空间:路径")。
+    analyze_all 一次遍历所有模型并批量计算；get 对尚未分析的模型按需分析 (例如单物品预览)。
+    没有 elements 的模型继承父模型的几何信息。结果只与源文件有关，可以传给进程池的工作进程。
+    """
+
+    def __init__(self, resourcepack_root, fs=None):
+        """
+        :param resourcepack_root: IA 资源包根目录 (包含 assets)
+        :param fs: 读取源文件使用的路径重映射层 (PathOverlay)，默认直接访问真实路径
+        """
+        self.resourcepack_root = resourcepack_root
+        self.fs = fs
+        self.models = {} # 模型 ID -> ModelGeometry 或 None (无几何信息)
+        self.complete = False
+
+    def analyze_all(self):
+        """遍历 assets/*/models 下的所有模型，计算几何信息。"""
+        if self.complete:
+            return self.models
+        assets_path = os.path.join(self.resourcepack_root, "assets") if self.resourcepack_root else None
+        raw = {}
+        if assets_path and self._exists(assets_path):
+            for namespace in sorted(self._listdir(assets_path)):
+                models_root = os.path.join(assets_path, namespace, "models")
+                if not self._exists(models_root):
+                    continue
+                for root, _, files in self._walk(models_root):
+                    for file in files:
+                        if not file.endswith(".json"):
+                            continue
+                        rel_path = os.path.relpath(os.path.join(root, file), models_root)
+                        model_id = f"{namespace}:{rel_path[:-5].replace(os.sep, '/')}"
+                        if model_id not in self.models:
+                            raw[model_id] = self._load(os.path.join(root, file))
+        for model_id in raw:
+            self._resolve(model_id, raw)
+        self.complete = True
+        return self.models
+
+    def get(self, model_id):
+        """:return: ModelGeometry 或 None"""
+        if model_id not in self.models and not self.complete:
+            self._resolve(model_id, {})
+        return self.models.get(model_id)
+
+    def check_budget(self, budget=None):
+        """
+        分析所有模型并找出超出复杂度预算的模型。
+        :param budget: {"elements", "faces", "size"}，缺少的项使用 DEFAULT_MODEL_BUDGET
+        :return: 报告 {"checked", "budget", "over_budget": [...]}
+        """
+        budget = {**DEFAULT_MODEL_BUDGET, **(budget or {})}
+        over_budget = []
+        for model_id, geometry in sorted(self.analyze_all().items()):
+            if geometry is None:
+                continue
+            size = geometry.size
+            exceeded = []
+            if budget["elements"] and geometry.element_count > budget["elements"]:
+                exceeded.append("elements")
+            if budget["faces"] and geometry.face_count > budget["faces"]:
+                exceeded.append("faces")
+            if budget["size"] and max(size) > budget["size"]:
+                exceeded.append("size")
+            if exceeded:
+                over_budget.append({
+                    "model": model_id,
+                    "elements": geometry.element_count,
+                    "faces": geometry.face_count,
+                    "size": [round(value, 2) for value in size],
+                    "exceeded": exceeded
+                })
+        return {
+            "checked": sum(1 for geometry in self.models.values() if geometry is not None),
+            "budget": budget,
+            "over_budget": over_budget
+        }
+
+    def _resolve(self, model_id, raw, depth=0):
+        if model_id in self.models:
+            return self.models[model_id]
+        data = raw[model_id] if model_id in raw else self._load(self._model_file(model_id))
+        geometry = None
+        if isinstance(data, dict):
+            elements = data.get("elements")
+            if isinstance(elements, list):
+                geometry = measure_elements(elements)
+            elif isinstance(data.get("parent"), str) and depth < 16:
+                geometry = self._resolve(self._parent_id(data["parent"]), raw, depth + 1)
+        self.models[model_id] = geometry
+        return geometry
+
+    def _model_file(self, model_id):
+        namespace, _, path = model_id.partition(":")
+        if not self.resourcepack_root:
+            return None
+        return os.path.join(self.resourcepack_root, "assets", namespace, "models", f"{path}.json")
+
+    def _parent_id(self, parent):
+        # 未写命名空间的父模型属于 minecraft (与游戏的解析规则一致)
+        return parent if ":" in parent else f"minecraft:{parent}"
+
+    def _load(self, path):
+        if not path or not self._exists(path):
+            return None
+        try:
+            opener = self.fs.open if self.fs is not None else open
+            with opener(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error reading model {path}: {e}")
+            return None
+
+    def _exists(self, path):
+        return self.fs.exists(path) if self.fs is not None else os.path.exists(path)
+
+    def _listdir(self, path):
+        return self.fs.listdir(path) if self.fs is not None else os.listdir(path)
+
+    def _walk(self, top):
+        return self.fs.walk(top) if self.fs is not None else os.walk(top)
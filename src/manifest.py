@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import hashlib
+import uuid
+import shutil
+import zipfile
+
+# 文件类型 (按扩展名)，其余文件的类型为 None
+FILE_KINDS = {
+    ".yml": "yaml",
+    ".yaml": "yaml",
+    ".png": "png",
+    ".mcmeta": "mcmeta",
+    ".json": "json",
+    ".ogg": "ogg"
+}
+
+# zip 格式能表示的最早时间
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+def file_kind(name):
+    return FILE_KINDS.get(os.path.splitext(name)[1].lower())
+
+class FileEntry:
+    __slots__ = ("size", "mtime", "kind")
+
+    def __init__(self, size, mtime, kind):
+        self.size = size
+        self.mtime = mtime
+        self.kind = kind
+
+class FileManifest:
+    """
+    目录树的文件清单: 每个文件的路径、大小、修改时间和类型，以及目录索引 (子目录和文件名)。
+    使用 os.scandir 遍历一次建立，之后分析、扫描和迁移等各个阶段都从清单中获取目录结构，
+    不再重复遍历文件系统。接口与 os.walk / os.path 的对应函数一致，路径均为绝对路径。
+    清单建立后目录树应保持不变 (会话的解压目录在转换过程中是只读的)。
+    清单同时是只读虚拟文件系统的目录实现 (open / copy 直接访问真实文件)，
+    压缩包实现见 src.vfs.ZipFS。
+    """
+
+    def __init__(self, root, dirs=None, files=None):
+        self.root = os.path.abspath(root)
+        self.dirs = dirs if dirs is not None else {}   # 相对目录 ("" 为根目录) -> (子目录名列表, 文件名列表)
+        self.files = files if files is not None else {} # 相对路径 -> FileEntry
+
+    @classmethod
+    def build(cls, root):
+        """遍历 root 建立清单 (子目录和文件保持 os.scandir 的顺序，与 os.walk 一致)。"""
+        manifest = cls(root)
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            subdirs, names = [], []
+            try:
+                with os.scandir(manifest._abs(rel_dir)) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                        if is_dir:
+                            subdirs.append(entry.name)
+                            # 与 os.walk 相同，不进入符号链接指向的目录
+                            if not entry.is_symlink():
+                                stack.append(rel_path)
+                        else:
+                            try:
+                                stat = entry.stat()
+                            except OSError:
+                                continue
+                            names.append(entry.name)
+                            manifest.files[rel_path] = FileEntry(stat.st_size, stat.st_mtime, file_kind(entry.name))
+            except OSError:
+                continue
+            manifest.dirs[rel_dir] = (subdirs, names)
+        return manifest
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(
+            data["root"],
+            {rel_dir: (subdirs, names) for rel_dir, (subdirs, names) in data["dirs"].items()},
+            {rel_path: FileEntry(size, mtime, file_kind(rel_path)) for rel_path, (size, mtime) in data["files"].items()}
+        )
+
+    def save(self, path):
+        """保存清单 (先写入临时文件再替换，同时读取的进程不会读到写了一半的文件)。"""
+        data = {
+            "root": self.root,
+            "dirs": {rel_dir: [subdirs, names] for rel_dir, (subdirs, names) in self.dirs.items()},
+            "files": {rel_path: [entry.size, entry.mtime] for rel_path, entry in self.files.items()}
+        }
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def cached(cls, root, cache_path):
+        """读取 cache_path 中 root 的清单，不存在或无法读取时建立并保存。"""
+        try:
+            manifest = cls.load(cache_path)
+            if manifest.root == os.path.abspath(root):
+                return manifest
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        manifest = cls.build(root)
+        manifest.save(cache_path)
+        return manifest
+
+    def _abs(self, rel_path):
+        return os.path.join(self.root, rel_path) if rel_path else self.root
+
+    def _rel(self, path):
+        """绝对路径 -> 相对路径，不在清单根目录下时返回 None。"""
+        path = os.path.abspath(path)
+        if path == self.root:
+            return ""
+        if path.startswith(self.root + os.sep):
+            return path[len(self.root) + 1:]
+        return None
+
+    def contains(self, path):
+        """path 是否位于清单的根目录下 (清单可以回答该路径的查询)。"""
+        return self._rel(path) is not None
+
+    def exists(self, path):
+        rel_path = self._rel(path)
+        return rel_path in self.files or rel_path in self.dirs
+
+    def isdir(self, path):
+        return self._rel(path) in self.dirs
+
+    def isfile(self, path):
+        return self._rel(path) in self.files
+
+    def listdir(self, path):
+        rel_path = self._rel(path)
+        if rel_path not in self.dirs:
+            raise FileNotFoundError(path)
+        subdirs, names = self.dirs[rel_path]
+        return subdirs + names
+
+    def getsize(self, path):
+        entry = self.files.get(self._rel(path))
+        if entry is None:
+            raise FileNotFoundError(path)
+        return entry.size
+
+    def getmtime(self, path):
+        entry = self.files.get(self._rel(path))
+        if entry is None:
+            raise FileNotFoundError(path)
+        return entry.mtime
+
+    def walk(self, top):
+        """与 os.walk (自顶向下) 相同，返回的 dirs 列表可以就地修改以跳过子目录。"""
+        rel_top = self._rel(top)
+        if rel_top not in self.dirs:
+            return
+        stack = [(top, rel_top)]
+        while stack:
+            path, rel_path = stack.pop()
+            subdirs, names = self.dirs[rel_path]
+            dirs = list(subdirs)
+            yield path, dirs, list(names)
+            for name in reversed(dirs):
+                child = os.path.join(rel_path, name) if rel_path else name
+                if child in self.dirs:
+                    stack.append((os.path.join(path, name), child))
+
+    def open(self, path, mode='r', **kwargs):
+        """只读地打开清单中的文件 (目录实现直接打开真实文件)。"""
+        if any(flag in mode for flag in ("w", "a", "+", "x")):
+            raise PermissionError(f"源文件是只读的: {path}")
+        return open(path, mode, **kwargs)
+
+    def copy(self, path, dest_file):
+        """将文件复制到 dest_file (目录实现保留修改时间)。"""
+        shutil.copy2(path, dest_file)
+
+    def files_of_kind(self, kind):
+        """清单中指定类型 (yaml/png/mcmeta/json/ogg) 的所有文件 (绝对路径)。"""
+        return [self._abs(rel_path) for rel_path, entry in self.files.items() if entry.kind == kind]
+
+def archive_timestamp():
+    """
+    压缩包条目使用的固定时间戳 (date_time 元组)。
+    默认为 zip 格式能表示的最早时间 1980-01-01 00:00:00；设置了 SOURCE_DATE_EPOCH 环境变量时使用该时间 (UTC)。
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        try:
+            return max(time.gmtime(int(epoch))[:6], ZIP_EPOCH)
+        except (ValueError, OverflowError, OSError):
+            pass
+    return ZIP_EPOCH
+
+def write_archive(zip_path, base_dir, files):
+    """
+    将文件列表写入 zip 压缩包，压缩包内的路径相对于 base_dir。
+    输出文件在写入时已经记录，无需再次遍历输出目录。
+    压缩包是可复现的: 条目按路径排序，时间戳、权限和创建系统固定，不记录目录条目，
+    相同的输入和参数得到逐字节相同的压缩包 (SHA-1 不变，客户端可以继续使用缓存的资源包)。
+    :return: 输出清单 {压缩包内路径: SHA-1}，在写入时计算，不会再次读取文件
+    """
+    date_time = archive_timestamp()
+    hashes = {}
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for file_path in sorted(files, key=lambda path: os.path.relpath(path, base_dir).replace(os.sep, "/")):
+            arcname = os.path.relpath(file_path, base_dir).replace(os.sep, "/")
+            info = zipfile.ZipInfo(arcname, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3 # Unix，与运行平台无关
+            info.external_attr = 0o644 << 16
+            info.file_size = os.path.getsize(file_path) # 写入前确定是否需要 ZIP64
+            digest = hashlib.sha1()
+            with open(file_path, 'rb') as src, zf.open(info, 'w') as dst:
+                while chunk := src.read(1024 * 1024):
+                    digest.update(chunk)
+                    dst.write(chunk)
+            hashes[arcname] = digest.hexdigest()
+    return hashes
+
+def save_output_manifest(path, hashes):
+    """保存输出清单 (压缩包内每个文件的 SHA-1)，下次转换时可以作为增量包的基准。"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"format": 1, "algorithm": "sha1", "files": dict(sorted(hashes.items()))}, f, ensure_ascii=False, indent=1)
+
+def parse_output_manifest(data):
+    """
+    校验已解析的输出清单 (save_output_manifest 写入的 JSON)。
+    :return: {压缩包内路径: SHA-1}
+    :raises ValueError: 格式无效
+    """
+    if not isinstance(data, dict) or data.get("algorithm", "sha1") != "sha1" or not isinstance(data.get("files"), dict):
+        raise ValueError("输出清单格式无效")
+    files = data["files"]
+    if not all(isinstance(path, str) and isinstance(digest, str) for path, digest in files.items()):
+        raise ValueError("输出清单格式无效")
+    return files
+
+def diff_output_manifests(base, current):
+    """
+    比较两次转换的输出清单。
+    :param base: 上一次转换的输出清单 {路径: SHA-1}
+    :param current: 本次转换的输出清单
+    :return: (新增的路径, 内容变化的路径, 删除的路径)，均已排序
+    """
+    added = sorted(path for path in current if path not in base)
+    changed = sorted(path for path, digest in current.items() if path in base and base[path] != digest)
+    deleted = sorted(path for path in base if path not in current)
+    return added, changed, deleted
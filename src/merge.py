@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import uuid
+import hashlib
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.manifest import FileManifest
+from src.vfs import ZipFS
+
+# 索引缓存文件 (保存在 resources 目录中，不参与合并)
+INDEX_FILE = ".mcc-index.json"
+# 索引中记录的配置 ID 类型 (CE 配置的顶层映射)
+ID_SECTIONS = ("items", "templates")
+
+def _sha1(f):
+    digest = hashlib.sha1()
+    while chunk := f.read(1024 * 1024):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_ids(f):
+    """读取 CE 配置中定义的物品 ID 和模板 ID，无法解析时返回空结果。"""
+    import yaml
+    try:
+        data = yaml.safe_load(f)
+    except Exception:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        section: [str(key) for key in data[section]]
+        for section in ID_SECTIONS if isinstance(data.get(section), dict) and data[section]
+    }
+
+def _is_yaml(rel_path):
+    return rel_path.endswith((".yml", ".yaml"))
+
+class CEIndex:
+    """
+    已有 CraftEngine resources 目录的索引: 每个文件的大小、修改时间和内容哈希 (SHA-1)，
+    以及配置文件中定义的物品 ID 和模板 ID。
+    索引保存在目录中的 .mcc-index.json，再次合并时只遍历一次目录结构，
+    只有大小或修改时间变化的文件才会重新哈希和解析。内容哈希在第一次需要比较时计算。
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.files = {}  # 相对路径 ("/" 分隔) -> [大小, 修改时间, SHA-1 或 None]
+        self.ids = {}    # 配置文件相对路径 -> {"items": [ID, ...], "templates": [ID, ...]}
+        self.merged = {} # 由合并写入的文件 -> 写入时的 SHA-1 (之后未被修改的文件可以直接更新)
+        self._owners = None
+
+    @classmethod
+    def load(cls, root):
+        """读取索引缓存 (不存在或无法读取时为空) 并与目录的当前状态同步。"""
+        index = cls(root)
+        try:
+            with open(index._abs(INDEX_FILE), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            index.files = data["files"]
+            index.ids = data["ids"]
+            index.merged = data["merged"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        index.refresh()
+        return index
+
+    def save(self):
+        """保存索引 (先写入临时文件再替换)。"""
+        path = self._abs(INDEX_FILE)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"files": self.files, "ids": self.ids, "merged": self.merged}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _abs(self, rel_path):
+        return os.path.join(self.root, *rel_path.split("/"))
+
+    def refresh(self):
+        """遍历一次目录，更新新增、变化和删除的文件。"""
+        files = {}
+        for rel_path, entry in FileManifest.build(self.root).files.items():
+            rel_path = rel_path.replace(os.sep, "/")
+            if rel_path == INDEX_FILE or rel_path.startswith(f"{INDEX_FILE}."):
+                continue
+            cached = self.files.get(rel_path)
+            if cached and cached[0] == entry.size and cached[1] == entry.mtime:
+                files[rel_path] = cached
+                continue
+            files[rel_path] = [entry.size, entry.mtime, None]
+            if _is_yaml(rel_path):
+                with open(self._abs(rel_path), 'r', encoding='utf-8') as f:
+                    self.ids[rel_path] = _read_ids(f)
+        self.files = files
+        self.ids = {rel_path: ids for rel_path, ids in self.ids.items() if rel_path in files}
+        self.merged = {rel_path: digest for rel_path, digest in self.merged.items() if rel_path in files}
+        self._owners = None
+
+    def sha1(self, rel_path):
+        """文件的内容哈希 (第一次使用时计算并记录在索引中)。"""
+        entry = self.files[rel_path]
+        if entry[2] is None:
+            with open(self._abs(rel_path), 'rb') as f:
+                entry[2] = _sha1(f)
+        return entry[2]
+
+    def owners(self, section):
+        """ID -> 定义它的配置文件列表 (section 为 items 或 templates)。"""
+        if self._owners is None:
+            self._owners = {name: {} for name in ID_SECTIONS}
+            for rel_path, ids in self.ids.items():
+                for name, keys in ids.items():
+                    for key in keys:
+                        self._owners[name].setdefault(key, []).append(rel_path)
+        return self._owners[section]
+
+    def record(self, rel_path, digest, ids=None):
+        """记录合并写入的文件。"""
+        stat = os.stat(self._abs(rel_path))
+        self.files[rel_path] = [stat.st_size, stat.st_mtime, digest]
+        self.merged[rel_path] = digest
+        if ids is not None:
+            self.ids[rel_path] = ids
+        self._owners = None
+
+def _output_root(source):
+    """转换输出中的 resources 目录 (压缩包中为 CraftEngine/resources，也可以直接是 resources 目录)。"""
+    resources_dir = os.path.join(source.root, "CraftEngine", "resources")
+    return resources_dir if source.isdir(resources_dir) else source.root
+
+def merge_output(index, source, overwrite=False, dry_run=False):
+    """
+    将转换输出合并到已索引的 CraftEngine resources 目录。
+    - 目标中不存在的文件直接写入；内容相同的文件跳过，不会重新复制；
+    - 内容不同、但由之前的合并写入且之后未被修改的文件视为更新，直接覆盖；
+    - 其余内容不同的文件是冲突，默认不覆盖 (overwrite 为 True 时覆盖)；
+    - 配置中的物品 ID 或模板 ID 已在目标的其他配置文件中定义时，该配置文件不写入 (overwrite 也不能解决重复定义)。
+    :param index: 目标目录的索引 (CEIndex)，合并后同步更新
+    :param source: 转换输出的只读文件系统 (FileManifest 或 ZipFS)
+    :param dry_run: 只生成报告，不写入任何文件
+    :return: 合并报告 {added, updated, identical, conflicts}
+    """
+    report = {"added": [], "updated": [], "identical": 0, "conflicts": []}
+    # 本次合并写入 (dry_run 时为将要写入) 的配置文件定义的 ID，取代索引中这些文件原有的记录，
+    # 这样同一次合并中后面的配置与前面的配置重复定义时，dry_run 与实际合并的报告相同
+    written = set()
+    written_owners = {section: {} for section in ID_SECTIONS}
+
+    def owners(section, key, rel_path):
+        found = [owner for owner in index.owners(section).get(key, ()) if owner not in written]
+        found.extend(written_owners[section].get(key, ()))
+        return [owner for owner in found if owner != rel_path]
+
+    output_root = _output_root(source)
+    for root, dirs, files in source.walk(output_root):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, output_root).replace(os.sep, "/")
+            with source.open(path, 'rb') as f:
+                digest = _sha1(f)
+
+            ids = None
+            if _is_yaml(rel_path):
+                with source.open(path, 'r', encoding='utf-8') as f:
+                    ids = _read_ids(f)
+                duplicates = {}
+                for section, keys in ids.items():
+                    for key in keys:
+                        others = owners(section, key, rel_path)
+                        if others:
+                            duplicates[f"{section}:{key}"] = others
+                if duplicates:
+                    report["conflicts"].append({"path": rel_path, "reason": "ids", "ids": duplicates})
+                    continue
+
+            if rel_path not in index.files:
+                report["added"].append(rel_path)
+            elif index.sha1(rel_path) == digest:
+                report["identical"] += 1
+                continue
+            elif overwrite or index.merged.get(rel_path) == index.sha1(rel_path):
+                report["updated"].append(rel_path)
+            else:
+                report["conflicts"].append({"path": rel_path, "reason": "content"})
+                continue
+
+            if ids is not None:
+                written.add(rel_path)
+                for section, keys in ids.items():
+                    for key in keys:
+                        written_owners[section].setdefault(key, []).append(rel_path)
+            if not dry_run:
+                dest_file = index._abs(rel_path)
+                os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+                source.copy(path, dest_file)
+                index.record(rel_path, digest, ids)
+    return report
+
+def open_output(path):
+    """打开转换输出 (输出压缩包或已解压的目录)。"""
+    if os.path.isdir(path):
+        return FileManifest.build(path)
+    return ZipFS(path, os.path.splitext(os.path.abspath(path))[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="将转换结果合并到已有的 CraftEngine resources 目录")
+    parser.add_argument("source", help="转换输出 (MCC 生成的压缩包或目录)")
+    parser.add_argument("target", help="已有的 CraftEngine resources 目录")
+    parser.add_argument("--overwrite", action="store_true", help="覆盖内容冲突的文件")
+    parser.add_argument("--dry-run", action="store_true", help="只报告合并结果，不写入文件")
+    args = parser.parse_args()
+
+    index = CEIndex.load(args.target)
+    report = merge_output(index, open_output(args.source), overwrite=args.overwrite, dry_run=args.dry_run)
+    if not args.dry_run:
+        index.save()
+
+    print(f"新增 {len(report['added'])} 个文件, 更新 {len(report['updated'])} 个文件, "
+          f"跳过 {report['identical']} 个相同的文件, {len(report['conflicts'])} 个冲突")
+    for conflict in report["conflicts"]:
+        if conflict["reason"] == "ids":
+            for key, owners in conflict["ids"].items():
+                print(f"冲突: {conflict['path']} 中的 {key} 已在 {', '.join(owners)} 中定义")
+        else:
+            print(f"冲突: {conflict['path']} 与已有文件内容不同 (使用 --overwrite 覆盖)")
+    return 1 if report["conflicts"] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
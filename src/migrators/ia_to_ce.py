@@ -1,19 +1,112 @@
 import os
-import shutil
 import json
 from .base import BaseMigrator
+from .references import MODEL, TEXTURE
+from src.overlay import PathOverlay
+from src.namespaces import NamespaceMap
+from src.textures import texture_info, texture_report
+
+class _ReferenceLookup:
+    """
+    按需解析的资源索引：只为被查询到的引用检查对应的候选源文件，
+    不遍历整个资源目录。用于只迁移少量物品依赖闭包的场景 (例如单物品预览)。
+    """
+
+    def __init__(self, migrator):
+        self.migrator = migrator
+        self.dirs = {
+            TEXTURE: migrator._get_resource_dir("textures"),
+            MODEL: migrator._get_resource_dir("models")
+        }
+        self.cache = {}
+
+    def get(self, node, default=None):
+        if node not in self.cache:
+            self.cache[node] = self._lookup(node)
+        return self.cache[node] or default
+
+    def __contains__(self, node):
+        return bool(self.get(node))
+
+    def __iter__(self):
+        return iter([node for node, src_files in self.cache.items() if src_files])
+
+    def items(self):
+        return [(node, src_files) for node, src_files in self.cache.items() if src_files]
+
+    def _lookup(self, node):
+        kind, ref = node
+        ns, _, path = ref.partition(":")
+        src_dir = self.dirs[kind]
+        if ns != self.migrator.namespace or not src_dir:
+            return []
+
+        # CE 路径可能来自 IA 的 <path> 或 item/<path>，逐个检查并用正向映射确认
+        candidates = [path]
+        if path.startswith("item/"):
+            candidates.append(path[len("item/"):])
+        suffixes = (".png", ".png.mcmeta") if kind == TEXTURE else (".json",)
+
+        found = []
+        for candidate in candidates:
+            for suffix in suffixes:
+                src_file = os.path.join(src_dir, *f"{candidate}{suffix}".split("/"))
+                if not self.migrator.fs.exists(src_file):
+                    continue
+                if kind == TEXTURE:
+                    dest_file = self.migrator._texture_dest_file(src_dir, src_file)
+                    dest_ref = self.migrator._dest_ref(dest_file, "textures")
+                else:
+                    dest_file = self.migrator._model_dest_file(src_dir, src_file)
+                    dest_ref = self.migrator._dest_ref(dest_file, "models")
+                if dest_ref == ref and src_file not in found:
+                    found.append(src_file)
+        return found
 
 class IAMigrator(BaseMigrator):
-    def __init__(self, ia_resourcepack_path, ce_resourcepack_path, namespace):
+    def __init__(self, ia_resourcepack_path, ce_resourcepack_path, namespace, fs=None):
+        """
+        :param fs: 读取源资源包使用的路径重映射层 (PathOverlay)，默认直接访问真实路径
+        """
         super().__init__(ia_resourcepack_path, ce_resourcepack_path)
         self.namespace = namespace
+        self.fs = fs or PathOverlay()
+        # 模型和纹理引用的命名空间映射 (多命名空间物品包的各个分组共用同一张映射表)
+        self.namespace_map = NamespaceMap(default=namespace)
+        # 为 True 时，内容未变化的目标文件不会被重写 (用于监视模式的增量迁移)
+        self.skip_unchanged = False
+        # 为 True 时，未被任何物品、装备或模型引用的资源不会被迁移 (需要传入引用图)
+        self.prune = False
+        self.reference_report = None
+        self.texture_budget = None # 纹理预算 (None 使用 DEFAULT_TEXTURE_BUDGET)
+        self.texture_report = None # 已迁移纹理的内存估算和超出预算的纹理
+        self._graph = None
+        self._migrated_textures = {} # 纹理引用 -> {".png" / ".mcmeta": 源文件}
+        self.output_files = set() # 已写入的目标文件
+        self._asset_index = None
+        self._reachable = None
+        self._generated = set()
 
-    def migrate(self):
-        """执行完整的迁移过程。"""
+    def migrate(self, graph=None, closure_only=False):
+        """
+        执行完整的迁移过程。
+        :param graph: 资源引用图 (ReferenceGraph)。传入时会检查悬空引用，
+                      并在启用 prune 时跳过未被引用的资源。
+        :param closure_only: 只迁移引用图的依赖闭包，并按需解析引用而不遍历整个资源包
+                             (适用于只转换少量物品的预览)
+        """
         print(f"开始从 {self.input_path} 迁移到 {self.output_path}")
         
+        if graph is not None:
+            if closure_only:
+                self.prune = True
+                self._resolve_references(graph, _ReferenceLookup(self))
+            else:
+                self._resolve_references(graph)
+        
         # 1. 迁移纹理
         self._migrate_textures()
+        self._build_texture_report()
         
         # 2. 迁移模型
         self._migrate_models()
@@ -26,6 +119,95 @@ class IAMigrator(BaseMigrator):
         
         print("迁移完成。")
 
+    def build_asset_index(self):
+        """
+        遍历一次源纹理和模型目录，建立 CE 引用节点到源文件的索引。
+        :return: {(类型, CE 引用): [源文件, ...]}
+        """
+        index = {}
+        textures_dir = self._get_resource_dir("textures")
+        if textures_dir:
+            for root, dirs, files in self.fs.walk(textures_dir):
+                dirs.sort()
+                for file in sorted(files):
+                    if not file.endswith((".png", ".mcmeta")):
+                        continue
+                    src_file = os.path.join(root, file)
+                    dest_file = self._texture_dest_file(textures_dir, src_file)
+                    node = (TEXTURE, self._dest_ref(dest_file, "textures"))
+                    index.setdefault(node, []).append(src_file)
+
+        models_dir = self._get_resource_dir("models")
+        if models_dir:
+            for root, dirs, files in self.fs.walk(models_dir):
+                dirs.sort()
+                for file in sorted(files):
+                    if not file.endswith(".json"):
+                        continue
+                    src_file = os.path.join(root, file)
+                    dest_file = self._model_dest_file(models_dir, src_file)
+                    node = (MODEL, self._dest_ref(dest_file, "models"))
+                    index.setdefault(node, []).append(src_file)
+        return index
+
+    def _dest_ref(self, dest_file, resource_type):
+        """将输出文件路径转换为 CE 引用，例如 .../textures/item/a.png -> ns:item/a"""
+        base = os.path.join(self.output_path, "assets", self.namespace, resource_type)
+        rel_path = os.path.normpath(os.path.relpath(dest_file, base)).replace(os.sep, "/")
+        for suffix in (".png.mcmeta", ".png", ".json"):
+            if rel_path.endswith(suffix):
+                rel_path = rel_path[:-len(suffix)]
+                break
+        return f"{self.namespace}:{rel_path}"
+
+    def _resolve_references(self, graph, asset_index=None):
+        """
+        根据引用图计算可达资源和悬空引用，结果保存在 reference_report 中。
+        :param asset_index: 资源索引 (默认遍历源目录构建完整索引)
+        """
+        self._graph = graph
+        self._asset_index = asset_index if asset_index is not None else self.build_asset_index()
+        self._generated = {ref for _, ref in graph.generated}
+        external = set(self.namespace_map.mapping.values()) - {self.namespace}
+        reachable, dangling = graph.resolve(self._asset_index, self._model_edges, external)
+        
+        unreferenced = [node for node in self._asset_index if node not in reachable]
+        if self.prune:
+            self._reachable = reachable
+        
+        self.reference_report = {
+            "dangling": [
+                {"type": kind, "ref": ref, "referenced_by": sorted(referrers)}
+                for (kind, ref), referrers in sorted(dangling.items())
+            ],
+            "unreferenced_count": len(unreferenced),
+            "pruned": self.prune
+        }
+        for entry in self.reference_report["dangling"]:
+            print(f"警告: 悬空引用 {entry['type']} {entry['ref']} (来自 {', '.join(entry['referenced_by'])})")
+        if self.prune:
+            print(f"已排除 {len(unreferenced)} 个未被引用的资源")
+
+    def _model_edges(self, node):
+        """读取索引中的模型文件，返回其引用的纹理和模型节点。"""
+        edges = []
+        for src_file in self._asset_index.get(node, []):
+            try:
+                with self.fs.open(src_file, 'r', encoding='utf-8') as f:
+                    data = self._transform_model(json.load(f))
+            except Exception:
+                continue
+            for val in data.get("textures", {}).values():
+                if isinstance(val, str) and not val.startswith(("#", "minecraft:")):
+                    edges.append((TEXTURE, val))
+            for override in data.get("overrides", []):
+                if isinstance(override.get("model"), str):
+                    edges.append((MODEL, override["model"]))
+        return edges
+
+    def _is_pruned(self, node):
+        return self._reachable is not None and node not in self._reachable
+
     def _get_resource_dir(self, resource_type):
         """
         辅助方法：查找正确的资源目录。
@@ -36,17 +218,17 @@ class IAMigrator(BaseMigrator):
         """
         # 1. 标准: assets/namespace/type
         path1 = os.path.join(self.input_path, "assets", self.namespace, resource_type)
-        if os.path.exists(path1):
+        if self.fs.exists(path1):
             return path1
             
         # 2. 缺失 assets: namespace/type
         path2 = os.path.join(self.input_path, self.namespace, resource_type)
-        if os.path.exists(path2):
+        if self.fs.exists(path2):
             return path2
             
         # 3. 扁平: type (仅当 input_path 已经是命名空间根目录时)
         path3 = os.path.join(self.input_path, resource_type)
-        if os.path.exists(path3):
+        if self.fs.exists(path3):
             return path3
             
         return None
@@ -66,37 +248,91 @@ class IAMigrator(BaseMigrator):
         # 目前，我们将假设大多数是物品并将它们移动到 textures/item/。
         # 除了通常去 entity/equipment/ 的护甲图层。
         
-        for root, _, files in os.walk(src_dir):
-            for file in files:
+        if self._asset_index is not None:
+            # 已建立资源索引时直接使用索引，无需再次遍历目录
+            for node, src_files in self._asset_index.items():
+                if node[0] != TEXTURE or self._is_pruned(node):
+                    continue
+                for src_file in src_files:
+                    self._migrate_texture_file(src_dir, src_file)
+            return
+        
+        for root, dirs, files in self.fs.walk(src_dir):
+            dirs.sort() # 按名称顺序遍历，多个源文件对应同一目标文件时结果不依赖文件系统的目录顺序
+            for file in sorted(files):
                 if not file.endswith((".png", ".mcmeta")):
                     continue
                     
-                rel_path = os.path.relpath(root, src_dir)
-                src_file = os.path.join(root, file)
-                
-                # 确定目标位置
-                # IA 护甲图层 (皮肤) 通常在文件名中包含 "layer_"。
-                # 我们希望保持它们的原始结构 (或者如果我们要更严格，则移动到 entity/)。
-                # 但护甲图标 (物品) 应该去 textures/item/。
-                
-                if "layer_" in file:
-                     dest_rel = rel_path
+                self._migrate_texture_file(src_dir, os.path.join(root, file))
+
+    def _texture_dest_file(self, src_dir, src_file):
+        """计算纹理文件在 CE 资源包中的目标路径。"""
+        rel_path = os.path.relpath(os.path.dirname(src_file), src_dir)
+        file = os.path.basename(src_file)
+        
+        # 确定目标位置
+        # IA 护甲图层 (皮肤) 通常在文件名中包含 "layer_"。
+        # 我们希望保持它们的原始结构 (或者如果我们要更严格，则移动到 entity/)。
+        # 但护甲图标 (物品) 应该去 textures/item/。
+        
+        if "layer_" in file:
+             dest_rel = rel_path
+        else:
+            # 如果原路径已经是在 item/ 下，不要重复添加
+            # 使用 os.path.split 或检查开头
+            # 注意 windows 下 rel_path 可能是 "item\\sword.png"
+            parts = rel_path.split(os.sep)
+            if parts[0] == "item":
+                dest_rel = rel_path
+            else:
+                dest_rel = os.path.join("item", rel_path)
+
+        return os.path.join(self.output_path, "assets", self.namespace, "textures", dest_rel, file)
+
+    def _migrate_texture_file(self, src_dir, src_file):
+        dest_file = self._texture_dest_file(src_dir, src_file)
+        os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+        self._copy_file(src_file, dest_file)
+        # print(f"已复制纹理: {file} -> {dest_rel}")
+        suffix = ".mcmeta" if src_file.endswith(".mcmeta") else ".png"
+        self._migrated_textures.setdefault(self._dest_ref(dest_file, "textures"), {})[suffix] = src_file
+        return dest_file
+
+    def _build_texture_report(self):
+        """
+        根据已迁移纹理的 PNG 头和 .mcmeta 动画数据估算内存占用和图集压力 (不解码像素)，
+        结果保存在 texture_report 中。传入引用图时，超出预算的纹理会列出使用它的物品。
+        """
+        textures = {}
+        for ref, files in self._migrated_textures.items():
+            if ".png" in files:
+                info = texture_info(files[".png"], files.get(".mcmeta"), opener=self.fs.open)
+                if info is not None:
+                    textures[ref] = info
+
+        self.texture_report = texture_report(textures, budget=self.texture_budget)
+        for entry in self.texture_report["oversized"]:
+            entry["items"] = sorted(self._items_using((TEXTURE, entry["texture"])))
+            print(f"警告: 纹理 {entry['texture']} 过大 ({entry['width']}x{entry['height']}, {entry['frames']} 帧)"
+                  + (f"，使用它的物品: {', '.join(entry['items'])}" if entry["items"] else ""))
+
+    def _items_using(self, node):
+        """沿引用图向上查找 (经过模型) 引用某个节点的物品和装备。"""
+        if self._graph is None:
+            return set()
+        items = set()
+        seen = {node}
+        queue = [node]
+        while queue:
+            for referrer in self._graph.referrers.get(queue.pop(), ()):
+                parent = (MODEL, referrer)
+                if parent in self._graph.referrers:
+                    if parent not in seen:
+                        seen.add(parent)
+                        queue.append(parent)
                 else:
-                    # 如果原路径已经是在 item/ 下，不要重复添加
-                    # 使用 os.path.split 或检查开头
-                    # 注意 windows 下 rel_path 可能是 "item\\sword.png"
-                    parts = rel_path.split(os.sep)
-                    if parts[0] == "item":
-                        dest_rel = rel_path
-                    else:
-                        dest_rel = os.path.join("item", rel_path)
-
-                dest_dir = os.path.join(self.output_path, "assets", self.namespace, "textures", dest_rel)
-                os.makedirs(dest_dir, exist_ok=True)
-                
-                dest_file = os.path.join(dest_dir, file)
-                shutil.copy2(src_file, dest_file)
-                # print(f"已复制纹理: {file} -> {dest_rel}")
+                    items.add(referrer)
+        return items
 
     def _migrate_models(self):
         """
@@ -107,155 +343,246 @@ class IAMigrator(BaseMigrator):
         if not src_dir:
             return
 
-        for root, _, files in os.walk(src_dir):
-            for file in files:
+        if self._asset_index is not None:
+            for node, src_files in self._asset_index.items():
+                # 被转换器生成的同名模型会覆盖迁移结果，无需迁移
+                if node[0] != MODEL or self._is_pruned(node) or node[1] in self._generated:
+                    continue
+                for src_file in src_files:
+                    self._migrate_model_file(src_dir, src_file)
+            return
+        
+        for root, dirs, files in self.fs.walk(src_dir):
+            dirs.sort()
+            for file in sorted(files):
                 if not file.endswith(".json"):
                     continue
                 
-                rel_path = os.path.relpath(root, src_dir)
-                src_file = os.path.join(root, file)
-                
-                # 移动到 CE 中的 item/ 子目录，防止双重 item/
-                parts = rel_path.split(os.sep)
-                if parts[0] == "item":
-                    dest_rel = rel_path
-                else:
-                    dest_rel = os.path.join("item", rel_path)
-                    
-                dest_dir = os.path.join(self.output_path, "assets", self.namespace, "models", dest_rel)
-                os.makedirs(dest_dir, exist_ok=True)
+                self._migrate_model_file(src_dir, os.path.join(root, file))
+
+    def _model_dest_file(self, src_dir, src_file):
+        """计算模型文件在 CE 资源包中的目标路径。"""
+        rel_path = os.path.relpath(os.path.dirname(src_file), src_dir)
+        
+        # 移动到 CE 中的 item/ 子目录，防止双重 item/
+        parts = rel_path.split(os.sep)
+        if parts[0] == "item":
+            dest_rel = rel_path
+        else:
+            dest_rel = os.path.join("item", rel_path)
+            
+        return os.path.join(self.output_path, "assets", self.namespace, "models", dest_rel, os.path.basename(src_file))
+
+    def _migrate_model_file(self, src_dir, src_file):
+        dest_file = self._model_dest_file(src_dir, src_file)
+        os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+        
+        # 我们需要处理 JSON 内容以修复纹理路径
+        self._process_model_file(src_file, dest_file)
+        return dest_file
+
+    def migrate_files(self, src_files):
+        """
+        增量迁移：只迁移给定的源文件 (纹理、动画或模型)，
+        并为新迁移的物品纹理补充缺失的基础模型。
+        :param src_files: 资源包内的源文件路径列表
+        :return: 已迁移的目标文件路径列表
+        """
+        textures_dir = self._get_resource_dir("textures")
+        models_dir = self._get_resource_dir("models")
+        migrated = []
+        
+        for src_file in src_files:
+            if textures_dir and self._is_within(src_file, textures_dir) and src_file.endswith((".png", ".mcmeta")):
+                dest_file = self._migrate_texture_file(textures_dir, src_file)
+                migrated.append(dest_file)
+                if dest_file.endswith(".png"):
+                    self._generate_item_model_for(dest_file)
+            elif models_dir and self._is_within(src_file, models_dir) and src_file.endswith(".json"):
+                migrated.append(self._migrate_model_file(models_dir, src_file))
                 
-                dest_file = os.path.join(dest_dir, file)
+        return migrated
+
+    def remove_files(self, src_files):
+        """
+        增量迁移：删除已从源资源包中移除的文件所对应的目标文件，
+        以及为移除的物品纹理生成的基础模型。
+        :return: 已删除的目标文件路径列表
+        """
+        textures_dir = self._get_resource_dir("textures")
+        models_dir = self._get_resource_dir("models")
+        removed = []
+        
+        for src_file in src_files:
+            if textures_dir and self._is_within(src_file, textures_dir):
+                dest_file = self._texture_dest_file(textures_dir, src_file)
+            elif models_dir and self._is_within(src_file, models_dir):
+                dest_file = self._model_dest_file(models_dir, src_file)
+            else:
+                continue
+            if os.path.exists(dest_file):
+                os.remove(dest_file)
+                removed.append(dest_file)
+            if dest_file.endswith(".png"):
+                model_file = self._remove_item_model_for(dest_file)
+                if model_file:
+                    removed.append(model_file)
                 
-                # 我们需要处理 JSON 内容以修复纹理路径
-                self._process_model_file(src_file, dest_file)
+        return removed
+
+    def _is_within(self, path, directory):
+        return os.path.commonpath([os.path.abspath(path), os.path.abspath(directory)]) == os.path.abspath(directory)
+
+    def _copy_file(self, src_file, dest_file):
+        self.output_files.add(dest_file)
+        if self.skip_unchanged and os.path.exists(dest_file) and self.fs.getsize(src_file) == os.path.getsize(dest_file):
+            with self.fs.open(src_file, 'rb') as f_src, open(dest_file, 'rb') as f_dest:
+                if f_src.read() == f_dest.read():
+                    return
+        self.fs.copy(src_file, dest_file)
+
+    def _write_json(self, data, file_path):
+        content = json.dumps(data, indent=4)
+        self.output_files.add(file_path)
+        if self.skip_unchanged and os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    return
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
 
     def generate_missing_item_models(self):
         """
         扫描输出纹理并生成基本的物品模型（如果不存在）。
         这处理了使用 IA 'generate: true' 的情况。
         """
+        # 只检查本次迁移写入的纹理 (_generate_item_model_for 会忽略 textures/item/ 之外的纹理)，无需遍历输出目录
+        for dest_file in sorted(self.output_files):
+            if dest_file.endswith(".png"):
+                self._generate_item_model_for(dest_file)
+
+    def _generate_item_model_for(self, texture_file):
+        """为 textures/item/ 下的单个输出纹理生成缺失的基础模型。"""
+        target = self._item_model_for(texture_file)
+        if target is None:
+            return
+        model_file_path, texture_ref = target
+        
+        # 精简模式下只为被引用的模型生成
+        if self._is_pruned((MODEL, texture_ref)):
+            return
+        
+        # 如果模型不存在，则创建它
+        if not os.path.exists(model_file_path):
+            os.makedirs(os.path.dirname(model_file_path), exist_ok=True)
+            self._create_basic_item_model(model_file_path, texture_ref)
+            # print(f"已生成缺失的模型: {model_file_path}")
+
+    def _item_model_for(self, texture_file):
+        """
+        textures/item/ 下的输出纹理对应的基础模型。
+        :return: (模型文件路径, 纹理引用)，纹理不在 textures/item/ 下时返回 None
+        """
         # 目标模型目录: assets/<namespace>/models/item/
         models_dir = os.path.join(self.output_path, "assets", self.namespace, "models", "item")
-        # 目标纹理目录: assets/<namespace>/textures/item/
         textures_dir = os.path.join(self.output_path, "assets", self.namespace, "textures", "item")
         
-        if not os.path.exists(textures_dir):
-            return
-
-        for root, _, files in os.walk(textures_dir):
-            for file in files:
-                if not file.endswith(".png"):
-                    continue
-                
-                # 来自 textures/item/ 的相对路径
-                rel_path = os.path.relpath(root, textures_dir)
-                texture_name = file[:-4]
-                
-                # 对应的模型路径
-                if rel_path == ".":
-                    model_rel_dir = models_dir
-                    texture_ref = f"{self.namespace}:item/{texture_name}"
-                else:
-                    model_rel_dir = os.path.join(models_dir, rel_path)
-                    # 纹理引用必须使用正斜杠
-                    rel_path_fwd = rel_path.replace("\\", "/")
-                    texture_ref = f"{self.namespace}:item/{rel_path_fwd}/{texture_name}"
+        # 来自 textures/item/ 的相对路径
+        rel_path = os.path.relpath(os.path.dirname(texture_file), textures_dir)
+        if rel_path == ".." or rel_path.startswith(".." + os.sep):
+            return None
+        texture_name = os.path.basename(texture_file)[:-4]
+        
+        # 对应的模型路径
+        if rel_path == ".":
+            model_rel_dir = models_dir
+            texture_ref = f"{self.namespace}:item/{texture_name}"
+        else:
+            model_rel_dir = os.path.join(models_dir, rel_path)
+            # 纹理引用必须使用正斜杠
+            rel_path_fwd = rel_path.replace("\\", "/")
+            texture_ref = f"{self.namespace}:item/{rel_path_fwd}/{texture_name}"
 
-                model_file_path = os.path.join(model_rel_dir, f"{texture_name}.json")
-                
-                # 如果模型不存在，则创建它
-                if not os.path.exists(model_file_path):
-                    os.makedirs(model_rel_dir, exist_ok=True)
-                    self._create_basic_item_model(model_file_path, texture_ref)
-                    # print(f"已生成缺失的模型: {model_file_path}")
+        return os.path.join(model_rel_dir, f"{texture_name}.json"), texture_ref
 
-    def _create_basic_item_model(self, file_path, texture_ref):
-        data = {
+    def _basic_item_model(self, texture_ref):
+        return {
             "parent": "minecraft:item/generated",
             "textures": {
                 "layer0": texture_ref
             }
         }
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
+
+    def _create_basic_item_model(self, file_path, texture_ref):
+        self._write_json(self._basic_item_model(texture_ref), file_path)
+
+    def _remove_item_model_for(self, texture_file):
+        """
+        删除为已移除的纹理生成的基础模型。
+        只删除内容仍是基础模型的文件，同名的迁移模型 (来自源资源包) 不受影响。
+        :return: 删除的模型文件路径 (未删除时返回 None)
+        """
+        target = self._item_model_for(texture_file)
+        if target is None:
+            return None
+        model_file_path, texture_ref = target
+        try:
+            with open(model_file_path, 'r', encoding='utf-8') as f:
+                if json.load(f) != self._basic_item_model(texture_ref):
+                    return None
+        except (OSError, ValueError):
+            return None
+        os.remove(model_file_path)
+        return model_file_path
 
     def _process_model_file(self, src_file, dest_file):
         try:
-            with open(src_file, 'r', encoding='utf-8') as f:
+            with self.fs.open(src_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
-            # 移除非 minecraft 的 parent 引用
-            if "parent" in data:
-                parent_val = data["parent"]
-                if not parent_val.startswith("minecraft:"):
-                    del data["parent"]
-
-            # 修复纹理路径
-            # IA: <namespace>:<path> (相对于 textures/)
-            # CE: <namespace>:item/<path> (我们将它们移动到了 item/)
-            # 
-            # 如果转换过程中更改了命名空间，
-            # 模型文件中的旧命名空间引用也必须更新为新的命名空间。
-            
-            if "textures" in data:
-                new_textures = {}
-                for key, val in data["textures"].items():
-                    # 检查是否包含命名空间引用 (:)
-                    if ":" in val:
-                        parts = val.split(":", 1)
-                        ns = parts[0]
-                        path_part = parts[1]
-                        
-                        # 如果是外部引用 (minecraft 或其他)，保持原样
-                        if ns == "minecraft":
-                             new_textures[key] = val
-                             continue
-                             
-                        # 如果是旧命名空间（或者是当前处理的命名空间），我们需要更新它
-                        # 应用路径调整逻辑 (移动到 item/)
-                        if "layer" not in path_part and "armor" not in path_part and not path_part.startswith("item/"):
-                             new_path = f"item/{path_part}"
-                        else:
-                             new_path = path_part
-                             
-                        new_val = f"{self.namespace}:{new_path}"
-                        new_textures[key] = new_val
-                    else:
-                        # 没有命名空间（例如 "#texture" 引用或纯路径），保持原样或添加当前命名空间
-                        if val.startswith("#"):
-                             new_textures[key] = val
-                        else:
-                             # 可能是相对路径，加上命名空间
-                             if "layer" not in val and "armor" not in val and not val.startswith("item/"):
-                                  new_path = f"item/{val}"
-                             else:
-                                  new_path = val
-                             new_textures[key] = f"{self.namespace}:{new_path}"
-
-                data["textures"] = new_textures
-            
-            # 修复 overrides/predicates (如果有) (指向其他模型)
-            if "overrides" in data:
-                for override in data["overrides"]:
-                    if "model" in override:
-                        model_val = override["model"]
-                        if ":" in model_val:
-                            parts = model_val.split(":", 1)
-                            ns = parts[0]
-                            path_part = parts[1]
-                            
-                            if ns != "minecraft":
-                                if not path_part.startswith("item/"):
-                                    path_part = f"item/{path_part}"
-                                override["model"] = f"{self.namespace}:{path_part}"
-
-            with open(dest_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
+            self._transform_model(data)
+
+            self._write_json(data, dest_file)
                 
         except Exception as e:
             print(f"处理模型 {src_file} 时出错: {e}")
 
+    def _transform_model(self, data):
+        """将 IA 模型数据中的引用就地改写为 CE 格式。"""
+        # 移除非 minecraft 的 parent 引用
+        if "parent" in data:
+            parent_val = data["parent"]
+            if not parent_val.startswith("minecraft:"):
+                del data["parent"]
+
+        # 修复纹理路径
+        # IA: <namespace>:<path> (相对于 textures/)
+        # CE: <namespace>:item/<path> (我们将它们移动到了 item/)
+        # 
+        # 如果转换过程中更改了命名空间，
+        # 模型文件中的旧命名空间引用也必须更新为新的命名空间。
+        
+        if "textures" in data:
+            new_textures = {}
+            for key, val in data["textures"].items():
+                new_textures[key] = self._map_texture_ref(val)
+
+            data["textures"] = new_textures
+        
+        # 修复 overrides/predicates (如果有) (指向其他模型)
+        if "overrides" in data:
+            for override in data["overrides"]:
+                if "model" in override:
+                    override["model"] = self._map_model_ref(override["model"])
+
+        return data
+
+    def _map_texture_ref(self, val):
+        return self.namespace_map.texture(val)
+
+    def _map_model_ref(self, model_val):
+        return self.namespace_map.model(model_val)
+
     def _migrate_sounds(self):
         # 占位符
         pass
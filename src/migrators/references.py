@@ -0,0 +1,107 @@
+from collections import deque
+from collections.abc import Mapping
+
+# 引用图中的节点为 (类型, CE 引用)，例如 ("model", "ns:item/chair")、("texture", "ns:item/wood")
+MODEL = "model"
+TEXTURE = "texture"
+
+class ReferenceGraph:
+    """
+    资源引用图。
+    根节点来自转换后的 CE 配置 (物品 model.path、模板参数、装备图层)，
+    模型节点的边 (textures / overrides) 在遍历时按需从模型文件中读取。
+    所有存在性检查都基于内存中的资源索引，不会对每个引用调用 os.path.exists。
+    """
+
+    def __init__(self):
+        self.roots = set()
+        self.referrers = {}   # 节点 -> 引用它的物品/装备/模型集合
+        self.generated = {}   # 由转换器生成的模型节点 -> 其引用的节点列表
+
+    def add_root(self, node, referrer):
+        self.roots.add(node)
+        self.referrers.setdefault(node, set()).add(referrer)
+
+    def add_ce_config(self, ce_config, generated_models=None, namespace=None):
+        """
+        从 CE 配置中收集根引用。可以多次调用 (流式转换时每个分片调用一次)。
+        :param ce_config: 包含 items / equipments 的 CE 配置
+        :param generated_models: 转换器生成的模型 {相对路径: 模型数据}
+        :param namespace: 生成模型所在的命名空间
+        """
+        for item_id, ce_item in ce_config.get("items", {}).items():
+            for ref in self._collect_model_refs(ce_item.get("model")):
+                self.add_root((MODEL, ref), item_id)
+
+        for eq_id, ce_eq in ce_config.get("equipments", {}).items():
+            for key in ("humanoid", "humanoid-leggings"):
+                ref = ce_eq.get(key)
+                if isinstance(ref, str) and not ref.startswith("minecraft:"):
+                    self.add_root((TEXTURE, ref), eq_id)
+
+        if generated_models and namespace:
+            for rel_path, content in generated_models.items():
+                ref = f"{namespace}:{rel_path[:-5] if rel_path.endswith('.json') else rel_path}"
+                targets = [
+                    (TEXTURE, val) for val in content.get("textures", {}).values()
+                    if isinstance(val, str) and not val.startswith(("#", "minecraft:"))
+                ]
+                self.generated[(MODEL, ref)] = targets
+
+    def _collect_model_refs(self, model):
+        """递归收集物品模型定义中的模型引用 (path 字段与模板参数)。"""
+        refs = []
+        if isinstance(model, Mapping):
+            for key, value in model.items():
+                if key == "path" and isinstance(value, str):
+                    refs.append(value)
+                elif key == "arguments" and isinstance(value, Mapping):
+                    refs.extend(v for v in value.values() if isinstance(v, str))
+                else:
+                    refs.extend(self._collect_model_refs(value))
+        elif isinstance(model, list):
+            for value in model:
+                refs.extend(self._collect_model_refs(value))
+        return [ref for ref in refs if ":" in ref and not ref.startswith(("minecraft:", "${"))]
+
+    def resolve(self, asset_index, load_edges, external_namespaces=()):
+        """
+        从根节点出发遍历引用图。
+        :param asset_index: 资源索引 {节点: [源文件, ...]}
+        :param load_edges: 回调函数，返回索引中某个模型节点引用的节点列表
+        :param external_namespaces: 由其他命名空间分组迁移的命名空间 (多命名空间物品包)，
+                                    指向这些命名空间的引用不在本索引中检查，也不视为悬空
+        :return: (可达节点集合, 悬空引用 {节点: 引用者集合})
+        """
+        reachable = set()
+        dangling = {}
+        queue = deque(self.roots)
+
+        while queue:
+            node = queue.popleft()
+            if node in reachable:
+                continue
+            reachable.add(node)
+
+            kind, ref = node
+            if node in self.generated:
+                targets = self.generated[node]
+            elif node in asset_index:
+                targets = load_edges(node) if kind == MODEL else []
+            elif kind == MODEL and ref.split(":", 1)[-1].startswith("item/") and (TEXTURE, ref) in asset_index:
+                # 迁移时会为 textures/item/ 下的纹理自动生成同名的基础模型
+                targets = [(TEXTURE, ref)]
+            elif ref.split(":", 1)[0] in external_namespaces:
+                continue
+            else:
+                dangling[node] = self.referrers.get(node, set())
+                continue
+
+            for target in targets:
+                if target[1].startswith("minecraft:"):
+                    continue
+                self.referrers.setdefault(target, set()).add(ref)
+                if target not in reachable:
+                    queue.append(target)
+
+        return reachable, dangling
@@ -0,0 +1,62 @@
+class NamespaceMap:
+    """
+    命名空间映射表: 源命名空间 -> 目标命名空间。
+    多命名空间物品包按命名空间分组转换时，所有分组共用同一张映射表改写跨命名空间的模型和纹理引用。
+    每个引用字符串只在第一次出现时解析，结果缓存在表中，之后的相同引用直接查表。
+    不在映射表中的命名空间 (以及未写命名空间的引用) 映射到 default (当前转换的命名空间)。
+    """
+
+    def __init__(self, mapping=None, default=None):
+        self.mapping = dict(mapping or {})
+        self.default = default
+        self._textures = {}
+        self._models = {}
+
+    def scoped(self, default):
+        """返回共用映射表、但 default 不同的映射 (用于某个命名空间分组)。"""
+        return NamespaceMap(self.mapping, default)
+
+    def target(self, namespace):
+        """源命名空间对应的目标命名空间 (minecraft 保持不变)。"""
+        if namespace == "minecraft":
+            return namespace
+        return self.mapping.get(namespace, self.default)
+
+    def texture(self, ref):
+        """
+        IA 纹理引用 -> CE 纹理引用。
+        IA: <namespace>:<path> (相对于 textures/)
+        CE: <namespace>:item/<path> (护甲图层和已在 item/ 下的纹理保持原路径)
+        """
+        mapped = self._textures.get(ref)
+        if mapped is None:
+            mapped = self._textures[ref] = self._map_texture(ref)
+        return mapped
+
+    def model(self, ref):
+        """IA 模型引用 -> CE 模型引用 (<namespace>:item/<path>)，未写命名空间的引用保持原样。"""
+        mapped = self._models.get(ref)
+        if mapped is None:
+            mapped = self._models[ref] = self._map_model(ref)
+        return mapped
+
+    def _map_texture(self, ref):
+        namespace, sep, path = ref.partition(":")
+        if not sep:
+            # 没有命名空间: "#texture" 变量保持原样，其余视为当前命名空间下的相对路径
+            if ref.startswith("#"):
+                return ref
+            namespace, path = None, ref
+        elif namespace == "minecraft":
+            return ref
+        if "layer" not in path and "armor" not in path and not path.startswith("item/"):
+            path = f"item/{path}"
+        return f"{self.target(namespace)}:{path}"
+
+    def _map_model(self, ref):
+        namespace, sep, path = ref.partition(":")
+        if not sep or namespace == "minecraft":
+            return ref
+        if not path.startswith("item/"):
+            path = f"item/{path}"
+        return f"{self.target(namespace)}:{path}"
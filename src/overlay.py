@@ -0,0 +1,131 @@
+import os
+import shutil
+
+class PathOverlay:
+    """
+    只读的路径重映射层。
+    将虚拟路径 (例如重组后的 assets/<namespace>) 映射到解压目录中的真实路径，
+    转换过程通过它读取源文件，而不是移动或重命名解压目录中的文件夹。
+    这样同一个上传可以被多次 (或同时) 以不同的命名空间转换，而无需重新解压或复制。
+    没有挂载点时，所有路径都原样访问真实文件系统。
+    设置了文件清单 (FileManifest) 或压缩包文件系统 (ZipFS) 时，其根目录下的存在性检查、目录列表、
+    遍历和文件读取都由它完成，不再访问文件系统 (ZipFS 的根目录不需要在磁盘上存在)。
+    """
+
+    def __init__(self, mounts=None, manifest=None):
+        self.mounts = [] # (虚拟路径, 真实路径)，按虚拟路径长度降序排列
+        self.manifest = manifest
+        for virtual_path, real_path in (mounts or []):
+            self.mount(virtual_path, real_path)
+
+    def mount(self, virtual_path, real_path):
+        """将 virtual_path 映射到 real_path (后挂载的同名路径会覆盖之前的挂载)。"""
+        virtual_path = os.path.abspath(virtual_path)
+        self.mounts = [m for m in self.mounts if m[0] != virtual_path]
+        self.mounts.append((virtual_path, os.path.abspath(real_path)))
+        self.mounts.sort(key=lambda m: len(m[0]), reverse=True)
+
+    def __getstate__(self):
+        # 只需要挂载表和文件清单即可在工作进程中重建
+        return {"mounts": self.mounts, "manifest": self.manifest}
+
+    def __setstate__(self, state):
+        self.mounts = state["mounts"]
+        self.manifest = state.get("manifest")
+
+    def resolve(self, path):
+        """将虚拟路径解析为真实路径。"""
+        if not self.mounts:
+            return path
+        abs_path = os.path.abspath(path)
+        for virtual_path, real_path in self.mounts:
+            if abs_path == virtual_path:
+                return real_path
+            if abs_path.startswith(virtual_path + os.sep):
+                return real_path + abs_path[len(virtual_path):]
+        return path
+
+    def _mount_children(self, path):
+        """返回挂载点在 path 下直接产生的虚拟子目录名。"""
+        abs_path = os.path.abspath(path)
+        prefix = abs_path.rstrip(os.sep) + os.sep
+        children = []
+        for virtual_path, _ in self.mounts:
+            if virtual_path.startswith(prefix):
+                name = virtual_path[len(prefix):].split(os.sep, 1)[0]
+                if name not in children:
+                    children.append(name)
+        return children
+
+    def _manifest_for(self, real_path):
+        """返回可以回答 real_path 查询的文件清单 (没有时返回 None)。"""
+        if self.manifest is not None and self.manifest.contains(real_path):
+            return self.manifest
+        return None
+
+    def exists(self, path):
+        real_path = self.resolve(path)
+        manifest = self._manifest_for(real_path)
+        found = manifest.exists(real_path) if manifest else os.path.exists(real_path)
+        return found or bool(self._mount_children(path))
+
+    def isdir(self, path):
+        real_path = self.resolve(path)
+        manifest = self._manifest_for(real_path)
+        found = manifest.isdir(real_path) if manifest else os.path.isdir(real_path)
+        return found or bool(self._mount_children(path))
+
+    def listdir(self, path):
+        names = []
+        real_path = self.resolve(path)
+        manifest = self._manifest_for(real_path)
+        if manifest:
+            if manifest.isdir(real_path):
+                names = manifest.listdir(real_path)
+        elif os.path.isdir(real_path):
+            names = os.listdir(real_path)
+        for name in self._mount_children(path):
+            if name not in names:
+                names.append(name)
+        return names
+
+    def walk(self, top):
+        """与 os.walk 相同，但返回的路径均为虚拟路径。"""
+        if not self._mount_children(top):
+            # 子树中没有挂载点，直接遍历真实目录并把路径换回虚拟路径
+            real_top = self.resolve(top)
+            manifest = self._manifest_for(real_top)
+            for root, dirs, files in (manifest.walk if manifest else os.walk)(real_top):
+                yield top + root[len(real_top):], dirs, files
+            return
+
+        dirs, files = [], []
+        for name in self.listdir(top):
+            if self.isdir(os.path.join(top, name)):
+                dirs.append(name)
+            else:
+                files.append(name)
+        yield top, dirs, files
+        for name in dirs:
+            yield from self.walk(os.path.join(top, name))
+
+    def open(self, path, mode='r', **kwargs):
+        if any(flag in mode for flag in ("w", "a", "+", "x")):
+            raise PermissionError(f"路径重映射层是只读的: {path}")
+        real_path = self.resolve(path)
+        manifest = self._manifest_for(real_path)
+        return manifest.open(real_path, mode, **kwargs) if manifest else open(real_path, mode, **kwargs)
+
+    def copy(self, path, dest_file):
+        """将源文件复制到输出路径 dest_file。"""
+        real_path = self.resolve(path)
+        manifest = self._manifest_for(real_path)
+        if manifest:
+            manifest.copy(real_path, dest_file)
+        else:
+            shutil.copy2(real_path, dest_file)
+
+    def getsize(self, path):
+        real_path = self.resolve(path)
+        manifest = self._manifest_for(real_path)
+        return manifest.getsize(real_path) if manifest else os.path.getsize(real_path)
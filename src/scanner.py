@@ -0,0 +1,248 @@
+import os
+
+def scan_ia_sources(extract_dir, manifest=None):
+    """
+    扫描目录，定位 ItemsAdder 的配置文件和资源包。
+    改进逻辑: 扫描所有 YAML 文件并根据内容进行分类。
+    :param extract_dir: 解压后的上传目录 (或本地 IA 目录)
+    :param manifest: extract_dir 的文件清单 (FileManifest) 或压缩包文件系统 (ZipFS)，
+                     提供时从中获取目录结构和读取配置文件，而不访问文件系统
+    :return: 扫描结果字典
+        scan_root          - 实际扫描的根目录 (找到 ItemsAdder 文件夹时指向该文件夹)
+        items_configs      - 物品配置文件列表 (items/equipments/armors_rendering)
+        categories_configs - 分类配置文件列表
+        resourcepack_path  - 资源包根目录 (未找到时为 None)
+        info               - 找到的第一个物品配置的 info
+        item_index         - 物品键 -> 定义它的配置文件 (同名物品以最后一个为准，与合并逻辑一致)
+        config_namespaces  - 配置文件 -> 该文件自身的 info.namespace (未写时为 None)
+        resourcepack_paths - 所有候选资源包根目录 (多命名空间物品包的各个命名空间可能位于不同的资源包)
+    """
+    ia_items_configs = []
+    ia_categories_configs = []
+    ia_resourcepack_path = None
+    ia_info = {}
+    item_index = {}
+    config_namespaces = {}
+    resourcepack_paths = []
+
+    walk = manifest.walk if manifest is not None else os.walk
+    opener = manifest.open if manifest is not None else open
+
+    # 0. 确定扫描根目录
+    scan_root = extract_dir
+    found_ia_dir = False
+    for root, dirs, files in walk(extract_dir):
+        dirs.sort()
+        for d in dirs:
+            if d.lower() == "itemsadder":
+                scan_root = os.path.join(root, d)
+                found_ia_dir = True
+                break
+        if found_ia_dir:
+            break
+
+    if found_ia_dir:
+         print(f"Detected ItemsAdder root at: {scan_root}")
+
+    # 第一遍扫描：查找配置文件和标准资源包结构
+    # 目录和文件按名称排序遍历，配置的合并顺序 (以及输出中物品的顺序) 不依赖文件系统的目录顺序
+    for root, dirs, files in walk(scan_root):
+        dirs.sort()
+        # --- 资源包检测 ---
+        # 优先级 1: 显式的 "resourcepack" 目录
+        if "resourcepack" in dirs:
+            resourcepack_paths.append(os.path.join(root, "resourcepack"))
+            if ia_resourcepack_path is None:
+                ia_resourcepack_path = os.path.join(root, "resourcepack")
+
+        # 优先级 2: 直接包含 assets 的目录
+        if "assets" in dirs:
+            resourcepack_paths.append(root)
+            if ia_resourcepack_path is None:
+                ia_resourcepack_path = root
+
+        # 优先级 3: 直接包含 models 和 textures 的目录 (非标准结构)
+        if "models" in dirs and "textures" in dirs and ia_resourcepack_path is None:
+            ia_resourcepack_path = root
+
+        # --- 配置文件检测 ---
+        for f in sorted(files):
+            if f.endswith(".yml") or f.endswith(".yaml"):
+                full_path = os.path.join(root, f)
+                # 只读取顶层键、info 和物品键，不构建物品数据 (超大配置文件的扫描内存与文件大小无关)
+                kind, summary = summarize_config(full_path, opener)
+                if kind in ("items", "categories"):
+                    info = summary["info"]
+                    config_namespaces[full_path] = info.get("namespace") if isinstance(info, dict) else None
+                if kind == "items":
+                    ia_items_configs.append(full_path)
+                    if "info" in summary["keys"] and not ia_info:
+                        ia_info = summary["info"] # 使用找到的第一个 info
+                    for key in summary["item_keys"]:
+                        item_index[key] = full_path
+                elif kind == "categories":
+                    ia_categories_configs.append(full_path)
+
+    # 如果仍未找到资源包，尝试寻找 textures/models 的父级 (处理非标准结构)
+    if ia_resourcepack_path is None:
+        # 如果有配置文件，默认为提取根目录
+        if ia_items_configs:
+            ia_resourcepack_path = extract_dir
+
+    return {
+        "scan_root": scan_root,
+        "items_configs": ia_items_configs,
+        "categories_configs": ia_categories_configs,
+        "resourcepack_path": ia_resourcepack_path,
+        "info": ia_info,
+        "item_index": item_index,
+        "config_namespaces": config_namespaces,
+        "resourcepack_paths": list(dict.fromkeys(resourcepack_paths))
+    }
+
+def group_by_namespace(sources, exists=os.path.exists):
+    """
+    按配置文件自身的 info.namespace 将扫描结果分组。
+    未写 info.namespace 的配置文件归入第一个 info 的命名空间 (与合并所有配置时使用的命名空间一致)。
+    每个命名空间使用包含 assets/<namespace> 的候选资源包，都不包含时使用默认资源包。
+    :param sources: scan_ia_sources 的扫描结果
+    :param exists: 检查路径是否存在的函数 (例如 FileManifest.exists)
+    :return: {源命名空间: {"items_configs", "categories_configs", "resourcepack_path", "info"}}，按首次出现的顺序
+    """
+    default_namespace = sources["info"].get("namespace", "converted")
+    config_namespaces = sources.get("config_namespaces", {})
+    groups = {}
+
+    def group_for(config_path):
+        namespace = config_namespaces.get(config_path) or default_namespace
+        if namespace not in groups:
+            groups[namespace] = {
+                "items_configs": [],
+                "categories_configs": [],
+                "resourcepack_path": sources["resourcepack_path"],
+                "info": {**sources["info"], "namespace": namespace}
+            }
+            for candidate in sources.get("resourcepack_paths", []):
+                if exists(os.path.join(candidate, "assets", namespace)):
+                    groups[namespace]["resourcepack_path"] = candidate
+                    break
+        return groups[namespace]
+
+    for config_path in sources["items_configs"]:
+        group_for(config_path)["items_configs"].append(config_path)
+    for config_path in sources["categories_configs"]:
+        # 没有物品的命名空间不单独转换，其分类归入默认命名空间
+        group = groups.get(config_namespaces.get(config_path)) or groups.get(default_namespace)
+        if group is not None:
+            group["categories_configs"].append(config_path)
+    return groups
+
+def classify_config(file_path, opener=open):
+    """
+    根据内容判断 YAML 文件的类型。
+    :param opener: 打开文件的函数 (例如 ZipFS.open)
+    :return: (类型, 数据)，类型为 "items"、"categories" 或 None
+    """
+    import yaml
+    try:
+        with opener(file_path, 'r', encoding='utf-8') as yml_file:
+            data = yaml.safe_load(yml_file)
+    except Exception:
+        return None, None
+    if not isinstance(data, dict):
+        return None, data
+    return _config_kind(data), data
+
+def _config_kind(keys):
+    # 检查关键签名
+    if "items" in keys or "equipments" in keys or "armors_rendering" in keys:
+        return "items"
+    elif "categories" in keys:
+        return "categories"
+    return None
+
+def summarize_config(file_path, opener=open):
+    """
+    只根据顶层键判断 YAML 文件的类型，并读取 info 和 items 中的物品键。
+    按事件流解析，其余顶层条目和物品数据直接跳过、不构建，峰值内存与文件大小无关。
+    遇到事件流无法处理的写法 (items 为别名或使用合并键、引用被跳过内容中的锚点等) 时完整载入文件。
+    :param opener: 打开文件的函数 (例如 ZipFS.open)
+    :return: (类型, {"keys": 顶层键集合, "info": info 或 None, "item_keys": 物品键列表})，类型与 classify_config 相同
+    """
+    import yaml
+    try:
+        with opener(file_path, 'r', encoding='utf-8') as yml_file:
+            summary = _summarize_events(yaml.SafeLoader(yml_file))
+    except yaml.YAMLError:
+        summary = None
+    except Exception:
+        return None, None
+    if summary is None:
+        kind, data = classify_config(file_path, opener)
+        if kind is None:
+            return None, None
+        items = data.get("items")
+        return kind, {
+            "keys": set(data),
+            "info": data.get("info"),
+            "item_keys": list(items) if isinstance(items, dict) else []
+        }
+    return _config_kind(summary["keys"]), summary
+
+def _summarize_events(loader):
+    """summarize_config 的事件流实现，需要完整载入时返回 None。"""
+    import yaml
+
+    def skip_node():
+        depth = 0
+        while True:
+            event = loader.get_event()
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                depth += 1
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                depth -= 1
+            if depth == 0:
+                return
+
+    def construct_node():
+        return loader.construct_document(loader.compose_node(None, None))
+
+    def is_merge_key():
+        event = loader.peek_event()
+        return isinstance(event, yaml.ScalarEvent) and event.value == "<<" and event.implicit[0]
+
+    summary = {"keys": set(), "info": None, "item_keys": []}
+    try:
+        loader.get_event() # StreamStart
+        if loader.check_event(yaml.StreamEndEvent):
+            return summary
+        loader.get_event() # DocumentStart
+        if not loader.check_event(yaml.MappingStartEvent):
+            return summary
+        loader.get_event()
+        while not loader.check_event(yaml.MappingEndEvent):
+            if is_merge_key():
+                return None
+            key = construct_node()
+            summary["keys"].add(key)
+            if key == "info":
+                summary["info"] = construct_node()
+            elif key == "items" and loader.check_event(yaml.MappingStartEvent):
+                loader.get_event()
+                item_keys = {}
+                while not loader.check_event(yaml.MappingEndEvent):
+                    if is_merge_key():
+                        return None
+                    item_keys[construct_node()] = None
+                    skip_node()
+                loader.get_event()
+                summary["item_keys"] = list(item_keys)
+            elif key == "items" and loader.check_event(yaml.AliasEvent):
+                return None
+            else:
+                if key == "items":
+                    summary["item_keys"] = []
+                skip_node()
+        return summary
+    finally:
+        loader.dispose()
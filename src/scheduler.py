@@ -0,0 +1,263 @@
+import os
+import time
+import uuid
+import signal
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+
+try:
+    import resource # 仅 Unix 可用
+except ImportError:
+    resource = None
+
+# 看门狗统计任务进程组资源占用的间隔 (秒)
+WATCHDOG_INTERVAL = 0.5
+
+class QueueFullError(Exception):
+    """等待队列已满。retry_after 为建议的重试等待时间 (秒)。"""
+
+    def __init__(self, retry_after):
+        super().__init__("转换队列已满")
+        self.retry_after = retry_after
+
+class Job:
+    def __init__(self, func, args):
+        self.job_id = str(uuid.uuid4())
+        self.func = func
+        self.args = args
+        self.status = "queued" # queued / running / done
+        self.future = Future()  # 结果为 func 的返回值
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+def _apply_limits(memory_limit_mb, cpu_time_limit):
+    """在工作进程中设置资源限制 (不支持 resource 模块的平台上跳过)。"""
+    if resource is None:
+        return
+    if memory_limit_mb:
+        limit = int(memory_limit_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_time_limit:
+        # 超过软限制时进程收到 SIGXCPU 并终止，硬限制留出少量余量
+        limit = int(cpu_time_limit)
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, limit + 5))
+
+def _job_process(conn, func, args, memory_limit_mb, cpu_time_limit):
+    """工作进程入口：设置资源限制后执行任务，通过管道返回 (是否成功, 结果或错误信息)。"""
+    try:
+        if hasattr(os, "setsid"):
+            # 任务进程和它启动的进程池 (并行转换、多命名空间分组) 位于同一个进程组，看门狗按进程组统计和终止
+            os.setsid()
+        _apply_limits(memory_limit_mb, cpu_time_limit)
+        conn.send((True, func(*args)))
+    except BaseException as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+def _process_group_usage(pgid):
+    """
+    统计进程组 (任务进程及其所有子进程) 的常驻内存 (字节) 和 CPU 时间 (秒)，从 /proc 读取，不可用时返回 None。
+    已退出并被回收的子进程的 CPU 时间计入回收它的进程的 cutime/cstime，不会遗漏或重复计算。
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    ticks = os.sysconf("SC_CLK_TCK")
+    rss = cpu = 0
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as f:
+                # 进程名可能包含空格和括号，从最后一个 ")" 之后开始是 proc(5) 中的第 3 个字段 (state)
+                fields = f.read().rsplit(b")", 1)[1].split()
+            if int(fields[2]) != pgid:
+                continue
+            cpu += sum(int(value) for value in fields[11:15]) # utime, stime, cutime, cstime
+            rss += int(fields[21]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return rss, cpu / ticks
+
+class ConversionScheduler:
+    """
+    转换任务调度器 (准入控制)。
+    同时运行的任务数不超过 max_jobs，其余任务排队并可以查询排队位置；
+    排队任务数达到 max_queue 后，新的任务立即被拒绝 (QueueFullError)。
+    每个任务在独立的工作进程 (及其进程组) 中执行。任务自身可能启动进程池，setrlimit 只限制单个进程，
+    因此内存和 CPU 时间上限按整个进程组计算: 看门狗定期汇总进程组的常驻内存和 CPU 时间 (Linux，读取 /proc)，
+    超出时终止整个进程组。setrlimit 仍作为单个进程的上限保留 (没有 /proc 的 Unix 平台上只有这一层限制)。
+    """
+
+    def __init__(self, max_jobs=2, max_queue=8, memory_limit_mb=None, cpu_time_limit=None,
+                 keep_finished=3600):
+        """
+        :param memory_limit_mb: 每个任务 (含其子进程) 的内存上限 (MB)，None 表示不限制
+        :param cpu_time_limit: 每个任务 (含其子进程) 的 CPU 时间上限 (秒)，None 表示不限制
+        :param keep_finished: 已完成任务的结果保留时间 (秒)
+        """
+        self.max_jobs = max(1, max_jobs)
+        self.max_queue = max_queue
+        self.memory_limit_mb = memory_limit_mb
+        self.cpu_time_limit = cpu_time_limit
+        self.keep_finished = keep_finished
+        self.lock = threading.Lock()
+        self.queue = deque()
+        self.running = set()
+        self.jobs = {}
+        self.average_duration = 10.0 # 任务平均耗时的估计值 (秒)，用于 Retry-After
+
+    def submit(self, func, *args):
+        """
+        提交任务。func 和参数需要可以被 pickle (工作进程使用 spawn 启动时)。
+        :return: Job
+        :raises QueueFullError: 排队任务数已达上限
+        """
+        with self.lock:
+            self._forget_finished()
+            if len(self.queue) >= self.max_queue:
+                raise QueueFullError(self._estimate_wait(len(self.queue)))
+            job = Job(func, args)
+            self.jobs[job.job_id] = job
+            self.queue.append(job)
+            self._dispatch()
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def position(self, job):
+        """排队位置 (从 1 开始)，已开始运行或已完成的任务返回 0。"""
+        with self.lock:
+            try:
+                return self.queue.index(job) + 1
+            except ValueError:
+                return 0
+
+    def estimated_wait(self, job):
+        """任务开始运行前预计的等待时间 (秒)。"""
+        position = self.position(job)
+        with self.lock:
+            return self._estimate_wait(position - 1) if position else 0
+
+    def _estimate_wait(self, jobs_ahead):
+        # 前面的任务 (含正在运行的) 按 max_jobs 个并发执行
+        return int(self.average_duration * (jobs_ahead // self.max_jobs + 1)) + 1
+
+    def _dispatch(self):
+        # 调用方需持有 self.lock
+        while self.queue and len(self.running) < self.max_jobs:
+            job = self.queue.popleft()
+            job.status = "running"
+            self.running.add(job)
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job):
+        started = time.time()
+        try:
+            ok, result = self._run_in_process(job)
+            error = None if ok else RuntimeError(result)
+        except Exception as e:
+            result, error = None, e
+        with self.lock:
+            duration = time.time() - started
+            self.average_duration = self.average_duration * 0.8 + duration * 0.2
+            job.status = "done"
+            job.finished_at = time.time()
+            self.running.discard(job)
+            self._dispatch()
+        if error is None:
+            job.future.set_result(result)
+        else:
+            job.future.set_exception(error)
+
+    def _run_in_process(self, job):
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_job_process,
+            args=(child_conn, job.func, job.args, self.memory_limit_mb, self.cpu_time_limit),
+            daemon=False # 任务自身可能使用进程池 (并行转换)
+        )
+        process.start()
+        child_conn.close()
+        try:
+            result = self._wait_for_result(process, parent_conn)
+        finally:
+            parent_conn.close()
+            process.join()
+        if result is None:
+            # 进程没有返回结果就退出了 (例如超出 CPU 时间限制被终止)
+            result = (False, f"转换进程异常退出 (退出码 {process.exitcode})，可能超出了内存或 CPU 时间限制")
+        return result
+
+    def _wait_for_result(self, process, conn):
+        """
+        等待任务进程返回结果，同时按进程组检查内存和 CPU 时间，超出时终止整个进程组。
+        :return: (是否成功, 结果或错误信息)，进程没有返回结果就退出时返回 None
+        """
+        watched = bool(self.memory_limit_mb or self.cpu_time_limit) and hasattr(os, "killpg")
+        while not conn.poll(WATCHDOG_INTERVAL if watched else None):
+            if not process.is_alive():
+                # 进程可能在发送结果后刚刚退出
+                if conn.poll():
+                    break
+                return None
+            error = self._check_usage(process.pid)
+            if error:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except OSError:
+                    process.kill()
+                return (False, error)
+        try:
+            return conn.recv()
+        except EOFError:
+            return None
+
+    def _check_usage(self, pgid):
+        """进程组超出内存或 CPU 时间上限时返回错误信息。"""
+        try:
+            if os.getpgid(pgid) != pgid:
+                return None # 任务进程尚未建立进程组
+        except OSError:
+            return None
+        usage = _process_group_usage(pgid)
+        if usage is None:
+            return None
+        rss, cpu = usage
+        if self.memory_limit_mb and rss > self.memory_limit_mb * 1024 * 1024:
+            return f"转换超出内存限制 ({self.memory_limit_mb} MB，含并行转换的子进程)，已终止"
+        if self.cpu_time_limit and cpu > self.cpu_time_limit:
+            return f"转换超出 CPU 时间限制 ({self.cpu_time_limit} 秒，含并行转换的子进程)，已终止"
+        return None
+
+    def _forget_finished(self):
+        # 调用方需持有 self.lock
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at and now - job.finished_at > self.keep_finished:
+                del self.jobs[job_id]
+
+def scheduler_from_env():
+    """
+    根据环境变量创建调度器:
+    MCC_MAX_JOBS (同时运行的转换数，默认为 CPU 数量的一半，至少 1)、MCC_MAX_QUEUE (排队上限，默认 8)、
+    MCC_JOB_MEMORY_MB (每个任务的内存上限，默认 2048)、MCC_JOB_CPU_SECONDS (每个任务的 CPU 时间上限，默认 600)。
+    内存和 CPU 上限设为 0 表示不限制。
+    """
+    def env_int(name, default):
+        try:
+            return int(os.environ.get(name, default))
+        except ValueError:
+            return default
+
+    return ConversionScheduler(
+        max_jobs=env_int("MCC_MAX_JOBS", max(1, (os.cpu_count() or 2) // 2)),
+        max_queue=env_int("MCC_MAX_QUEUE", 8),
+        memory_limit_mb=env_int("MCC_JOB_MEMORY_MB", 2048) or None,
+        cpu_time_limit=env_int("MCC_JOB_CPU_SECONDS", 600) or None
+    )
@@ -0,0 +1,121 @@
+import json
+import math
+import struct
+
+# 纹理预算的默认值: 单帧边长超过 max_size 像素的纹理视为过大
+# (物品图标通常为 16 到 64 像素，1024×1024 的图标会显著增加客户端显存占用和图集大小)
+DEFAULT_TEXTURE_BUDGET = {
+    "max_size": 256
+}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+class TextureInfo:
+    """
+    只根据 PNG 头 (IHDR) 和 .mcmeta 动画数据得到的纹理信息，不解码像素。
+    动画纹理在图集中只占一帧的面积，但整张帧序列都会解码保存在内存中。
+    """
+    __slots__ = ("width", "height", "frame_width", "frame_height")
+
+    def __init__(self, width, height, frame_width=None, frame_height=None):
+        self.width = width
+        self.height = height
+        self.frame_width = frame_width or width
+        self.frame_height = frame_height or height
+
+    @property
+    def frames(self):
+        return max(1, (self.width // self.frame_width) * (self.height // self.frame_height))
+
+    @property
+    def memory(self):
+        """估算的内存占用 (字节): 解码后的 RGBA 数据，加上 mipmap 的约 1/3。"""
+        return self.width * self.height * 4 * 4 // 3
+
+    @property
+    def atlas_pixels(self):
+        """在纹理图集中占用的像素数 (一帧)。"""
+        return self.frame_width * self.frame_height
+
+def read_png_size(f):
+    """
+    从 PNG 文件头读取尺寸，只读取前 24 个字节。
+    :param f: 以二进制模式打开的文件
+    :return: (宽, 高)，不是有效的 PNG (包括宽或高为 0) 时返回 None
+    """
+    header = f.read(24)
+    if len(header) < 24 or not header.startswith(PNG_SIGNATURE) or header[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", header[16:24])
+    if not width or not height:
+        return None
+    return width, height
+
+def texture_info(png_file, mcmeta_file=None, opener=open):
+    """
+    读取纹理信息。
+    :param mcmeta_file: 对应的 .png.mcmeta 文件 (可选)，包含 animation 时按帧计算图集占用
+    :param opener: 打开文件的函数 (例如 PathOverlay.open)
+    :return: TextureInfo，无法读取时返回 None
+    """
+    try:
+        with opener(png_file, 'rb') as f:
+            size = read_png_size(f)
+    except OSError:
+        return None
+    if size is None:
+        return None
+    width, height = size
+
+    frame_width = frame_height = None
+    if mcmeta_file:
+        try:
+            with opener(mcmeta_file, 'r', encoding='utf-8') as f:
+                animation = json.load(f).get("animation")
+        except (OSError, ValueError, AttributeError):
+            animation = None
+        if isinstance(animation, dict):
+            # 与游戏相同: 未指定帧尺寸时，帧为边长等于图片短边的正方形
+            frame_width = animation.get("width")
+            frame_height = animation.get("height")
+            if not isinstance(frame_width, int) or frame_width <= 0:
+                frame_width = None
+            if not isinstance(frame_height, int) or frame_height <= 0:
+                frame_height = None
+            if frame_width is None and frame_height is None:
+                frame_width = frame_height = min(width, height)
+            frame_width = min(frame_width or width, width)
+            frame_height = min(frame_height or height, height)
+    return TextureInfo(width, height, frame_width, frame_height)
+
+def texture_report(textures, items_by_texture=None, budget=None):
+    """
+    汇总纹理的内存占用和图集压力，并找出超出预算的纹理。
+    :param textures: {纹理引用: TextureInfo}
+    :param items_by_texture: {纹理引用: 使用该纹理的物品集合} (可选)
+    :param budget: {"max_size"}，缺少的项使用 DEFAULT_TEXTURE_BUDGET
+    :return: 报告 {"count", "memory_bytes", "atlas_pixels", "atlas_size", "budget", "oversized": [...]}
+    """
+    budget = {**DEFAULT_TEXTURE_BUDGET, **(budget or {})}
+    items_by_texture = items_by_texture or {}
+    atlas_pixels = sum(info.atlas_pixels for info in textures.values())
+    oversized = []
+    for ref, info in sorted(textures.items()):
+        if budget["max_size"] and max(info.frame_width, info.frame_height) > budget["max_size"]:
+            oversized.append({
+                "texture": ref,
+                "width": info.width,
+                "height": info.height,
+                "frames": info.frames,
+                "memory_bytes": info.memory,
+                "items": sorted(items_by_texture.get(ref, ()))
+            })
+    return {
+        "count": len(textures),
+        "memory_bytes": sum(info.memory for info in textures.values()),
+        "atlas_pixels": atlas_pixels,
+        # 容纳所有帧所需的最小正方形图集边长 (2 的幂，不考虑打包时的空隙)
+        "atlas_size": 1 << max(0, math.ceil(math.log2(math.sqrt(atlas_pixels)))) if atlas_pixels else 0,
+        "budget": budget,
+        "oversized": oversized
+    }
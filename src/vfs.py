@@ -0,0 +1,214 @@
+import io
+import os
+import time
+import struct
+import shutil
+import zipfile
+from src.manifest import FileManifest, FileEntry, file_kind
+
+# 压缩比只在解压后大于此大小时检查 (很小的数据量压缩比没有意义)。
+# 小成员不单独检查，但计入整个压缩包的累计压缩比
+RATIO_MIN_SIZE = 1024 * 1024
+
+# zip 目录结尾记录 (EOCD) 及 ZIP64 扩展记录
+EOCD_SIGNATURE = b"PK\x05\x06"
+EOCD_SIZE = 22
+EOCD_MAX_COMMENT = 0xFFFF
+ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+ZIP64_LOCATOR_SIZE = 20
+ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+ZIP64_EOCD_SIZE = 56
+
+def zip_entry_count(f):
+    """
+    从目录结尾记录读取 zip 压缩包的成员总数，不解析中央目录。
+    EOCD 位于文件末尾 (之后最多有 64 KiB 的注释)；成员数为 0xFFFF 时读取紧邻 ZIP64 定位记录之前的 ZIP64 EOCD。
+    :return: 成员总数，找不到目录结尾记录时返回 None
+    """
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    tail_size = min(file_size, EOCD_SIZE + EOCD_MAX_COMMENT)
+    tail_start = file_size - tail_size
+    f.seek(tail_start)
+    tail = f.read(tail_size)
+
+    # 注释中也可能出现签名，以注释长度与文件末尾吻合的记录为准
+    offset = tail.rfind(EOCD_SIGNATURE)
+    while offset >= 0:
+        if offset + EOCD_SIZE <= len(tail):
+            comment_size, = struct.unpack_from("<H", tail, offset + 20)
+            if offset + EOCD_SIZE + comment_size == len(tail):
+                break
+        offset = tail.rfind(EOCD_SIGNATURE, 0, offset)
+    if offset < 0:
+        return None
+    entries, = struct.unpack_from("<H", tail, offset + 10)
+    if entries != 0xFFFF:
+        return entries
+
+    locator_pos = tail_start + offset - ZIP64_LOCATOR_SIZE
+    record_pos = locator_pos - ZIP64_EOCD_SIZE
+    if record_pos < 0:
+        return entries
+    f.seek(locator_pos)
+    if f.read(ZIP64_LOCATOR_SIZE)[:4] != ZIP64_LOCATOR_SIGNATURE:
+        return entries
+    f.seek(record_pos)
+    record = f.read(ZIP64_EOCD_SIZE)
+    if record[:4] != ZIP64_EOCD_SIGNATURE:
+        return entries
+    entries, = struct.unpack_from("<Q", record, 32)
+    return entries
+
+class ArchiveLimitError(ValueError):
+    """压缩包超出读取预算。"""
+
+class ArchiveLimits:
+    """
+    读取上传压缩包的预算: 解压后的总大小、压缩比 (单个成员和整个压缩包)、成员数和路径深度，None 表示不限制。
+    zipfile 读取成员时不会返回超过中央目录中声明大小的内容，因此按中央目录的记录检查即可限制实际解压的字节数。
+    """
+
+    def __init__(self, max_total_size=None, max_ratio=None, max_entries=None, max_depth=None):
+        self.max_total_size = max_total_size
+        self.max_ratio = max_ratio
+        self.max_entries = max_entries
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_env(cls):
+        """
+        根据环境变量创建预算:
+        MCC_ZIP_MAX_SIZE_MB (解压后的总大小，默认 4096)、MCC_ZIP_MAX_RATIO (压缩比，默认 200)、
+        MCC_ZIP_MAX_ENTRIES (成员数，默认 200000)、MCC_ZIP_MAX_DEPTH (路径层级，默认 32)，设为 0 表示不限制。
+        """
+        def env_int(name, default):
+            try:
+                return int(os.environ.get(name, default))
+            except ValueError:
+                return default
+
+        max_size_mb = env_int("MCC_ZIP_MAX_SIZE_MB", 4096)
+        return cls(
+            max_total_size=max_size_mb * 1024 * 1024 if max_size_mb else None,
+            max_ratio=env_int("MCC_ZIP_MAX_RATIO", 200) or None,
+            max_entries=env_int("MCC_ZIP_MAX_ENTRIES", 200000) or None,
+            max_depth=env_int("MCC_ZIP_MAX_DEPTH", 32) or None
+        )
+
+    def check_entry_count(self, zip_path):
+        """
+        在解析中央目录之前，根据目录结尾记录中的成员总数检查成员数
+        (zipfile 打开压缩包时会一次性为所有成员创建 ZipInfo)。
+        """
+        if self.max_entries is None:
+            return
+        with open(zip_path, 'rb') as f:
+            entries = zip_entry_count(f)
+        # 不是 zip 文件时由 zipfile 报告错误
+        if entries is not None and entries > self.max_entries:
+            raise ArchiveLimitError(f"压缩包中的文件数超过上限 ({self.max_entries})")
+
+class ZipFS(FileManifest):
+    """
+    只读虚拟文件系统的压缩包实现: 将 zip 压缩包的内容呈现为 root 下的目录树，无需解压。
+    目录结构来自压缩包的中央目录 (不读取文件内容)，open 直接从压缩包中流式读取成员，
+    copy 将成员流式写入输出文件。接口与目录实现 (FileManifest) 相同，root 不需要在磁盘上存在。
+    与解压 (extractall) 相同，跳过绝对路径和包含 ".." 的成员，同名成员以最后一个为准。
+    设置了读取预算 (ArchiveLimits) 时，建立索引的过程中逐个成员累计解压后的大小并检查压缩比、成员数和路径深度，
+    超出预算时立即停止并抛出 ArchiveLimitError，不会继续读取压缩包。
+    """
+
+    def __init__(self, zip_path, root, limits=None):
+        super().__init__(root)
+        self.zip_path = os.path.abspath(zip_path)
+        self._members = {} # 相对路径 -> 压缩包成员名
+        self._zip = None
+        self._pid = None
+        if limits is not None:
+            limits.check_entry_count(self.zip_path)
+        with zipfile.ZipFile(self.zip_path) as zf:
+            self._index(zf.infolist(), limits)
+
+    def _index(self, infos, limits=None):
+        self.dirs[""] = ([], [])
+        total_size = total_compressed = 0
+        for count, info in enumerate(infos, 1):
+            if limits is not None:
+                total_size += info.file_size
+                total_compressed += info.compress_size
+                self._check_limits(limits, info, count, total_size, total_compressed)
+            parts = [part for part in info.filename.replace("\\", "/").split("/") if part not in ("", ".")]
+            if not parts or ".." in parts or os.path.isabs(info.filename) or ":" in parts[0]:
+                continue
+            if info.is_dir():
+                self._add_dir(parts)
+                continue
+            self._add_dir(parts[:-1])
+            rel_path = os.path.join(*parts)
+            if rel_path not in self.files:
+                self.dirs[os.path.join(*parts[:-1]) if len(parts) > 1 else ""][1].append(parts[-1])
+            mtime = time.mktime(info.date_time + (0, 0, -1))
+            self.files[rel_path] = FileEntry(info.file_size, mtime, file_kind(parts[-1]))
+            self._members[rel_path] = info.filename
+
+    def _check_limits(self, limits, info, count, total_size, total_compressed):
+        if limits.max_entries is not None and count > limits.max_entries:
+            raise ArchiveLimitError(f"压缩包中的文件数超过上限 ({limits.max_entries})")
+        if limits.max_total_size is not None and total_size > limits.max_total_size:
+            raise ArchiveLimitError(f"压缩包解压后的大小超过上限 ({limits.max_total_size // 1024 // 1024} MB)")
+        if limits.max_depth is not None and info.filename.replace("\\", "/").strip("/").count("/") + 1 > limits.max_depth:
+            raise ArchiveLimitError(f"压缩包成员 {info.filename} 的路径层级过深 (上限 {limits.max_depth} 层)")
+        if limits.max_ratio is None:
+            return
+        if info.file_size > RATIO_MIN_SIZE:
+            ratio = info.file_size / max(info.compress_size, 1)
+            if ratio > limits.max_ratio:
+                raise ArchiveLimitError(
+                    f"压缩包成员 {info.filename} 的压缩比过高 ({ratio:.0f}:1，上限 {limits.max_ratio}:1)"
+                )
+        # 大量压缩比很高的小成员由累计压缩比限制 (读完所有成员时即为整个压缩包的压缩比)
+        if total_size > RATIO_MIN_SIZE:
+            ratio = total_size / max(total_compressed, 1)
+            if ratio > limits.max_ratio:
+                raise ArchiveLimitError(f"压缩包的压缩比过高 ({ratio:.0f}:1，上限 {limits.max_ratio}:1)")
+
+    def _add_dir(self, parts):
+        for i in range(len(parts)):
+            rel_dir = os.path.join(*parts[:i + 1])
+            if rel_dir not in self.dirs:
+                parent = os.path.join(*parts[:i]) if i else ""
+                self.dirs[parent][0].append(parts[i])
+                self.dirs[rel_dir] = ([], [])
+
+    def __getstate__(self):
+        # 压缩包句柄不能跨进程传递，工作进程在首次读取时重新打开
+        state = self.__dict__.copy()
+        state["_zip"] = None
+        state["_pid"] = None
+        return state
+
+    def _archive(self):
+        # fork 出的子进程与父进程共享文件偏移，因此每个进程使用自己的句柄
+        if self._zip is None or self._pid != os.getpid():
+            self._zip = zipfile.ZipFile(self.zip_path)
+            self._pid = os.getpid()
+        return self._zip
+
+    def _member(self, path):
+        member = self._members.get(self._rel(path))
+        if member is None:
+            raise FileNotFoundError(path)
+        return member
+
+    def open(self, path, mode='r', encoding=None, errors=None, newline=None, **kwargs):
+        if any(flag in mode for flag in ("w", "a", "+", "x")):
+            raise PermissionError(f"压缩包是只读的: {path}")
+        f = self._archive().open(self._member(path))
+        if "b" in mode:
+            return f
+        return io.TextIOWrapper(f, encoding=encoding or "utf-8", errors=errors, newline=newline)
+
+    def copy(self, path, dest_file):
+        with self._archive().open(self._member(path)) as src, open(dest_file, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
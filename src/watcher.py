@@ -0,0 +1,404 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from collections.abc import Mapping
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.scanner import scan_ia_sources, classify_config
+from src.converters.ia_to_ce import IAConverter
+from src.migrators.ia_to_ce import IAMigrator
+
+# IAConverter.save_config 写出的配置文件
+CONFIG_FILES = ("items.yml", "armor.yml", "categories.yml")
+
+class IAWatcher:
+    """
+    监视本地 ItemsAdder 目录，并在文件变化后增量地重新转换。
+
+    依赖关系按 物品 -> 模型 -> 纹理 追踪：
+    - 配置文件变化时，只重新转换内容发生变化的物品；
+    - 模型或纹理变化时，只重新迁移该资源，并重新转换引用它的物品；
+    - 所有输出文件只在内容实际变化时才会被重写，
+      这样 CraftEngine 重载和资源包重新计算哈希的开销都很小。
+
+    输出结构 (output_dir 对应 CraftEngine 的 resources 目录):
+    output_dir/<namespace>/configuration/items/<namespace>/
+    output_dir/<namespace>/resourcepack/
+    """
+
+    def __init__(self, source_dir, output_dir, interval=1.0):
+        self.source_dir = os.path.abspath(source_dir)
+        self.output_dir = os.path.abspath(output_dir)
+        self.interval = interval
+
+        self.namespace = "converted"
+        self.resourcepack_path = None
+        self.config_dir = None
+        self.ce_res_dir = None
+
+        self.snapshot = {}        # 源文件路径 -> (mtime, size)
+        self.items_configs = []   # 物品配置文件 (按扫描顺序)
+        self.categories_configs = []
+        self.configs = {}         # 配置文件路径 -> 解析后的数据
+        self.item_digests = {}    # 物品键 -> IA 数据摘要
+        self.item_results = {}    # 物品键 -> (items, templates, generated_models)
+        self.item_deps = {}       # 物品键 -> 依赖的源资源文件集合
+        self.dependents = {}      # 源资源文件 -> 依赖它的物品键集合
+        self.generated_files = set() # 上次写出的生成模型 (输出路径)
+
+    def build(self):
+        """完整转换一次，并建立依赖关系和文件快照。"""
+        sources = scan_ia_sources(self.source_dir)
+        if not sources["items_configs"]:
+            raise ValueError("未能找到包含物品定义的配置文件 (items/equipments)")
+
+        self.items_configs = sources["items_configs"]
+        self.categories_configs = sources["categories_configs"]
+        self.resourcepack_path = sources["resourcepack_path"]
+        self.namespace = sources["info"].get("namespace", "converted")
+
+        ce_output_base = os.path.join(self.output_dir, self.namespace)
+        self.config_dir = os.path.join(ce_output_base, "configuration", "items", self.namespace)
+        self.ce_res_dir = os.path.join(ce_output_base, "resourcepack")
+
+        for config_path in self.items_configs + self.categories_configs:
+            self.configs[config_path] = self._load(config_path)
+
+        self.snapshot = self._take_snapshot()
+
+        changed_items = list(self._merged_items().keys())
+        self._convert_changed(changed_items)
+        self._save(full_migrate=True)
+        print(f"已完成初次转换: {len(changed_items)} 个物品 -> {self.output_dir}")
+
+    def poll(self):
+        """
+        检查一次源目录的变化并增量更新输出。
+        :return: 本次变化的摘要 (无变化时返回 None)
+        """
+        new_snapshot = self._take_snapshot()
+        added = [p for p in new_snapshot if p not in self.snapshot]
+        removed = [p for p in self.snapshot if p not in new_snapshot]
+        modified = [p for p in new_snapshot if p in self.snapshot and new_snapshot[p] != self.snapshot[p]]
+        self.snapshot = new_snapshot
+
+        if not (added or removed or modified):
+            return None
+
+        changed_items = set()
+        changed_assets = []
+        removed_assets = []
+        configs_changed = False
+
+        for path in added + modified:
+            if path.endswith((".yml", ".yaml")):
+                configs_changed |= self._reload_config(path)
+            else:
+                changed_assets.append(path)
+                changed_items.update(self.dependents.get(path, ()))
+
+        for path in removed:
+            if path in self.configs:
+                self._forget_config(path)
+                configs_changed = True
+            else:
+                removed_assets.append(path)
+                changed_items.update(self.dependents.get(path, ()))
+
+        if configs_changed:
+            changed_items.update(self._diff_items())
+
+        # 先迁移变化的资源，之后写入的生成模型会覆盖同名的迁移模型 (与完整转换的顺序一致)
+        migrator = self._create_migrator()
+        migrated = migrator.migrate_files(changed_assets) if migrator else []
+        deleted = migrator.remove_files(removed_assets) if migrator else []
+
+        merged_items = self._merged_items()
+        self._convert_changed([key for key in changed_items if key in merged_items])
+        written, stale = self._save(full_migrate=False)
+
+        summary = {
+            "items": sorted(changed_items),
+            "migrated": migrated,
+            "deleted": deleted + stale,
+            "written": written
+        }
+        print(f"检测到变化: 重新转换 {len(changed_items)} 个物品, "
+              f"迁移 {len(migrated)} 个资源, 删除 {len(summary['deleted'])} 个文件, 重写 {len(written)} 个配置文件")
+        return summary
+
+    def run(self):
+        """执行初次转换后持续轮询，直到被中断。"""
+        self.build()
+        print(f"正在监视 {self.source_dir} (按 Ctrl+C 退出)")
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.poll()
+        except KeyboardInterrupt:
+            print("已停止监视。")
+
+    def _take_snapshot(self):
+        snapshot = {}
+        stack = [self.source_dir]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def _load(self, config_path):
+        converter = IAConverter()
+        return converter.load_config(config_path) or {}
+
+    def _reload_config(self, path):
+        """重新加载变化的 YAML 文件。:return: 是否影响转换结果"""
+        kind, data = classify_config(path)
+        if kind is None:
+            if path in self.configs:
+                self._forget_config(path)
+                return True
+            return False
+
+        target = self.items_configs if kind == "items" else self.categories_configs
+        if path not in target:
+            self._forget_config(path)
+            target.append(path)
+        self.configs[path] = data
+        return True
+
+    def _forget_config(self, path):
+        self.configs.pop(path, None)
+        if path in self.items_configs:
+            self.items_configs.remove(path)
+        if path in self.categories_configs:
+            self.categories_configs.remove(path)
+
+    def _merged_items(self):
+        """按配置文件顺序合并所有物品 (与 /api/convert 的合并逻辑一致)。"""
+        merged = {}
+        for config_path in self.items_configs:
+            merged.update(self.configs[config_path].get("items") or {})
+        return merged
+
+    def _diff_items(self):
+        """比较物品摘要，返回新增、变化或删除的物品键。"""
+        merged_items = self._merged_items()
+        digests = {key: self._digest(data) for key, data in merged_items.items()}
+        changed = {key for key, digest in digests.items() if self.item_digests.get(key) != digest}
+        for key in set(self.item_digests) - set(digests):
+            changed.add(key)
+            self.item_results.pop(key, None)
+            self._set_deps(key, set())
+        self.item_digests = digests
+        return changed
+
+    def _digest(self, data):
+        return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _convert_changed(self, keys):
+        """重新转换指定物品，并更新它们的资源依赖。"""
+        merged_items = self._merged_items()
+        for key in keys:
+            data = merged_items[key]
+            self.item_digests[key] = self._digest(data)
+            result = IAConverter.convert_item_shard(self.namespace, self.resourcepack_path, {key: data})
+            self.item_results[key] = result
+            self._set_deps(key, self._collect_deps(data, result[0]))
+
+    def _set_deps(self, key, deps):
+        for path in self.item_deps.get(key, ()):
+            self.dependents.get(path, set()).discard(key)
+        self.item_deps[key] = deps
+        for path in deps:
+            self.dependents.setdefault(path, set()).add(key)
+
+    def _collect_deps(self, ia_data, ce_items):
+        """
+        收集物品依赖的源资源文件: 物品引用的模型 -> 模型引用的纹理，
+        以及 generate: true 使用的纹理。
+        引用的文件不存在时也记录它的预期路径，之后新增该文件时会重新转换引用它的物品。
+        """
+        migrator = self._create_migrator()
+        if not migrator:
+            return set()
+        models_dir = migrator._get_resource_dir("models")
+        textures_dir = migrator._get_resource_dir("textures")
+        deps = set()
+
+        def add_texture(ref):
+            path = ref.split(":", 1)[-1]
+            if path.endswith(".png"):
+                path = path[:-4]
+            if textures_dir:
+                for candidate in (f"{path}.png", f"{path}.png.mcmeta"):
+                    deps.add(os.path.join(textures_dir, *candidate.split("/")))
+
+        for ce_item in ce_items.values():
+            for ref in self._model_refs(ce_item.get("model")):
+                path = ref.split(":", 1)[-1]
+                candidates = [path, path[len("item/"):]] if path.startswith("item/") else [path]
+                if not models_dir:
+                    continue
+                for candidate in candidates:
+                    full_path = os.path.join(models_dir, *f"{candidate}.json".split("/"))
+                    deps.add(full_path)
+                    if full_path in self.snapshot:
+                        for texture in self._model_textures(full_path):
+                            add_texture(texture)
+
+        resource = ia_data.get("resource", {})
+        if resource.get("generate") is True:
+            textures = resource.get("textures") or resource.get("texture") or []
+            if not isinstance(textures, list):
+                textures = [textures]
+            for texture in textures:
+                add_texture(texture)
+
+        return deps
+
+    def _model_refs(self, model):
+        """递归收集物品模型定义 (含模板参数) 中的所有命名空间引用。"""
+        refs = []
+        if isinstance(model, Mapping):
+            for value in model.values():
+                refs.extend(self._model_refs(value))
+        elif isinstance(model, list):
+            for value in model:
+                refs.extend(self._model_refs(value))
+        elif isinstance(model, str) and ":" in model and not model.startswith("minecraft:"):
+            refs.append(model)
+        return refs
+
+    def _model_textures(self, model_file):
+        try:
+            with open(model_file, 'r', encoding='utf-8') as f:
+                textures = json.load(f).get("textures", {})
+        except Exception:
+            return []
+        return [
+            value for value in textures.values()
+            if isinstance(value, str) and not value.startswith(("#", "minecraft:"))
+        ]
+
+    def _create_migrator(self):
+        if not self.resourcepack_path:
+            return None
+        migrator = IAMigrator(self.resourcepack_path, self.ce_res_dir, self.namespace)
+        migrator.skip_unchanged = True
+        return migrator
+
+    def _save(self, full_migrate):
+        """
+        按合并顺序组装转换结果并写出，内容未变化的文件不会被重写。
+        不再生成的配置文件 (例如所有装备都被移除后的 armor.yml) 和生成模型会被删除。
+        :return: (实际重写的配置文件列表, 删除的文件列表)
+        """
+        converter = IAConverter()
+        converter.namespace = self.namespace
+        converter.skip_unchanged = True
+        if self.resourcepack_path:
+            converter.set_resource_paths(self.resourcepack_path, self.ce_res_dir)
+
+        # 按物品合并顺序重建，结果与一次完整的串行转换相同
+        for key in self._merged_items():
+            items, templates, generated_models = self.item_results[key]
+            converter.ce_config["items"].update(items)
+            converter.ce_config["templates"].update(templates)
+            converter.generated_models.update(generated_models)
+
+        # 装备和分类的转换开销很小，每次都完整重建
+        merged_equipments = {}
+        merged_armors_rendering = {}
+        merged_categories = {}
+        for config_path in self.items_configs:
+            data = self.configs[config_path]
+            merged_equipments.update(data.get("equipments") or {})
+            merged_armors_rendering.update(data.get("armors_rendering") or {})
+        for config_path in self.categories_configs:
+            merged_categories.update(self.configs[config_path].get("categories") or {})
+        if merged_equipments:
+            converter._convert_equipments(merged_equipments)
+        if merged_armors_rendering:
+            converter._convert_armors_rendering(merged_armors_rendering)
+        if merged_categories:
+            converter._convert_categories(merged_categories)
+        if not converter.ce_config["categories"] and converter.ce_config["items"]:
+            converter._generate_default_category()
+
+        before = self._config_mtimes()
+        converter.save_config(self.config_dir, migrate=full_migrate)
+
+        stale = [path for path in before if path not in converter.output_files]
+        generated = set()
+        if self.resourcepack_path:
+            models_root = os.path.join(self.ce_res_dir, "assets", self.namespace, "models")
+            generated = {os.path.join(models_root, rel_path) for rel_path in converter.generated_models}
+            stale.extend(self._stale_models(self.generated_files - generated, models_root))
+        self.generated_files = generated
+        removed = []
+        for path in stale:
+            if os.path.exists(path):
+                os.remove(path)
+                removed.append(path)
+
+        after = self._config_mtimes()
+        written = sorted(path for path, mtime in after.items() if before.get(path) != mtime)
+        return written, removed
+
+    def _stale_models(self, models, models_root):
+        """
+        不再生成的模型中需要删除的部分 (与完整转换的输出保持一致):
+        - 源资源包中有同名模型的，重新迁移源模型 (完整转换中生成模型会覆盖它)；
+        - 对应的物品纹理仍然存在的保留，完整迁移也会为它生成相同的基础模型。
+        """
+        if not models:
+            return []
+        migrator = self._create_migrator()
+        models_dir = migrator._get_resource_dir("models")
+        sources = {}
+        if models_dir:
+            for path in self.snapshot:
+                if path.endswith(".json") and migrator._is_within(path, models_dir):
+                    sources[migrator._model_dest_file(models_dir, path)] = path
+        textures_root = os.path.join(self.ce_res_dir, "assets", self.namespace, "textures")
+
+        stale = []
+        for model_file in sorted(models):
+            if model_file in sources:
+                migrator.migrate_files([sources[model_file]])
+            elif not os.path.exists(os.path.join(textures_root, os.path.relpath(model_file, models_root)[:-len(".json")] + ".png")):
+                stale.append(model_file)
+        return stale
+
+    def _config_mtimes(self):
+        mtimes = {}
+        if self.config_dir and os.path.isdir(self.config_dir):
+            for name in CONFIG_FILES:
+                path = os.path.join(self.config_dir, name)
+                if os.path.exists(path):
+                    mtimes[path] = os.stat(path).st_mtime_ns
+        return mtimes
+
+def main():
+    parser = argparse.ArgumentParser(description="监视 ItemsAdder 目录并增量转换为 CraftEngine 配置")
+    parser.add_argument("source", help="ItemsAdder 源目录")
+    parser.add_argument("output", help="CraftEngine resources 输出目录")
+    parser.add_argument("--interval", type=float, default=1.0, help="轮询间隔 (秒)")
+    args = parser.parse_args()
+
+    IAWatcher(args.source, args.output, interval=args.interval).run()
+
+if __name__ == '__main__':
+    main()
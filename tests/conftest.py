@@ -0,0 +1,129 @@
+import io
+import os
+import sys
+import json
+import zlib
+import struct
+import zipfile
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def png(width, height):
+    """生成指定尺寸的全透明 PNG。"""
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+    raw = b"".join(b"\x00" + b"\x00\x00\x00\x00" * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+def make_pack(root, namespace="demo", n_items=5):
+    """
+    在 root 下生成一个 ItemsAdder 物品包:
+    - n_items 个从纹理生成模型的物品 (gem_<i>)，一个使用模型的家具 (chair)；
+    - 一个引用不存在模型的物品 (ghost)，用于检查悬空引用；
+    - 旧格式的装备 (图层路径带 .png)；
+    - 未被任何物品引用的模型和纹理 (unused/)，用于检查精简模式。
+    :return: root
+    """
+    ia_dir = os.path.join(root, "ItemsAdder", "contents", namespace)
+    configs_dir = os.path.join(ia_dir, "configs")
+    assets_dir = os.path.join(ia_dir, "resourcepack", "assets", namespace)
+
+    def write(rel_path, data):
+        path = os.path.join(assets_dir, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data if isinstance(data, bytes) else json.dumps(data).encode("utf-8"))
+
+    items = {}
+    for i in range(n_items):
+        items[f"gem_{i}"] = {
+            "display_name": f"Gem {i}",
+            "resource": {"material": "PAPER", "generate": True, "textures": [f"item/gem_{i}.png"]}
+        }
+        write(f"textures/item/gem_{i}.png", png(16, 16))
+    items["chair"] = {
+        "display_name": "Chair",
+        "resource": {"material": "PAPER", "model_path": "furniture/chair"},
+        "behaviours": {"furniture": {"entity": "item_display", "solid": True}}
+    }
+    items["ghost"] = {"display_name": "Ghost", "resource": {"material": "PAPER", "model_path": "furniture/missing"}}
+
+    write("models/furniture/chair.json", {
+        "textures": {"0": f"{namespace}:furniture/wood", "particle": f"{namespace}:furniture/wood"},
+        "elements": [{"from": [0, 0, 0], "to": [16, 8, 16], "faces": {"north": {}, "up": {}}}]
+    })
+    write("textures/furniture/wood.png", png(32, 32))
+    write("textures/armor/ruby_layer_1.png", png(64, 32))
+    write("textures/armor/ruby_layer_2.png", png(64, 32))
+    write("models/unused/draft.json", {"textures": {"0": f"{namespace}:unused/draft"}})
+    write("textures/unused/draft.png", png(16, 16))
+
+    os.makedirs(configs_dir, exist_ok=True)
+    with open(os.path.join(configs_dir, "items.yml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump({
+            "info": {"namespace": namespace},
+            "items": items,
+            "equipments": {"ruby": {"layer_1": "armor/ruby_layer_1.png", "layer_2": "armor/ruby_layer_2"}}
+        }, f, sort_keys=False)
+    with open(os.path.join(configs_dir, "categories.yml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump({
+            "info": {"namespace": namespace},
+            "categories": {"main": {"name": "Main", "icon": f"{namespace}:chair", "items": [f"{namespace}:chair"]}}
+        }, f, sort_keys=False)
+    return root
+
+def zip_dir(src, zip_path):
+    """将目录按相对路径写入压缩包。"""
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for root, dirs, files in os.walk(src):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                zf.write(path, os.path.relpath(path, src))
+    return zip_path
+
+@pytest.fixture
+def pack_zip(tmp_path):
+    """默认物品包的压缩包。"""
+    return zip_dir(make_pack(str(tmp_path / "pack")), str(tmp_path / "pack.zip"))
+
+@pytest.fixture
+def web_app(tmp_path, monkeypatch):
+    """上传和输出目录位于临时目录的 web.app 模块。"""
+    import web.app as web_app
+    upload_dir = tmp_path / "uploads"
+    output_dir = tmp_path / "output"
+    upload_dir.mkdir()
+    output_dir.mkdir()
+    monkeypatch.setitem(web_app.app.config, "UPLOAD_FOLDER", str(upload_dir))
+    monkeypatch.setitem(web_app.app.config, "OUTPUT_FOLDER", str(output_dir))
+    return web_app
+
+def upload(web_app, zip_path):
+    """通过 /api/upload 上传物品包，返回 (响应数据, 状态码)。"""
+    with open(zip_path, "rb") as f:
+        response = web_app.app.test_client().post(
+            "/api/upload", data={"file": (io.BytesIO(f.read()), os.path.basename(zip_path))},
+            content_type="multipart/form-data"
+        )
+    return response.get_json(), response.status_code
+
+def convert(web_app, zip_path, **form):
+    """上传并在当前进程中转换物品包 (不经过调度器)，返回 (响应数据, 状态码)。"""
+    payload, status = upload(web_app, zip_path)
+    assert status == 200, payload
+    return web_app.run_conversion(payload["session_id"], form)
+
+def download(web_app, url):
+    response = web_app.app.test_client().get(url)
+    assert response.status_code == 200
+    return response.data
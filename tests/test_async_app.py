@@ -0,0 +1,51 @@
+import os
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer, TestClient
+
+from web import async_app
+
+def file_form(fields=(), files=(("pack.zip", b"data"),)):
+    form = aiohttp.FormData()
+    for name, value in fields:
+        form.add_field(name, value)
+    for filename, data in files:
+        form.add_field("file", data, filename=filename)
+    return form
+
+def post(url, form):
+    async def run():
+        async with TestClient(TestServer(async_app.create_app(2))) as client:
+            response = await client.post(url, data=form)
+            return response.status, await response.json()
+    return asyncio.run(run())
+
+def upload_dirs(web_app):
+    return os.listdir(web_app.app.config["UPLOAD_FOLDER"])
+
+@pytest.mark.parametrize("url", ["/api/jobs", "/api/preview"])
+def test_form_only_endpoints_do_not_store_files(web_app, url):
+    status, payload = post(url, file_form())
+    assert status in (400, 404), payload
+    assert upload_dirs(web_app) == []
+
+@pytest.mark.parametrize("url", ["/api/jobs", "/api/preview", "/api/convert"])
+def test_too_large(web_app, monkeypatch, url):
+    monkeypatch.setitem(web_app.app.config, "MAX_CONTENT_LENGTH", 1024)
+    status, payload = post(url, file_form([("session_id", "unused")], [("pack.zip", b"\0" * 4096)]))
+    assert status == 413
+    assert upload_dirs(web_app) == []
+
+def test_convert_session_discards_upload(web_app, monkeypatch):
+    # 转换已有会话时，同时上传的文件不会留下会话目录
+    monkeypatch.setattr(async_app, "submit_conversion", lambda session_id, form: (None, 5))
+    status, _ = post("/api/convert", file_form([("session_id", "unused")]))
+    assert status == 503
+    assert upload_dirs(web_app) == []
+
+def test_only_last_upload_is_kept(web_app):
+    status, payload = post("/api/upload", file_form(files=[("first.txt", b"a"), ("second.txt", b"b")]))
+    assert status == 400, payload
+    assert len(upload_dirs(web_app)) == 1
@@ -0,0 +1,66 @@
+import io
+import os
+import zipfile
+
+import pytest
+import yaml
+
+from conftest import make_pack, zip_dir, convert, download, png
+from src.manifest import parse_output_manifest, diff_output_manifests
+
+RESOURCES = "CraftEngine/resources/demo/"
+
+def test_delta_pack(tmp_path, web_app):
+    pack = make_pack(str(tmp_path / "pack"))
+    base, status = convert(web_app, zip_dir(pack, str(tmp_path / "base.zip")))
+    assert status == 200, base
+    assert "delta" not in base
+    base_manifest = download(web_app, base["manifest_url"]).decode("utf-8")
+
+    # 修改一个纹理，删除一个物品 (及其纹理)，新增一个物品
+    ia_dir = os.path.join(pack, "ItemsAdder", "contents", "demo")
+    textures_dir = os.path.join(ia_dir, "resourcepack", "assets", "demo", "textures", "item")
+    with open(os.path.join(textures_dir, "gem_0.png"), "wb") as f:
+        f.write(png(32, 32))
+    os.remove(os.path.join(textures_dir, "gem_1.png"))
+    with open(os.path.join(textures_dir, "ruby.png"), "wb") as f:
+        f.write(png(16, 16))
+    config_path = os.path.join(ia_dir, "configs", "items.yml")
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    del config["items"]["gem_1"]
+    config["items"]["ruby"] = {"resource": {"material": "PAPER", "generate": True, "textures": ["item/ruby.png"]}}
+    with open(config_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+
+    current, status = convert(web_app, zip_dir(pack, str(tmp_path / "current.zip")), base_manifest=base_manifest)
+    assert status == 200, current
+    delta = current["delta"]
+    assets = f"{RESOURCES}resourcepack/assets/demo/"
+    assert delta["added"] == [f"{assets}models/item/ruby.json", f"{assets}textures/item/ruby.png"]
+    assert delta["changed"] == [f"{RESOURCES}configuration/items/demo/items.yml", f"{assets}textures/item/gem_0.png"]
+    assert delta["deleted"] == [f"{assets}models/item/gem_1.json", f"{assets}textures/item/gem_1.png"]
+
+    full = zipfile.ZipFile(io.BytesIO(download(web_app, current["download_url"])))
+    assert delta["unchanged"] == len(full.namelist()) - len(delta["added"]) - len(delta["changed"])
+    delta_archive = zipfile.ZipFile(io.BytesIO(download(web_app, delta["download_url"])))
+    assert delta_archive.namelist() == sorted(delta["added"] + delta["changed"])
+    for name in delta_archive.namelist():
+        assert delta_archive.read(name) == full.read(name)
+
+@pytest.mark.parametrize("manifest", [
+    "not json",
+    "[]",
+    '{"files": []}',
+    '{"algorithm": "md5", "files": {}}',
+    '{"files": {"a.yml": 1}}'
+])
+def test_invalid_base_manifest(web_app, pack_zip, manifest):
+    payload, status = convert(web_app, pack_zip, base_manifest=manifest)
+    assert status == 400
+    assert payload["error"].startswith("base_manifest 无效")
+
+def test_diff_output_manifests():
+    base = parse_output_manifest({"format": 1, "algorithm": "sha1", "files": {"a": "1", "b": "2", "c": "3"}})
+    assert diff_output_manifests(base, {"d": "4", "c": "3", "b": "5"}) == (["d"], ["b"], ["a"])
+    assert diff_output_manifests(base, base) == ([], [], [])
@@ -0,0 +1,118 @@
+import os
+
+import pytest
+import yaml
+
+from src.merge import CEIndex, INDEX_FILE, merge_output, open_output
+
+def write(root, rel_path, data):
+    path = os.path.join(root, *rel_path.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(data if isinstance(data, str) else yaml.safe_dump(data, sort_keys=False))
+    return path
+
+def items(*ids, name="Item"):
+    return {"items": {item_id: {"material": "paper", "data": {"item-name": name}} for item_id in ids}}
+
+def make_output(root, files):
+    """转换输出 (与压缩包中相同，位于 CraftEngine/resources 下)。"""
+    for rel_path, data in files.items():
+        write(os.path.join(root, "CraftEngine", "resources"), rel_path, data)
+    return open_output(root)
+
+def merge(target, source, **options):
+    """先以 dry_run 合并，再实际合并并保存索引，两次的报告必须相同。"""
+    dry_index = CEIndex.load(target)
+    dry_report = merge_output(dry_index, source, dry_run=True, **options)
+    index = CEIndex.load(target)
+    report = merge_output(index, source, **options)
+    index.save()
+    assert dry_report == report
+    return report
+
+CONFIG = "demo/configuration/items.yml"
+TEXTURE = "demo/resourcepack/assets/demo/textures/item/gem.png"
+
+@pytest.fixture
+def target(tmp_path):
+    root = tmp_path / "resources"
+    root.mkdir()
+    return str(root)
+
+def test_added_then_identical(tmp_path, target):
+    source = make_output(str(tmp_path / "out"), {CONFIG: items("demo:gem"), TEXTURE: "png"})
+    assert merge(target, source) == {"added": [CONFIG, TEXTURE], "updated": [], "identical": 0, "conflicts": []}
+    assert os.path.exists(os.path.join(target, INDEX_FILE))
+
+    # 第二次合并使用保存的索引
+    assert merge(target, source) == {"added": [], "updated": [], "identical": 2, "conflicts": []}
+
+def test_dry_run_writes_nothing(tmp_path, target):
+    source = make_output(str(tmp_path / "out"), {CONFIG: items("demo:gem")})
+    index = CEIndex.load(target)
+    assert merge_output(index, source, dry_run=True)["added"] == [CONFIG]
+    assert os.listdir(target) == []
+
+def test_updated_and_content_conflict(tmp_path, target):
+    merge(target, make_output(str(tmp_path / "first"), {CONFIG: items("demo:gem"), TEXTURE: "png"}))
+    # 用户修改了之前合并写入的纹理
+    write(target, TEXTURE, "edited")
+
+    second = make_output(str(tmp_path / "second"), {CONFIG: items("demo:gem", name="Gem"), TEXTURE: "new png"})
+    assert merge(target, second) == {
+        "added": [],
+        "updated": [CONFIG], # 之前合并写入且之后未被修改
+        "identical": 0,
+        "conflicts": [{"path": TEXTURE, "reason": "content"}]
+    }
+    with open(os.path.join(target, TEXTURE), encoding="utf-8") as f:
+        assert f.read() == "edited"
+
+    assert merge(target, second, overwrite=True)["updated"] == [TEXTURE]
+    with open(os.path.join(target, TEXTURE), encoding="utf-8") as f:
+        assert f.read() == "new png"
+
+def test_user_file_conflict(tmp_path, target):
+    # 目标中已有的同名文件 (不是由合并写入的)
+    write(target, TEXTURE, "user png")
+    source = make_output(str(tmp_path / "out"), {TEXTURE: "png"})
+    assert merge(target, source)["conflicts"] == [{"path": TEXTURE, "reason": "content"}]
+    assert merge(target, source, overwrite=True)["updated"] == [TEXTURE]
+
+def test_id_conflict_with_target(tmp_path, target):
+    write(target, "other/configuration/items.yml", items("demo:gem"))
+    source = make_output(str(tmp_path / "out"), {CONFIG: items("demo:gem", "demo:ruby")})
+    expected = [{"path": CONFIG, "reason": "ids", "ids": {"items:demo:gem": ["other/configuration/items.yml"]}}]
+    assert merge(target, source)["conflicts"] == expected
+    # overwrite 不能解决重复定义
+    assert merge(target, source, overwrite=True)["conflicts"] == expected
+    assert not os.path.exists(os.path.join(target, CONFIG))
+
+def test_id_conflict_within_output(tmp_path, target):
+    # 同一次合并中的两个新配置定义了相同的 ID
+    source = make_output(str(tmp_path / "out"), {
+        "a/configuration/items.yml": items("demo:gem"),
+        "b/configuration/items.yml": items("demo:gem")
+    })
+    report = merge(target, source)
+    assert report["added"] == ["a/configuration/items.yml"]
+    assert report["conflicts"] == [
+        {"path": "b/configuration/items.yml", "reason": "ids", "ids": {"items:demo:gem": ["a/configuration/items.yml"]}}
+    ]
+    # 再次合并时冲突来自索引中记录的 ID
+    report = merge(target, source)
+    assert report["identical"] == 1
+    assert report["conflicts"][0]["ids"] == {"items:demo:gem": ["a/configuration/items.yml"]}
+
+def test_moved_id_is_not_a_conflict(tmp_path, target):
+    # 之前合并写入的配置不再定义某个 ID，同一次合并中的其他配置改为定义它
+    merge(target, make_output(str(tmp_path / "first"), {"a/configuration/items.yml": items("demo:gem", "demo:ruby")}))
+    source = make_output(str(tmp_path / "second"), {
+        "a/configuration/items.yml": items("demo:gem"),
+        "b/configuration/items.yml": items("demo:ruby")
+    })
+    report = merge(target, source)
+    assert report["updated"] == ["a/configuration/items.yml"]
+    assert report["added"] == ["b/configuration/items.yml"]
+    assert report["conflicts"] == []
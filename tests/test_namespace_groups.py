@@ -0,0 +1,80 @@
+import os
+import io
+import zipfile
+
+import yaml
+
+from conftest import make_pack, zip_dir, upload, download
+
+def make_multi_pack(root):
+    """两个命名空间的物品包，另有一个只有分类、没有物品的命名空间。"""
+    make_pack(root, namespace="alpha", n_items=3)
+    make_pack(root, namespace="beta", n_items=2)
+    configs_dir = os.path.join(root, "ItemsAdder", "contents", "gamma", "configs")
+    os.makedirs(configs_dir)
+    with open(os.path.join(configs_dir, "categories.yml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump({
+            "info": {"namespace": "gamma"},
+            "categories": {"extra": {"name": "Extra", "icon": "beta:gem_0", "items": ["beta:gem_0", "alpha:gem_1"]}}
+        }, f, sort_keys=False)
+    return root
+
+def test_plan_groups(tmp_path, web_app):
+    payload, _ = upload(web_app, zip_dir(make_multi_pack(str(tmp_path / "pack")), str(tmp_path / "pack.zip")))
+    session_id = payload["session_id"]
+    session_upload_dir = os.path.join(web_app.app.config["UPLOAD_FOLDER"], session_id)
+    manifest = web_app.get_session_manifest(session_id)
+    options = web_app.parse_conversion_options({})
+    tasks, warnings = web_app.plan_conversion(session_upload_dir, manifest, options, str(tmp_path / "out"))
+    assert warnings == []
+
+    contents = os.path.join(manifest.root, "ItemsAdder", "contents")
+    groups = {task["original_namespace"]: task for task in tasks}
+    assert sorted(groups) == ["alpha", "beta"]
+    for namespace, task in groups.items():
+        assert task["namespace"] == namespace
+        assert task["info"]["namespace"] == namespace
+        assert task["items_configs"] == [os.path.join(contents, namespace, "configs", "items.yml")]
+        # 每个分组使用包含 assets/<namespace> 的资源包
+        assert task["resourcepack_path"] == os.path.join(contents, namespace, "resourcepack")
+        # 所有分组共用同一张映射表改写跨命名空间引用
+        assert task["namespace_map"] is groups["alpha"]["namespace_map"] is not None
+
+    # 没有物品的命名空间的分类归入默认分组 (第一个 info 的命名空间)
+    default = tasks[0]
+    gamma = os.path.join(contents, "gamma", "configs", "categories.yml")
+    assert gamma in default["categories_configs"]
+    assert all(gamma not in task["categories_configs"] for task in tasks[1:])
+
+    # 多命名空间物品包不支持精简模式
+    _, warnings = web_app.plan_conversion(
+        session_upload_dir, manifest, {**options, "prune": True}, str(tmp_path / "out")
+    )
+    assert warnings == ["多命名空间物品包不支持精简模式，已迁移全部资源"]
+
+def test_groups_match_serial_conversion(tmp_path, web_app, monkeypatch):
+    zip_path = zip_dir(make_multi_pack(str(tmp_path / "pack")), str(tmp_path / "pack.zip"))
+    payload, _ = upload(web_app, zip_path)
+
+    # 多个分组在进程池中并行转换
+    parallel, status = web_app.run_conversion(payload["session_id"], {})
+    assert status == 200, parallel
+    assert sorted(parallel["namespaces"]) == ["alpha", "beta"]
+
+    monkeypatch.setattr(web_app, "run_conversion_tasks",
+                        lambda tasks: [web_app.convert_namespace_group(task) for task in tasks])
+    serial, status = web_app.run_conversion(payload["session_id"], {})
+    assert status == 200, serial
+
+    parallel_data = download(web_app, parallel["download_url"])
+    assert download(web_app, serial["download_url"]) == parallel_data
+
+    names = zipfile.ZipFile(io.BytesIO(parallel_data)).namelist()
+    for namespace in ("alpha", "beta"):
+        assert f"CraftEngine/resources/{namespace}/configuration/items/{namespace}/items.yml" in names
+        assert f"CraftEngine/resources/{namespace}/resourcepack/assets/{namespace}/models/item/gem_0.json" in names
+    assert not any("gamma/" in name for name in names)
+    # 没有物品的命名空间的分类写入默认分组的输出
+    archive = zipfile.ZipFile(io.BytesIO(parallel_data))
+    categories = yaml.safe_load(archive.read("CraftEngine/resources/alpha/configuration/items/alpha/categories.yml"))
+    assert "alpha:extra" in categories["categories"]
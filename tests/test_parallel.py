@@ -0,0 +1,57 @@
+import os
+import hashlib
+
+import pytest
+
+from conftest import make_pack, zip_dir, convert, download
+from src.converters import base, ia_to_ce
+from src.converters.ia_to_ce import IAConverter
+
+@pytest.fixture(autouse=True)
+def small_shards(monkeypatch):
+    # 降低并行阈值和序列化分块大小，少量物品也会使用进程池并切分为多个分片
+    monkeypatch.setattr(ia_to_ce, "PARALLEL_MIN_ITEMS", 8)
+    monkeypatch.setattr(ia_to_ce, "YAML_CHUNK_SIZE", 4)
+    # _submit_yaml 的分块大小是默认参数 (定义时绑定)
+    monkeypatch.setattr(base.BaseConverter._submit_yaml, "__defaults__", (4,))
+
+def test_parallel_conversion_matches_serial(tmp_path, web_app, monkeypatch):
+    # 物品数超过并行阈值，转换 (027) 和 YAML 序列化 (034) 都会使用进程池 (单核机器上也使用多个进程)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    zip_path = zip_dir(make_pack(str(tmp_path / "pack"), n_items=40), str(tmp_path / "pack.zip"))
+
+    serial, status = convert(web_app, zip_path)
+    assert status == 200, serial
+    parallel, status = convert(web_app, zip_path, parallel="1")
+    assert status == 200, parallel
+
+    serial_data = download(web_app, serial["download_url"])
+    parallel_data = download(web_app, parallel["download_url"])
+    assert hashlib.sha1(parallel_data).hexdigest() == hashlib.sha1(serial_data).hexdigest()
+
+def test_item_shards_merge_in_order(tmp_path):
+    make_pack(str(tmp_path / "pack"), n_items=40)
+    config = os.path.join(str(tmp_path / "pack"), "ItemsAdder", "contents", "demo", "configs", "items.yml")
+
+    serial = IAConverter()
+    items = serial.load_config(config)["items"]
+    serial.namespace = "demo"
+    serial._convert_items(items)
+
+    parallel = IAConverter(max_workers=2)
+    parallel.namespace = "demo"
+    assert parallel._parallel_enabled(len(items))
+    parallel._convert_items(items)
+
+    assert list(parallel.ce_config["items"]) == list(serial.ce_config["items"])
+    assert parallel.generated_models == serial.generated_models
+
+def test_convert_item_shard(tmp_path):
+    converter = IAConverter()
+    items, templates, generated_models = converter.convert_item_shard("demo", None, {
+        "gem": {"resource": {"material": "PAPER", "generate": True, "textures": ["item/gem.png"]}}
+    })
+    assert list(items) == ["demo:gem"]
+    assert generated_models == {
+        "item/gem.json": {"parent": "minecraft:item/generated", "textures": {"layer0": "demo:item/gem"}}
+    }
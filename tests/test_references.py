@@ -0,0 +1,52 @@
+import io
+import zipfile
+
+from conftest import convert, download
+from src.converters.ia_to_ce import IAConverter
+
+ASSETS = "CraftEngine/resources/demo/resourcepack/assets/demo/"
+
+def archive_names(web_app, payload):
+    return set(zipfile.ZipFile(io.BytesIO(download(web_app, payload["download_url"]))).namelist())
+
+def test_dangling_references(web_app, pack_zip):
+    payload, status = convert(web_app, pack_zip)
+    assert status == 200, payload
+    report = payload["reference_report"]
+    # 只有 ghost 引用的模型不存在；旧格式装备的图层路径带 .png，也不应被视为悬空引用
+    assert report["dangling"] == [
+        {"type": "model", "ref": "demo:item/furniture/missing", "referenced_by": ["demo:ghost"]}
+    ]
+    assert report["unreferenced_count"] == 2
+    assert report["pruned"] is False
+
+    names = archive_names(web_app, payload)
+    assert f"{ASSETS}models/item/unused/draft.json" in names
+    assert f"{ASSETS}textures/item/unused/draft.png" in names
+
+def test_prune_unreferenced(web_app, pack_zip):
+    payload, status = convert(web_app, pack_zip, prune="1")
+    assert status == 200, payload
+    assert payload["reference_report"]["pruned"] is True
+
+    names = archive_names(web_app, payload)
+    assert f"{ASSETS}models/item/unused/draft.json" not in names
+    assert f"{ASSETS}textures/item/unused/draft.png" not in names
+    # 被物品、模型和装备引用的资源保留
+    for path in (
+        "models/item/furniture/chair.json",
+        "textures/item/furniture/wood.png",
+        "models/item/gem_0.json",
+        "textures/item/gem_0.png",
+        "textures/armor/ruby_layer_1.png",
+        "textures/armor/ruby_layer_2.png"
+    ):
+        assert f"{ASSETS}{path}" in names
+
+def test_legacy_equipment_layers_strip_extension():
+    converter = IAConverter()
+    converter.namespace = "demo"
+    converter._convert_equipments({"ruby": {"layer_1": "armor/ruby_layer_1.png", "layer_2": "armor/ruby_layer_2"}})
+    equipment = converter.ce_config["equipments"]["demo:ruby"]
+    assert equipment.humanoid == "demo:armor/ruby_layer_1"
+    assert equipment.humanoid_leggings == "demo:armor/ruby_layer_2"
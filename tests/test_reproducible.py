@@ -0,0 +1,59 @@
+import os
+import io
+import time
+import hashlib
+import zipfile
+
+from conftest import make_pack, zip_dir, convert, download
+from src.manifest import write_archive
+
+def sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+def test_same_pack_gives_same_archive(tmp_path, web_app):
+    zip_path = zip_dir(make_pack(str(tmp_path / "pack")), str(tmp_path / "pack.zip"))
+    first, status = convert(web_app, zip_path)
+    assert status == 200, first
+
+    # 重新生成物品包 (文件的修改时间不同)，在另一个会话中转换
+    time.sleep(1.1)
+    zip_path = zip_dir(make_pack(str(tmp_path / "pack_again")), str(tmp_path / "pack_again.zip"))
+    second, status = convert(web_app, zip_path)
+    assert status == 200, second
+
+    first_data = download(web_app, first["download_url"])
+    assert sha1(download(web_app, second["download_url"])) == sha1(first_data)
+    assert download(web_app, second["manifest_url"]) == download(web_app, first["manifest_url"])
+
+    infos = zipfile.ZipFile(io.BytesIO(first_data)).infolist()
+    assert [info.filename for info in infos] == sorted(info.filename for info in infos)
+    assert {info.date_time for info in infos} == {(1980, 1, 1, 0, 0, 0)}
+    assert {info.external_attr >> 16 for info in infos} == {0o644}
+
+def write_files(root, names):
+    paths = []
+    for name in names:
+        path = os.path.join(root, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(name)
+        paths.append(path)
+    return paths
+
+def test_write_archive_ignores_order_and_mtime(tmp_path):
+    names = ["b.yml", "a/z.json", "a/b.png"]
+    first = write_files(str(tmp_path / "first"), names)
+    second = write_files(str(tmp_path / "second"), reversed(names))
+    for path in second:
+        os.utime(path, (0, 0))
+
+    hashes = write_archive(str(tmp_path / "first.zip"), str(tmp_path / "first"), first)
+    assert write_archive(str(tmp_path / "second.zip"), str(tmp_path / "second"), second) == hashes
+    assert hashes == {name: sha1(name.encode("utf-8")) for name in names}
+    assert (tmp_path / "first.zip").read_bytes() == (tmp_path / "second.zip").read_bytes()
+
+def test_source_date_epoch(tmp_path, monkeypatch):
+    files = write_files(str(tmp_path / "out"), ["a.yml"])
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    write_archive(str(tmp_path / "out.zip"), str(tmp_path / "out"), files)
+    assert zipfile.ZipFile(str(tmp_path / "out.zip")).getinfo("a.yml").date_time == (2023, 11, 14, 22, 13, 20)
@@ -0,0 +1,73 @@
+import os
+import tracemalloc
+
+import pytest
+import yaml
+
+from src.scanner import classify_config, summarize_config, scan_ia_sources
+
+CONFIGS = {
+    "items": "info: {namespace: demo}\nitems:\n  sword: {display_name: Sword}\n  1: {lore: [a, b]}\n",
+    "equipments": "equipments:\n  ruby: {layer_1: armor/ruby_layer_1}\n",
+    "rendering": "armors_rendering: {}\n",
+    "categories": "info: {namespace: demo}\ncategories:\n  main: {items: [demo:sword]}\n",
+    "null_items": "items:\ninfo: {namespace: demo}\n",
+    "other": "settings: {a: 1}\n",
+    "empty": "",
+    "list": "- items\n- b\n",
+    "duplicate": "items:\n  a: {display_name: First}\n  b: {}\n  a: {display_name: Second}\n",
+    # 物品数据中的锚点和合并键会被跳过，不影响读取物品键
+    "anchors": "defaults: &d {material: PAPER}\nitems:\n  a: {resource: {<<: *d}}\n  b: &b {lore: [x]}\n  c: *b\n",
+    # 以下写法需要完整载入
+    "info_alias": "defaults: &info {namespace: demo}\ninfo: *info\nitems: {a: {}}\n",
+    "items_alias": "all: &all {a: {}, b: {}}\nitems: *all\n",
+    "merged_items": "base: &base {a: {}}\nitems:\n  <<: *base\n  b: {}\n",
+    "invalid": "items:\n  a: [unclosed\n"
+}
+
+@pytest.mark.parametrize("name", sorted(CONFIGS))
+def test_summary_matches_full_load(tmp_path, name):
+    path = tmp_path / f"{name}.yml"
+    path.write_text(CONFIGS[name], encoding="utf-8")
+    kind, data = classify_config(str(path))
+    summary_kind, summary = summarize_config(str(path))
+    assert summary_kind == kind
+    if kind is None:
+        return
+    items = data.get("items")
+    assert summary["info"] == data.get("info")
+    assert summary["item_keys"] == (list(items) if isinstance(items, dict) else [])
+
+def write_items(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("info:\n  namespace: demo\nitems:\n")
+        for i in range(count):
+            f.write(
+                f"  item_{i}:\n    display_name: Item {i}\n    lore: [first line {i}, second line {i}]\n"
+                f"    resource: {{material: PAPER, generate: true, textures: [item/item_{i}.png]}}\n"
+            )
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_scan_memory_is_bounded(tmp_path):
+    configs = tmp_path / "ItemsAdder" / "contents" / "demo" / "configs"
+    configs.mkdir(parents=True)
+    write_items(str(configs / "items.yml"), 500)
+
+    def full_load(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f)
+
+    _, full_peak = peak_memory(full_load, str(configs / "items.yml"))
+    sources, scan_peak = peak_memory(scan_ia_sources, str(tmp_path))
+    assert sources["info"] == {"namespace": "demo"}
+    assert len(sources["item_index"]) == 500
+    assert sources["item_index"]["item_499"] == os.path.join(str(configs), "items.yml")
+    # 只保留物品键，峰值远低于完整载入
+    assert scan_peak * 10 < full_peak
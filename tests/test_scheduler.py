@@ -0,0 +1,94 @@
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from conftest import upload
+from src.scheduler import ConversionScheduler, QueueFullError
+
+def wait_for(event):
+    event.wait(30)
+    return "done"
+
+def allocate(size_mb):
+    data = bytearray(size_mb * 1024 * 1024)
+    for i in range(0, len(data), 4096):
+        data[i] = 1
+    time.sleep(5)
+    return len(data)
+
+def burn(seconds):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        pass
+
+def pooled(func, arg, workers):
+    # 任务自身启动的进程池 (与并行转换相同)
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(func, [arg] * workers))
+
+def test_queue_positions_and_admission():
+    scheduler = ConversionScheduler(max_jobs=1, max_queue=2)
+    release = multiprocessing.Event()
+    running = scheduler.submit(wait_for, release)
+    queued = [scheduler.submit(wait_for, release) for _ in range(2)]
+
+    assert [scheduler.position(job) for job in [running] + queued] == [0, 1, 2]
+    assert running.status == "running"
+    assert scheduler.estimated_wait(running) == 0
+    assert 0 < scheduler.estimated_wait(queued[0]) < scheduler.estimated_wait(queued[1])
+    with pytest.raises(QueueFullError) as error:
+        scheduler.submit(wait_for, release)
+    assert error.value.retry_after > scheduler.estimated_wait(queued[1])
+
+    release.set()
+    assert [job.future.result(30) for job in [running] + queued] == ["done"] * 3
+    assert scheduler.position(queued[1]) == 0
+    assert scheduler.get(queued[1].job_id) is queued[1]
+
+def test_queue_full_response(web_app, monkeypatch):
+    monkeypatch.setattr(web_app, "_scheduler", ConversionScheduler(max_jobs=1, max_queue=0))
+    client = web_app.app.test_client()
+    for url in ("/api/jobs", "/api/convert"):
+        response = client.post(url, data={"session_id": "unused"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(response.get_json()["retry_after"])
+
+def test_job_status(web_app, monkeypatch, pack_zip):
+    monkeypatch.setattr(web_app, "_scheduler", ConversionScheduler(max_jobs=1, max_queue=2))
+    client = web_app.app.test_client()
+    payload, _ = upload(web_app, pack_zip)
+
+    response = client.post("/api/jobs", data={"session_id": payload["session_id"]})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    deadline = time.time() + 60
+    while True:
+        status = client.get(f"/api/jobs/{job_id}").get_json()
+        if status["status"] == "done" or time.time() > deadline:
+            break
+        time.sleep(0.1)
+    assert status["position"] == 0
+    assert status["result_status"] == 200
+    assert status["result"]["status"] == "success"
+
+    assert client.get("/api/jobs/unknown").status_code == 404
+
+def test_memory_limit_covers_worker_pool():
+    # 每个进程都没有超出上限，但整个进程组的常驻内存超出
+    scheduler = ConversionScheduler(max_jobs=1, memory_limit_mb=512)
+    job = scheduler.submit(pooled, allocate, 200, 4)
+    with pytest.raises(RuntimeError, match="内存限制"):
+        job.future.result(60)
+
+def test_cpu_limit_covers_worker_pool():
+    scheduler = ConversionScheduler(max_jobs=1, cpu_time_limit=2)
+    job = scheduler.submit(pooled, burn, 10, 3)
+    with pytest.raises(RuntimeError, match="CPU 时间限制"):
+        job.future.result(60)
+
+def test_job_without_limits_returns_result():
+    scheduler = ConversionScheduler(max_jobs=1)
+    assert scheduler.submit(pooled, burn, 0.1, 2).future.result(30) == [None, None]
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+import yaml
+
+from conftest import make_pack
+from src.converters import ia_to_ce
+from src.converters.ia_to_ce import IAConverter
+
+def write_config(path, items, **sections):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump({"info": {"namespace": "demo"}, "items": items, **sections}, f, sort_keys=False)
+    return path
+
+def gems(count, prefix="gem"):
+    return {
+        f"{prefix}_{i}": {"resource": {"material": "PAPER", "generate": True, "textures": [f"item/{prefix}_{i}.png"]}}
+        for i in range(count)
+    }
+
+def read_shards(output_dir):
+    shards = {}
+    for root, dirs, files in os.walk(output_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, "r", encoding="utf-8") as f:
+                shards[os.path.relpath(path, output_dir).replace(os.sep, "/")] = yaml.safe_load(f)
+    return shards
+
+def test_shards_continue_in_source_order(tmp_path):
+    config = write_config(
+        str(tmp_path / "configs" / "items.yml"), gems(7),
+        equipments={"ruby": {"layer_1": "armor/ruby_layer_1", "layer_2": "armor/ruby_layer_2"}}
+    )
+    output_dir = str(tmp_path / "out")
+    item_ids = IAConverter().convert_stream([config], output_dir, namespace="demo", chunk_size=3)
+
+    shards = read_shards(output_dir)
+    assert sorted(shards) == ["categories.yml", "items_part1.yml", "items_part2.yml", "items_part3.yml"]
+    assert [list(shards[f"items_part{n}.yml"]["items"]) for n in (1, 2, 3)] == [
+        ["demo:gem_0", "demo:gem_1", "demo:gem_2"],
+        ["demo:gem_3", "demo:gem_4", "demo:gem_5"],
+        ["demo:gem_6"]
+    ]
+    assert item_ids == [f"demo:gem_{i}" for i in range(7)]
+    # 装备写入第一个分片 (源文件中的装备位于物品之后)
+    assert list(shards["items_part1.yml"]["equipments"]) == ["demo:ruby"]
+    assert "equipments" not in shards["items_part3.yml"]
+
+@pytest.mark.parametrize("chunk_size", [None, 0, 4, 10])
+def test_single_shard_keeps_source_name(tmp_path, chunk_size):
+    config = write_config(str(tmp_path / "configs" / "items.yml"), gems(4))
+    output_dir = str(tmp_path / "out")
+    IAConverter().convert_stream([config], output_dir, namespace="demo", chunk_size=chunk_size)
+    assert sorted(read_shards(output_dir)) == ["categories.yml", "items.yml"]
+
+def test_shards_follow_source_tree(tmp_path):
+    source_root = str(tmp_path / "configs")
+    configs = [
+        write_config(os.path.join(source_root, "items.yml"), gems(2)),
+        write_config(os.path.join(source_root, "weapons", "swords.yml"), gems(3, "sword"))
+    ]
+    output_dir = str(tmp_path / "out")
+    IAConverter().convert_stream(configs, output_dir, source_root=source_root, namespace="demo", chunk_size=2)
+
+    shards = read_shards(output_dir)
+    assert sorted(shards) == ["categories.yml", "items.yml", "weapons/swords_part1.yml", "weapons/swords_part2.yml"]
+    assert list(shards["weapons/swords_part2.yml"]["items"]) == ["demo:sword_2"]
+    # 没有分类时生成包含所有分片中物品的默认分类
+    category = next(iter(shards["categories.yml"]["categories"].values()))
+    assert category["list"] == ["demo:gem_0", "demo:gem_1", "demo:sword_0", "demo:sword_1", "demo:sword_2"]
+
+def test_parallel_streaming_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(ia_to_ce, "PARALLEL_MIN_ITEMS", 4)
+    config = write_config(str(tmp_path / "configs" / "items.yml"), gems(25))
+
+    outputs = []
+    for max_workers in (None, 2):
+        output_dir = str(tmp_path / f"out_{max_workers}")
+        IAConverter(max_workers=max_workers).convert_stream([config], output_dir, namespace="demo", chunk_size=6)
+        outputs.append(read_shards(output_dir))
+    assert outputs[0] == outputs[1]
+    assert len(outputs[0]) == 6 # 5 个分片和 categories.yml
+
+def test_streaming_migrates_pack_resources(tmp_path):
+    pack = make_pack(str(tmp_path / "pack"))
+    ia_dir = os.path.join(pack, "ItemsAdder", "contents", "demo")
+    converter = IAConverter()
+    converter.set_resource_paths(os.path.join(ia_dir, "resourcepack"), str(tmp_path / "resourcepack"))
+    converter.convert_stream(
+        [os.path.join(ia_dir, "configs", "items.yml")], str(tmp_path / "configs"), namespace="demo", chunk_size=2
+    )
+    models_dir = tmp_path / "resourcepack" / "assets" / "demo" / "models" / "item"
+    assert (models_dir / "gem_0.json").is_file()
+    assert (models_dir / "furniture" / "chair.json").is_file()
@@ -0,0 +1,100 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from src.vfs import ZipFS, ArchiveLimits, ArchiveLimitError, zip_entry_count
+
+def make_zip(path, entries, compression=zipfile.ZIP_DEFLATED, comment=b""):
+    with zipfile.ZipFile(path, "w", compression) as zf:
+        for name, data in entries:
+            zf.writestr(name, data)
+        zf.comment = comment
+    return path
+
+def open_zip(path, **limits):
+    return ZipFS(path, os.path.splitext(path)[0], ArchiveLimits(**limits))
+
+def test_within_limits(tmp_path):
+    path = make_zip(str(tmp_path / "ok.zip"), [("a/b.yml", b"items: {}"), ("a/c.png", os.urandom(2048))])
+    fs = open_zip(path, max_total_size=1024 * 1024, max_ratio=10, max_entries=2, max_depth=2)
+    assert sorted(fs.files) == [os.path.join("a", "b.yml"), os.path.join("a", "c.png")]
+
+def test_total_size(tmp_path):
+    path = make_zip(str(tmp_path / "size.zip"), [(f"f{i}.png", os.urandom(600 * 1024)) for i in range(2)])
+    with pytest.raises(ArchiveLimitError, match="解压后的大小"):
+        open_zip(path, max_total_size=1024 * 1024)
+
+def test_member_ratio(tmp_path):
+    path = make_zip(str(tmp_path / "bomb.zip"), [("a.bin", b"\0" * (8 * 1024 * 1024))])
+    with pytest.raises(ArchiveLimitError, match="成员 a.bin 的压缩比"):
+        open_zip(path, max_ratio=100)
+
+def test_cumulative_ratio(tmp_path):
+    # 每个成员都小于单独检查的阈值，累计的压缩比超出上限
+    path = make_zip(str(tmp_path / "small.zip"), [(f"f{i}.bin", b"\0" * (256 * 1024)) for i in range(16)])
+    with pytest.raises(ArchiveLimitError, match="压缩包的压缩比"):
+        open_zip(path, max_ratio=100)
+
+def test_small_compressible_members_allowed(tmp_path):
+    # 少量高压缩比的小文件 (解压后总共不到 1 MB) 不会被拒绝
+    path = make_zip(str(tmp_path / "small.zip"), [(f"f{i}.json", b" " * 20000) for i in range(4)])
+    open_zip(path, max_ratio=10)
+
+def test_entry_count(tmp_path):
+    path = make_zip(str(tmp_path / "many.zip"), [(f"f{i}.txt", b"") for i in range(20)])
+    with pytest.raises(ArchiveLimitError, match="文件数"):
+        open_zip(path, max_entries=10)
+
+def test_depth(tmp_path):
+    path = make_zip(str(tmp_path / "deep.zip"), [("/".join(["d"] * 8) + "/x.yml", b"a: 1")])
+    with pytest.raises(ArchiveLimitError, match="路径层级"):
+        open_zip(path, max_depth=8)
+    open_zip(path, max_depth=9)
+
+@pytest.mark.parametrize("count, comment", [(0, b""), (3, b"comment"), (70000, b"")])
+def test_zip_entry_count(tmp_path, count, comment):
+    # 70000 个成员超出 EOCD 的 16 位计数，使用 ZIP64 记录
+    path = make_zip(str(tmp_path / "count.zip"), [(f"f{i}", b"") for i in range(count)], zipfile.ZIP_STORED, comment)
+    with open(path, "rb") as f:
+        assert zip_entry_count(f) == count
+
+def test_zip_entry_count_not_zip():
+    assert zip_entry_count(io.BytesIO(b"not a zip file")) is None
+
+def test_limits_from_env(monkeypatch):
+    monkeypatch.setenv("MCC_ZIP_MAX_SIZE_MB", "0")
+    monkeypatch.setenv("MCC_ZIP_MAX_RATIO", "50")
+    monkeypatch.delenv("MCC_ZIP_MAX_ENTRIES", raising=False)
+    monkeypatch.setenv("MCC_ZIP_MAX_DEPTH", "invalid")
+    limits = ArchiveLimits.from_env()
+    assert limits.max_total_size is None
+    assert limits.max_ratio == 50
+    assert limits.max_entries == 200000
+    assert limits.max_depth == 32
+
+def test_upload_over_budget(web_app, tmp_path, monkeypatch):
+    monkeypatch.setenv("MCC_ZIP_MAX_ENTRIES", "10")
+    path = make_zip(str(tmp_path / "many.zip"), [(f"f{i}.txt", b"") for i in range(20)])
+    with open(path, "rb") as f:
+        response = web_app.app.test_client().post(
+            "/api/analyze", data={"file": (f, "many.zip")}, content_type="multipart/form-data"
+        )
+    assert response.status_code == 413
+
+@pytest.mark.parametrize("url", ["/api/upload", "/api/convert"])
+def test_upload_errors(web_app, tmp_path, monkeypatch, url):
+    # 直接上传并转换的传统模式与上传接口返回相同的错误
+    monkeypatch.setenv("MCC_ZIP_MAX_RATIO", "100")
+    client = web_app.app.test_client()
+    bomb = make_zip(str(tmp_path / "bomb.zip"), [("a.bin", b"\0" * (8 * 1024 * 1024))])
+    with open(bomb, "rb") as f:
+        response = client.post(url, data={"file": (f, "bomb.zip")}, content_type="multipart/form-data")
+    assert response.status_code == 413
+    assert "压缩比" in response.get_json()["error"]
+
+    response = client.post(url, data={"file": (io.BytesIO(b"not a zip file"), "broken.zip")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("无效的 zip 文件")
@@ -0,0 +1,108 @@
+import os
+import filecmp
+
+import pytest
+import yaml
+
+from conftest import make_pack, png
+from src.watcher import IAWatcher
+
+def tree(root):
+    files = set()
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            files.add(os.path.relpath(os.path.join(dirpath, name), root))
+    return files
+
+def assert_matches_build(pack, output_dir, tmp_path):
+    """增量更新后的输出与重新完整转换的结果相同。"""
+    fresh = str(tmp_path / "fresh")
+    IAWatcher(pack, fresh).build()
+    assert tree(output_dir) == tree(fresh)
+    for rel_path in tree(fresh):
+        assert filecmp.cmp(os.path.join(output_dir, rel_path), os.path.join(fresh, rel_path), shallow=False), rel_path
+
+@pytest.fixture
+def watched(tmp_path):
+    pack = make_pack(str(tmp_path / "pack"))
+    output_dir = str(tmp_path / "out")
+    watcher = IAWatcher(pack, output_dir)
+    watcher.build()
+    return pack, output_dir, watcher
+
+def source(pack, *parts):
+    return os.path.join(pack, "ItemsAdder", "contents", "demo", *parts)
+
+def assets(pack, rel_path):
+    return source(pack, "resourcepack", "assets", "demo", *rel_path.split("/"))
+
+def output(output_dir, rel_path):
+    return os.path.join(output_dir, "demo", *rel_path.split("/"))
+
+def edit_config(pack, edit):
+    path = source(pack, "configs", "items.yml")
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    edit(data)
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, sort_keys=False)
+
+def test_unchanged(watched):
+    _, _, watcher = watched
+    assert watcher.poll() is None
+
+def test_texture_edit(watched, tmp_path):
+    pack, output_dir, watcher = watched
+    with open(assets(pack, "textures/furniture/wood.png"), "wb") as f:
+        f.write(png(16, 16))
+    summary = watcher.poll()
+    # 只重新转换引用该纹理的物品，配置文件不变
+    assert summary["items"] == ["chair"]
+    assert summary["migrated"] == [output(output_dir, "resourcepack/assets/demo/textures/item/furniture/wood.png")]
+    assert summary["written"] == []
+    assert_matches_build(pack, output_dir, tmp_path)
+
+def test_item_edit(watched, tmp_path):
+    pack, output_dir, watcher = watched
+
+    def rename(data):
+        data["items"]["gem_0"]["display_name"] = "Renamed"
+    edit_config(pack, rename)
+    summary = watcher.poll()
+    assert summary["items"] == ["gem_0"]
+    assert summary["written"] == [output(output_dir, "configuration/items/demo/items.yml")]
+    assert_matches_build(pack, output_dir, tmp_path)
+
+def test_remove_equipments(watched, tmp_path):
+    pack, output_dir, watcher = watched
+    armor = output(output_dir, "configuration/items/demo/armor.yml")
+    assert os.path.exists(armor)
+    edit_config(pack, lambda data: data.pop("equipments"))
+    summary = watcher.poll()
+    assert summary["deleted"] == [armor]
+    assert not os.path.exists(armor)
+    assert_matches_build(pack, output_dir, tmp_path)
+
+def test_remove_item(watched, tmp_path):
+    pack, output_dir, watcher = watched
+    model = output(output_dir, "resourcepack/assets/demo/models/item/gem_0.json")
+    assert os.path.exists(model)
+    edit_config(pack, lambda data: data["items"].pop("gem_0"))
+    os.remove(assets(pack, "textures/item/gem_0.png"))
+    summary = watcher.poll()
+    assert summary["items"] == ["gem_0"]
+    assert model in summary["deleted"]
+    assert not os.path.exists(model)
+    assert summary["written"] == [output(output_dir, "configuration/items/demo/items.yml")]
+    assert_matches_build(pack, output_dir, tmp_path)
+
+def test_missing_model_added(watched, tmp_path):
+    pack, output_dir, watcher = watched
+    os.makedirs(os.path.dirname(assets(pack, "models/furniture/missing.json")), exist_ok=True)
+    with open(assets(pack, "models/furniture/missing.json"), "w", encoding="utf-8") as f:
+        f.write('{"textures": {"0": "demo:furniture/wood"}}')
+    summary = watcher.poll()
+    # 之前引用缺失模型的物品被重新转换
+    assert summary["items"] == ["ghost"]
+    assert output(output_dir, "resourcepack/assets/demo/models/item/furniture/missing.json") in summary["migrated"]
+    assert_matches_build(pack, output_dir, tmp_path)
@@ -0,0 +1,107 @@
+import io
+
+import pytest
+import yaml
+
+from src.converters.base import iter_yaml_sections
+
+def rebuild(text, stream_key="items"):
+    """将 iter_yaml_sections 产出的条目重新组装为文档。"""
+    data = {}
+    for section, key, value in iter_yaml_sections(io.StringIO(text), stream_key):
+        if section is None:
+            data[key] = value
+        else:
+            data.setdefault(section, {})[key] = value
+    return data
+
+PLAIN = """
+info:
+  namespace: demo
+items:
+  sword:
+    display_name: Sword
+    resource: {material: DIAMOND_SWORD, generate: true, textures: [item/sword.png]}
+  "quoted key":
+    lore: [a, b, 1, 2.5, null, true]
+equipments:
+  ruby: {layer_1: armor/ruby_layer_1}
+"""
+
+ANCHORS = """
+defaults: &defaults
+  material: PAPER
+  generate: true
+items:
+  base: &base
+    display_name: Base
+    resource:
+      <<: *defaults
+      textures: [item/base.png]
+  sword:
+    <<: *base
+    display_name: Sword
+  shield:
+    resource:
+      <<: [*defaults, {material: SHIELD}]
+    lore: &lore [first, second]
+  helmet:
+    lore: *lore
+categories:
+  main: {items: [demo:base, demo:sword]}
+"""
+
+# items 映射自身带锚点并在后面被引用时，整体构建后再产出
+ANCHORED_ITEMS = """
+items: &all
+  a: {display_name: A}
+  b: {display_name: B}
+backup: *all
+"""
+
+@pytest.mark.parametrize("text", [PLAIN, ANCHORS, ANCHORED_ITEMS])
+def test_matches_safe_load(text):
+    assert rebuild(text) == yaml.safe_load(text)
+
+def test_items_are_yielded_one_by_one():
+    entries = list(iter_yaml_sections(io.StringIO(ANCHORS)))
+    assert [(section, key) for section, key, _ in entries] == [
+        (None, "defaults"),
+        ("items", "base"),
+        ("items", "sword"),
+        ("items", "shield"),
+        ("items", "helmet"),
+        (None, "categories")
+    ]
+    sword = entries[2][2]
+    assert sword == {"display_name": "Sword", "resource": {"material": "PAPER", "generate": True, "textures": ["item/base.png"]}}
+
+def test_other_stream_key():
+    text = "info: {namespace: demo}\ncategories:\n  main: {name: Main}\n  extra: {name: Extra}\n"
+    assert list(iter_yaml_sections(io.StringIO(text), "categories")) == [
+        (None, "info", {"namespace": "demo"}),
+        ("categories", "main", {"name": "Main"}),
+        ("categories", "extra", {"name": "Extra"})
+    ]
+
+@pytest.mark.parametrize("text", ["", "# comment only\n", "- a\n- b\n", "just a string\n"])
+def test_non_mapping_documents(text):
+    assert list(iter_yaml_sections(io.StringIO(text))) == []
+
+def test_items_not_a_mapping():
+    assert list(iter_yaml_sections(io.StringIO("items:\ninfo: {namespace: demo}\n"))) == [
+        (None, "items", None),
+        (None, "info", {"namespace": "demo"})
+    ]
+
+def test_duplicate_keys_are_yielded_separately():
+    text = "items:\n  a: {display_name: First}\n  a: {display_name: Second}\n"
+    assert [value for _, _, value in iter_yaml_sections(io.StringIO(text))] == [
+        {"display_name": "First"}, {"display_name": "Second"}
+    ]
+    # 组装后与 safe_load 相同 (后一个值覆盖前一个)
+    assert rebuild(text) == yaml.safe_load(text)
+
+def test_invalid_yaml_raises():
+    with pytest.raises(yaml.YAMLError):
+        list(iter_yaml_sections(io.StringIO("items:\n  a: [unclosed\n")))
@@ -1,18 +1,15 @@
 from flask import Flask, render_template, request, send_file, jsonify
+from werkzeug.utils import safe_join
 import os
-import shutil
-import zipfile
 import uuid
 import re
-from threading import Thread
+import json
 import time
-import yaml
+import threading
 
-# 导入核心逻辑
+# 核心逻辑 (转换器、分析器、YAML) 在路由中首次使用时才导入，以缩短启动时间
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from src.converters.ia_to_ce import IAConverter
-from src.analyzer import PackageAnalyzer
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = os.path.join(os.getcwd(), 'temp_uploads')
@@ -36,60 +33,262 @@ def analyze():
     if file.filename == '':
         return jsonify({'error': '未选择文件'}), 400
 
-    if file:
-        session_id = str(uuid.uuid4())
-        session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
-        os.makedirs(session_upload_dir, exist_ok=True)
+    session_id = str(uuid.uuid4())
+    session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+    os.makedirs(session_upload_dir, exist_ok=True)
+    file.save(os.path.join(session_upload_dir, file.filename))
 
-        try:
-            filename = file.filename
-            file_path = os.path.join(session_upload_dir, filename)
-            file.save(file_path)
-
-            extract_dir = os.path.join(session_upload_dir, "extracted")
-            if filename.endswith('.zip'):
-                with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                    zip_ref.extractall(extract_dir)
+    payload, status = analyze_upload(session_id, file.filename)
+    return jsonify(payload), status
+
+@app.route('/api/upload', methods=['POST'])
+def upload():
+    """只上传并解压文件，分析通过 /api/analyze/stream/<session_id> 以流的方式获取。"""
+    if 'file' not in request.files:
+        return jsonify({'error': '没有收到文件'}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': '未选择文件'}), 400
+
+    session_id = str(uuid.uuid4())
+    session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+    os.makedirs(session_upload_dir, exist_ok=True)
+    file.save(os.path.join(session_upload_dir, file.filename))
+
+    payload, status = store_upload(session_id, file.filename)
+    return jsonify(payload), status
+
+@app.route('/api/analyze/stream/<session_id>')
+def analyze_stream(session_id):
+    """以 Server-Sent Events 推送分析进度: 多个 progress 事件 (部分报告)，最后是 done 或 error 事件。"""
+    from flask import Response, stream_with_context
+    events = (format_sse(event, data) for event, data in analysis_events(session_id))
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def store_upload(session_id, filename):
+    """
+    检查已保存的上传文件，不进行分析。上传、传统模式的转换和异步前端共用此函数。
+    :return: (响应数据, HTTP 状态码)
+    """
+    import zipfile
+    from src.vfs import ArchiveLimitError
+    try:
+        if open_upload(session_id, filename) is None:
+            return {'error': '请上传 .zip 文件'}, 400
+    except ArchiveLimitError as e:
+        return {'error': str(e)}, 413
+    except zipfile.BadZipFile as e:
+        return {'error': f'无效的 zip 文件: {e}'}, 400
+    except Exception as e:
+        return {'error': str(e)}, 500
+    return {'status': 'success', 'session_id': session_id, 'filename': filename}, 200
+
+def get_upload_filename(session_id):
+    """返回会话中上传的压缩包文件名 (未找到时返回 None)。"""
+    session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+    try:
+        for f in os.listdir(session_upload_dir):
+            if f.endswith(".zip"):
+                return f
+    except OSError:
+        pass
+    return None
+
+def analysis_events(session_id):
+    """
+    逐步分析会话中已解压的上传文件，产出 (事件名, 数据)。
+    progress 事件的数据为部分报告 (已检测到的格式、可用的目标格式和当前计数)，
+    done 事件的数据与 /api/analyze 的响应相同。
+    """
+    manifest = get_session_manifest(session_id)
+    if manifest is None:
+        yield 'error', {'error': '会话已过期或不存在'}
+        return
+
+    from src.analyzer import PackageAnalyzer
+    filename = get_upload_filename(session_id)
+    analyzer = PackageAnalyzer(manifest.root, manifest)
+    try:
+        for report in analyzer.analyze_iter():
+            if report is analyzer.report:
+                yield 'done', {
+                    'status': 'success',
+                    'report': describe_report(report, filename),
+                    'session_id': session_id
+                }
             else:
-                return jsonify({'error': '请上传 .zip 文件'}), 400
+                yield 'progress', describe_report(report, filename)
+    except Exception as e:
+        yield 'error', {'error': str(e)}
 
-            # 运行分析
-            analyzer = PackageAnalyzer(extract_dir)
-            report = analyzer.analyze()
-            
-            # 根据检测到的格式确定可用的目标格式
-            # 逻辑：
-            # 1. 识别源格式 (可能包含多个)
-            # 2. 如果包含 ItemsAdder -> 允许转为 CraftEngine (除非已包含 CraftEngine)
-            # 3. 如果包含 CraftEngine -> 暂无转换 (或允许转为 ItemsAdder)
-            # 4. 如果包含 Nexo -> 暂无转换
-            
-            detected_formats = report["formats"]
-            available_targets = []
-            warnings = []
+def format_sse(event, data):
+    """将事件编码为 Server-Sent Events 格式。"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def open_upload(session_id, filename):
+    """
+    打开已保存到会话目录中的上传文件 (只读取压缩包的中央目录，不解压)。
+    :return: 会话的源目录 (压缩包内容呈现在该虚拟目录下)，上传的不是 .zip 文件时返回 None
+    """
+    if not filename.endswith('.zip'):
+        return None
+    # 不是有效的 zip 文件时抛出异常
+    return get_session_manifest(session_id).root
+
+def analyze_upload(session_id, filename):
+    """
+    解压并分析已保存到会话目录中的上传文件。
+    路由只负责接收文件，同步 (Flask) 和异步前端共用此函数。
+    :return: (响应数据, HTTP 状态码)
+    """
+    import zipfile
+    from src.vfs import ArchiveLimitError
+    try:
+        source_dir = open_upload(session_id, filename)
+        if source_dir is None:
+            return {'error': '请上传 .zip 文件'}, 400
+
+        # 运行分析
+        from src.analyzer import PackageAnalyzer
+        analyzer = PackageAnalyzer(source_dir, get_session_manifest(session_id))
+        report = describe_report(analyzer.analyze(), filename)
+        
+        return {
+            'status': 'success',
+            'report': report,
+            'session_id': session_id
+        }, 200
+
+    except ArchiveLimitError as e:
+        return {'error': str(e)}, 413
+    except zipfile.BadZipFile as e:
+        return {'error': f'无效的 zip 文件: {e}'}, 400
+    except Exception as e:
+        return {'error': str(e)}, 500
+
+def describe_report(report, filename):
+    """为分析报告补充可用的目标格式、警告和文件名 (部分报告同样适用)。"""
+    # 根据检测到的格式确定可用的目标格式
+    # 逻辑：
+    # 1. 识别源格式 (可能包含多个)
+    # 2. 如果包含 ItemsAdder -> 允许转为 CraftEngine (除非已包含 CraftEngine)
+    # 3. 如果包含 CraftEngine -> 暂无转换 (或允许转为 ItemsAdder)
+    # 4. 如果包含 Nexo -> 暂无转换
+    
+    detected_formats = report["formats"]
+    available_targets = []
+    warnings = []
+    
+    if "ItemsAdder" in detected_formats:
+        if "CraftEngine" in detected_formats:
+            warnings.append("检测到包中已包含 CraftEngine 配置。转换可能会覆盖或产生冲突，可以使用合并模式 (python -m src.merge) 将转换结果合并到已有的 resources 目录并检查冲突。")
+        available_targets.append("CraftEngine")
+        
+    if "CraftEngine" in detected_formats:
+         # 未来支持 CE -> IA
+         pass
+
+    # 纹理报告只在完整报告中出现 (部分报告没有)
+    textures = report.get("textures")
+    if textures and textures["oversized"]:
+        names = ", ".join(entry["texture"] for entry in textures["oversized"][:5])
+        more = f" 等 {len(textures['oversized'])} 个" if len(textures["oversized"]) > 5 else ""
+        warnings.append(
+            f"纹理 {names}{more} 超过 {textures['budget']['max_size']}x{textures['budget']['max_size']}，"
+            f"可能导致客户端卡顿和显存占用过高。"
+        )
+
+    report["source_formats"] = detected_formats # 改名以反映复数
+    report["available_targets"] = available_targets
+    report["warnings"] = warnings
+    report["filename"] = filename
+    return report
+
+def get_session_manifest(session_id):
+    """
+    返回会话源文件的只读文件系统，会话不存在时返回 None。
+    上传的压缩包不解压，而是通过压缩包文件系统 (ZipFS) 呈现在会话的 extracted 虚拟目录下，
+    分析、扫描、转换和迁移都直接从压缩包中流式读取，不占用解压空间。
+    压缩包按环境变量中的读取预算 (见 src.vfs.ArchiveLimits) 检查。
+    已解压到磁盘的会话 (旧版本创建) 使用目录实现 (FileManifest)，清单缓存在会话目录中。
+    """
+    from src.manifest import FileManifest
+    from src.vfs import ZipFS, ArchiveLimits
+
+    session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+    extract_dir = os.path.join(session_upload_dir, "extracted")
+    if os.path.isdir(extract_dir):
+        return FileManifest.cached(extract_dir, os.path.join(session_upload_dir, "manifest.json"))
+    filename = get_upload_filename(session_id)
+    if filename is None:
+        return None
+    # 超出读取预算 (解压后的大小、压缩比、文件数、路径深度) 时抛出 ArchiveLimitError
+    return ZipFS(os.path.join(session_upload_dir, filename), extract_dir, ArchiveLimits.from_env())
+
+def get_session_sources(session_upload_dir, manifest):
+    """
+    返回会话的源文件扫描结果 (含物品索引)。
+    源文件在转换过程中是只读的，扫描结果缓存在会话目录中，同一会话的后续转换和预览无需重新扫描。
+    :param manifest: 会话源文件的只读文件系统 (见 get_session_manifest)
+    """
+    from src.scanner import scan_ia_sources
+
+    cache_path = os.path.join(session_upload_dir, "sources.json")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    sources = scan_ia_sources(manifest.root, manifest)
+    # 先写入临时文件再替换，同时进行的转换不会读到写了一半的缓存
+    tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(sources, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+    return sources
+
+def map_resourcepack(overlay, ia_resourcepack_path, namespace, original_namespace, session_output_dir):
+    """
+    在路径重映射层上挂载资源包，使其呈现为标准的 assets/<namespace> 结构。
+    :return: 转换时使用的资源包根目录 (可能是虚拟路径)
+    """
+    # 特殊处理：如果资源包结构是非标准的（直接包含 models/textures），则重组为标准结构
+    # 这通常发生在 ia_resourcepack_path 指向了包含 models/textures 的根目录，但缺少 assets/<namespace> 包装的情况
+    if ia_resourcepack_path and overlay.exists(ia_resourcepack_path):
+        # 检查标准结构是否存在
+        assets_path = os.path.join(ia_resourcepack_path, "assets")
+        if not overlay.exists(assets_path):
+            # 检查是否有models 或 textures
+            has_models = overlay.exists(os.path.join(ia_resourcepack_path, "models"))
+            has_textures = overlay.exists(os.path.join(ia_resourcepack_path, "textures"))
             
-            if "ItemsAdder" in detected_formats:
-                if "CraftEngine" in detected_formats:
-                    warnings.append("检测到包中已包含 CraftEngine 配置。转换可能会覆盖或产生冲突。")
-                available_targets.append("CraftEngine")
+            if has_models or has_textures:
+                print(f"检测到非标准资源包结构，正在映射为 assets/{namespace}/...")
+                # 虚拟的资源包根目录 (不会在磁盘上创建)，位于本次转换的输出目录下以避免冲突
+                restructured_root = os.path.join(session_output_dir, "restructured_rp")
+                target_ns_dir = os.path.join(restructured_root, "assets", namespace)
                 
-            if "CraftEngine" in detected_formats:
-                 # 未来支持 CE -> IA
-                 pass
-
-            report["source_formats"] = detected_formats # 改名以反映复数
-            report["available_targets"] = available_targets
-            report["warnings"] = warnings
-            report["filename"] = filename
-            
-            return jsonify({
-                'status': 'success',
-                'report': report,
-                'session_id': session_id
-            })
-
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
+                # 映射文件夹 (不移动解压目录中的文件)
+                for folder_name in ["models", "textures", "sounds"]:
+                    src_folder = os.path.join(ia_resourcepack_path, folder_name)
+                    if overlay.exists(src_folder):
+                        overlay.mount(os.path.join(target_ns_dir, folder_name), src_folder)
+                
+                # 更新资源包路径指向新的标准结构根目录
+                ia_resourcepack_path = restructured_root
+        else:
+            # 标准结构：如果命名空间改变，尝试重命名文件夹以匹配新的命名空间
+            if namespace != original_namespace:
+                src_ns_path = os.path.join(assets_path, original_namespace)
+                dst_ns_path = os.path.join(assets_path, namespace)
+                if overlay.exists(src_ns_path) and not overlay.exists(dst_ns_path):
+                    print(f"Mapping resource pack namespace: {original_namespace} -> {namespace}")
+                    overlay.mount(dst_ns_path, src_ns_path)
+    return ia_resourcepack_path
 
 @app.route('/api/convert', methods=['POST'])
 def convert():
@@ -98,19 +297,10 @@ def convert():
     # 2. 接受 session_id (从 /api/analyze 获取) 进行转换
     
     session_id = request.form.get('session_id')
-    target_format = request.form.get('target_format', 'CraftEngine') # 默认 CE
-    
-    if session_id:
-        # 使用已存在的会话
-        session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
-        extract_dir = os.path.join(session_upload_dir, "extracted")
-        if not os.path.exists(extract_dir):
-            return jsonify({'error': '会话已过期或不存在'}), 400
-            
-        session_output_dir = os.path.join(app.config['OUTPUT_FOLDER'], session_id)
-        os.makedirs(session_output_dir, exist_ok=True)
-        
-    elif 'file' in request.files:
+    if not session_id:
+        if 'file' not in request.files:
+            return jsonify({'error': '无效的请求'}), 400
+
         # 传统模式
         file = request.files['file']
         if file.filename == '':
@@ -118,232 +308,705 @@ def convert():
             
         session_id = str(uuid.uuid4())
         session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
-        session_output_dir = os.path.join(app.config['OUTPUT_FOLDER'], session_id)
         os.makedirs(session_upload_dir, exist_ok=True)
-        os.makedirs(session_output_dir, exist_ok=True)
 
-        filename = file.filename
-        file_path = os.path.join(session_upload_dir, filename)
-        file.save(file_path)
+        file.save(os.path.join(session_upload_dir, file.filename))
+        payload, status = store_upload(session_id, file.filename)
+        if status != 200:
+            return jsonify(payload), status
 
-        extract_dir = os.path.join(session_upload_dir, "extracted")
-        if filename.endswith('.zip'):
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-        else:
-            return jsonify({'error': '请上传 .zip 文件'}), 400
+    job, retry_after = submit_conversion(session_id, request.form)
+    if job is None:
+        return queue_full_response(retry_after)
+    # 在调度器中排队并等待转换完成 (需要查看排队位置时使用 /api/jobs)
+    payload, status = job_result(job)
+    return jsonify(payload), status
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """
+    批量转换: 一次上传多个物品包 (重复的 file 字段)，输出合并为一个 CraftEngine resources/ 压缩包。
+    其他参数与 /api/convert 相同 (不支持 namespace)，见 run_batch。
+    """
+    files = [file for file in request.files.getlist('file') if file.filename]
+    if not files:
+        return jsonify({'error': '未选择文件'}), 400
+
+    # 每个物品包使用独立的会话
+    uploads = []
+    for file in files:
+        session_id = str(uuid.uuid4())
+        session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+        os.makedirs(session_upload_dir, exist_ok=True)
+        filename = os.path.basename(file.filename)
+        file.save(os.path.join(session_upload_dir, filename))
+        uploads.append((session_id, filename))
+    error = open_batch_uploads(uploads)
+    if error is not None:
+        payload, status = error
+        return jsonify(payload), status
+
+    job, retry_after = submit_batch([session_id for session_id, _ in uploads], request.form)
+    if job is None:
+        return queue_full_response(retry_after)
+    payload, status = job_result(job)
+    return jsonify(payload), status
+
+def open_batch_uploads(uploads):
+    """
+    检查批量上传的文件。同步 (Flask) 和异步前端共用此函数。
+    :param uploads: [(session_id, 文件名)]，每个文件一个会话
+    :return: 错误响应 (响应数据, HTTP 状态码)，全部有效时返回 None
+    """
+    from src.vfs import ArchiveLimitError
+    for session_id, filename in uploads:
+        try:
+            if open_upload(session_id, filename) is None:
+                return {'error': f'请上传 .zip 文件: {filename}'}, 400
+        except ArchiveLimitError as e:
+            return {'error': f'{filename}: {e}'}, 413
+        except Exception as e:
+            return {'error': f'{filename}: {e}'}, 400
+    return None
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """提交转换任务后立即返回任务 ID，通过 /api/jobs/<job_id> 查询排队位置和结果。"""
+    session_id = request.form.get('session_id')
+    if not session_id:
+        return jsonify({'error': '缺少 session_id'}), 400
+    job, retry_after = submit_conversion(session_id, request.form)
+    if job is None:
+        return queue_full_response(retry_after)
+    payload, _ = describe_job(job)
+    return jsonify(payload), 202
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    payload, status = describe_job(get_scheduler().get(job_id))
+    return jsonify(payload), status
+
+# 转换调度器: 限制同时运行的转换数，其余排队，每个转换在带资源限制的工作进程中执行 (首次使用时创建)
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+# 转换工作进程中用到的模块。工作进程由 fork 创建: 如果 fork 时另一个线程 (例如预览) 正在导入某个模块，
+# 子进程中该模块的导入锁永远不会被释放，子进程在导入时死锁。创建调度器时预先导入这些模块，
+# 工作进程中就不会再发生导入
+CONVERSION_MODULES = (
+    "yaml",
+    "concurrent.futures.process",
+    "src.scanner",
+    "src.namespaces",
+    "src.overlay",
+    "src.manifest",
+    "src.vfs",
+    "src.converters.ia_to_ce",
+    "src.migrators.ia_to_ce",
+    "src.migrators.references"
+)
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            import importlib
+            from src.scheduler import scheduler_from_env
+            for name in CONVERSION_MODULES:
+                importlib.import_module(name)
+            _scheduler = scheduler_from_env()
+        return _scheduler
+
+def submit_conversion(session_id, form):
+    """
+    将转换提交到调度器。同步 (Flask) 和异步前端共用此函数。
+    :return: (Job, None)，队列已满时返回 (None, 建议的重试等待秒数)
+    """
+    # 表单转换为普通字典，以便传递给工作进程
+    return submit_job(run_conversion, session_id, {key: form.get(key) for key in form.keys()})
+
+def submit_batch(session_ids, form):
+    """将批量转换作为一个任务提交到调度器。:return: 与 submit_conversion 相同"""
+    return submit_job(run_batch, str(uuid.uuid4()), session_ids, {key: form.get(key) for key in form.keys()})
+
+def submit_job(func, *args):
+    from src.scheduler import QueueFullError
+    try:
+        return get_scheduler().submit(func, *args), None
+    except QueueFullError as e:
+        return None, e.retry_after
+
+def queue_full_response(retry_after):
+    response = jsonify({'error': '服务器繁忙，转换队列已满，请稍后重试', 'retry_after': retry_after})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 503
+
+def job_result(job, timeout=None):
+    """等待任务完成。:return: (响应数据, HTTP 状态码)"""
+    try:
+        return job.future.result(timeout)
+    except Exception as e:
+        return {'error': str(e)}, 500
+
+def describe_job(job):
+    """
+    任务状态: 排队位置 (从 1 开始，运行中为 0)、预计等待秒数，完成后附带转换结果。
+    :return: (响应数据, HTTP 状态码)
+    """
+    if job is None:
+        return {'error': '任务不存在或已过期'}, 404
+    scheduler = get_scheduler()
+    payload = {
+        'job_id': job.job_id,
+        'status': job.status,
+        'position': scheduler.position(job),
+        'estimated_wait': scheduler.estimated_wait(job)
+    }
+    if job.future.done():
+        result, result_status = job_result(job)
+        payload['result'] = result
+        payload['result_status'] = result_status
+    return payload, 200
+
+def parse_namespace_map(value):
+    """
+    解析 namespace_map 参数: 逗号分隔的 "源命名空间=目标命名空间"，例如 "a=foo,b=bar"。
+    :return: {源命名空间: 目标命名空间}
+    :raises ValueError: 格式错误或目标命名空间包含非法字符
+    """
+    mapping = {}
+    for pair in value.split(','):
+        if not pair.strip():
+            continue
+        source, sep, target = (part.strip() for part in pair.partition('='))
+        if not sep or not source or not target:
+            raise ValueError(f'namespace_map 格式错误: {pair.strip()} (应为 源命名空间=目标命名空间)')
+        if not re.match(r'^[0-9a-z_.-]+$', target):
+            raise ValueError(f'命名空间包含非法字符: {target}。仅允许小写字母、数字、下划线、连字符和英文句号。')
+        mapping[source] = target
+    return mapping
+
+def convert_namespace_group(task):
+    """
+    转换一个命名空间分组的配置和资源 (多命名空间物品包的各个分组在进程池中并行调用)。
+    :param task: 分组任务，见 run_conversion
+    :return: (输出文件集合, {reference_report, model_report, texture_report})
+    """
+    from src.converters.ia_to_ce import IAConverter
+    from src.overlay import PathOverlay
+
+    namespace = task["namespace"]
+    converter = IAConverter(max_workers=task["max_workers"])
+    converter.prune_unreferenced = task["prune"]
+    converter.model_budget = task["model_budget"]
+    converter.texture_budget = task["texture_budget"]
+    converter.namespace_map = task["namespace_map"]
+    # 源文件 (配置和资源包) 是只读的，所有读取和结构调整都通过路径重映射层完成
+    overlay = PathOverlay(manifest=task["manifest"])
+    converter.fs = overlay
+
+    # 加载并合并分组内的所有物品配置 (流式模式下不合并，转换时逐个加载)
+    ia_data = {"items": {}, "equipments": {}, "armors_rendering": {}, "templates": {}, "info": task["info"]}
+    for config_path in ([] if task["streaming"] else task["items_configs"]):
+        data = converter.load_config(config_path)
+        if not data: continue
+
+        # 合并逻辑
+        for key in ("items", "equipments", "armors_rendering", "templates"):
+            if key in data:
+                ia_data.setdefault(key, {}).update(data[key])
+
+    # 如果找到则加载分类
+    merged_categories = {}
+    for cat_config in task["categories_configs"]:
+        data = converter.load_config(cat_config)
+        if data and "categories" in data:
+            merged_categories.update(data["categories"])
+    if merged_categories:
+        ia_data["categories"] = merged_categories
+
+    ia_resourcepack_path = map_resourcepack(
+        overlay, task["resourcepack_path"], namespace, task["original_namespace"], task["output_dir"]
+    )
+
+    ce_output_base = os.path.join(task["output_dir"], "CraftEngine", "resources", namespace)
+    ce_config_dir = os.path.join(ce_output_base, "configuration", "items", namespace)
+    ce_res_dir = os.path.join(ce_output_base, "resourcepack")
+
+    # 如果找到 resourcepack 则设置资源路径
+    if ia_resourcepack_path:
+        converter.set_resource_paths(ia_resourcepack_path, ce_res_dir, fs=overlay)
+
+    if task["streaming"]:
+        converter.convert_stream(
+            task["items_configs"],
+            ce_config_dir,
+            source_root=task["scan_root"],
+            namespace=namespace,
+            categories_data=ia_data.get("categories"),
+            chunk_size=task["chunk_size"]
+        )
     else:
-        return jsonify({'error': '无效的请求'}), 400
+        converter.convert(ia_data, namespace=namespace)
+        converter.save_config(ce_config_dir)
+
+    return converter.output_files, {
+        'reference_report': converter.reference_report,
+        'model_report': converter.model_report,
+        'texture_report': converter.texture_report
+    }
+
+def parse_conversion_options(form):
+    """
+    解析转换参数 (/api/convert 与 /api/batch 共用)。
+    :return: {parallel, prune, streaming, chunk_size, model_budget, texture_budget, base_manifest}
+    :raises ValueError: 参数不是有效的整数
+    """
+    options = {
+        # 并行模式: 将物品分配到多个进程转换 (物品较少时自动回退为串行)
+        'parallel': form.get('parallel', '').lower() in ('1', 'true', 'on'),
+        # 精简模式: 排除未被任何物品、装备或模型引用的纹理和模型
+        'prune': form.get('prune', '').lower() in ('1', 'true', 'on'),
+        # 流式模式: 逐个源文件转换并写入分片文件，适用于超大物品包
+        'streaming': form.get('streaming', '').lower() in ('1', 'true', 'on')
+    }
+    try:
+        options['chunk_size'] = int(form.get('chunk_size') or 0) or None
+    except ValueError:
+        raise ValueError('chunk_size 必须是整数')
+    # 模型复杂度预算 (未提供的项使用默认值，0 表示不检查该项)
+    options['model_budget'] = {}
+    for field, key in (('max_model_elements', 'elements'), ('max_model_faces', 'faces'), ('max_model_size', 'size')):
+        if form.get(field):
+            try:
+                options['model_budget'][key] = int(form.get(field))
+            except ValueError:
+                raise ValueError(f'{field} 必须是整数')
+    # 纹理预算: 单帧边长上限 (像素)
+    options['texture_budget'] = {}
+    if form.get('max_texture_size'):
+        try:
+            options['texture_budget']['max_size'] = int(form.get('max_texture_size'))
+        except ValueError:
+            raise ValueError('max_texture_size 必须是整数')
+    # 增量模式: 上一次转换的输出清单，只打包与之相比发生变化的文件
+    options['base_manifest'] = None
+    if form.get('base_manifest'):
+        from src.manifest import parse_output_manifest
+        try:
+            options['base_manifest'] = parse_output_manifest(json.loads(form.get('base_manifest')))
+        except ValueError as e:
+            raise ValueError(f'base_manifest 无效: {e}')
+    return options
+
+def plan_conversion(session_upload_dir, manifest, options, output_dir, namespace_mapping=None, user_namespace=None):
+    """
+    扫描会话的源文件，按配置文件自身的 info.namespace 分组，为每个命名空间生成一个转换任务。
+    :param namespace_mapping: {源命名空间: 目标命名空间}
+    :param user_namespace: 用户指定的目标命名空间 (只能用于单命名空间物品包)
+    :return: (转换任务列表, 警告列表)
+    :raises ValueError: 没有物品配置或命名空间参数无效
+    """
+    from src.scanner import group_by_namespace
+    from src.namespaces import NamespaceMap
+
+    # 3. 定位配置和资源 (ItemsAdder -> CraftEngine 逻辑)
+    sources = get_session_sources(session_upload_dir, manifest)
+    if not sources["items_configs"]:
+        raise ValueError('未能找到包含物品定义的配置文件 (items/equipments)')
+
+    groups = group_by_namespace(sources, manifest.exists)
+    if user_namespace and len(groups) > 1:
+        raise ValueError(f'物品包包含多个命名空间 ({", ".join(groups)})，不能指定单一命名空间，请使用 namespace_map')
+
+    # 源命名空间 -> 目标命名空间 (CraftEngine 输出结构: resources/<namespace>/...)
+    namespace_mapping = namespace_mapping or {}
+    targets = {ns: user_namespace or namespace_mapping.get(ns, ns) for ns in groups}
+    if len(set(targets.values())) < len(targets):
+        raise ValueError('多个命名空间不能映射到同一个目标命名空间')
+
+    multi_namespace = len(groups) > 1
+    prune = options['prune']
+    warnings = []
+    if multi_namespace and prune:
+        # 各分组独立迁移，无法得知其他分组对本命名空间资源的引用
+        prune = False
+        warnings.append('多命名空间物品包不支持精简模式，已迁移全部资源')
+    # 所有分组共用同一张映射表改写跨命名空间引用 (单命名空间时沿用原有规则)
+    namespace_map = NamespaceMap(targets) if multi_namespace else None
+
+    tasks = [{
+        "namespace": targets[ns],
+        "original_namespace": ns,
+        "info": group["info"],
+        "items_configs": group["items_configs"],
+        "categories_configs": group["categories_configs"],
+        "resourcepack_path": group["resourcepack_path"],
+        "scan_root": sources["scan_root"],
+        "manifest": manifest,
+        "output_dir": output_dir,
+        "namespace_map": namespace_map,
+        # 多个分组已经并行转换，分组内部不再按物品并行
+        "max_workers": os.cpu_count() if options['parallel'] and not multi_namespace else None,
+        "prune": prune,
+        "streaming": options['streaming'],
+        "chunk_size": options['chunk_size'],
+        "model_budget": options['model_budget'],
+        "texture_budget": options['texture_budget']
+    } for ns, group in groups.items()]
+    return tasks, warnings
+
+def run_conversion_tasks(tasks, executor=None):
+    """
+    执行转换任务。只有一个任务时在当前进程中执行，否则在进程池中并行执行。
+    :param executor: 共享的进程池 (批量转换)，默认为本次调用创建进程池
+    :return: 各任务的 (输出文件集合, 报告)，顺序与 tasks 相同
+    """
+    if executor is not None:
+        return list(executor.map(convert_namespace_group, tasks))
+    if len(tasks) == 1:
+        return [convert_namespace_group(tasks[0])]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as executor:
+        return list(executor.map(convert_namespace_group, tasks))
+
+def archive_filename(name, target_format):
+    """输出压缩包的文件名 (移除文件名中的非法字符)。"""
+    return re.sub(r'[\\/*?:"<>|]', "", f"{name} [{target_format} by MCC].zip")
+
+def package_output(output_dir, name, target_format, output_files, url_prefix, base_manifest=None):
+    """
+    将输出文件写入压缩包，并保存输出清单 (每个文件的 SHA-1)。
+    指定了上一次转换的输出清单时，另外生成只包含新增和变化文件的增量压缩包以及删除列表。
+    :param url_prefix: 下载地址前缀 (/api/download/<会话>/<转换 ID>)
+    :return: 响应数据中的 download_url、manifest_url 和 delta
+    """
+    from src.manifest import write_archive, save_output_manifest, diff_output_manifests
+
+    output_filename = archive_filename(name, target_format)
+    hashes = write_archive(os.path.join(output_dir, output_filename), output_dir, output_files)
+    manifest_filename = f"{output_filename[:-4]}.manifest.json"
+    save_output_manifest(os.path.join(output_dir, manifest_filename), hashes)
+    payload = {
+        'download_url': f'{url_prefix}/{output_filename}',
+        'manifest_url': f'{url_prefix}/{manifest_filename}'
+    }
+    if base_manifest is not None:
+        added, changed, deleted = diff_output_manifests(base_manifest, hashes)
+        delta_filename = archive_filename(f"{name} delta", target_format)
+        write_archive(
+            os.path.join(output_dir, delta_filename), output_dir,
+            [os.path.join(output_dir, *path.split('/')) for path in added + changed]
+        )
+        payload['delta'] = {
+            'download_url': f'{url_prefix}/{delta_filename}',
+            'added': added,
+            'changed': changed,
+            'deleted': deleted,
+            'unchanged': len(hashes) - len(added) - len(changed)
+        }
+    return payload
+
+def run_conversion(session_id, form):
+    """
+    转换会话中已上传的物品包。同步 (Flask) 和异步前端共用此函数。
+    :param form: 表单参数 (target_format、namespace、namespace_map、parallel、prune、streaming、chunk_size、
+                 max_model_elements、max_model_faces、max_model_size、max_texture_size、base_manifest)
+    :return: (响应数据, HTTP 状态码)
+    """
+    target_format = form.get('target_format', 'CraftEngine') # 默认 CE
+    try:
+        options = parse_conversion_options(form)
+        namespace_mapping = parse_namespace_map(form.get('namespace_map', ''))
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    # 检查用户是否指定了命名空间
+    user_namespace = form.get('namespace')
+    # 验证命名空间规则: 0-9, a-z, _, -, .
+    if user_namespace and not re.match(r'^[0-9a-z_.-]+$', user_namespace):
+        return {'error': '命名空间包含非法字符。仅允许小写字母、数字、下划线、连字符和英文句号。'}, 400
+    
+    # 使用已存在的会话
+    session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+    manifest = get_session_manifest(session_id)
+    if manifest is None:
+        return {'error': '会话已过期或不存在'}, 400
+
+    # 每次转换使用独立的输出目录，同一会话可以多次 (或同时) 以不同参数转换
+    conversion_id = str(uuid.uuid4())
+    session_output_dir = os.path.join(app.config['OUTPUT_FOLDER'], session_id, conversion_id)
+    os.makedirs(session_output_dir, exist_ok=True)
 
     try:
         if target_format == "CraftEngine":
-            # 3. 定位配置和资源 (ItemsAdder -> CraftEngine 逻辑)
-            # 改进逻辑: 扫描所有 YAML 文件并根据内容进行分类
-            ia_items_configs = []
-            ia_categories_configs = []
-            ia_resourcepack_path = None
-
-            # 0. 确定扫描根目录
-            scan_root = extract_dir
-            found_ia_dir = False
-            for root, dirs, files in os.walk(extract_dir):
-                for d in dirs:
-                    if d.lower() == "itemsadder":
-                        scan_root = os.path.join(root, d)
-                        found_ia_dir = True
-                        break
-                if found_ia_dir:
-                    break
-            
-            if found_ia_dir:
-                 print(f"Detected ItemsAdder root at: {scan_root}")
-
-            # 第一遍扫描：查找配置文件和标准资源包结构
-            for root, dirs, files in os.walk(scan_root):
-                # --- 资源包检测 ---
-                # 优先级 1: 显式的 "resourcepack" 目录
-                if "resourcepack" in dirs and ia_resourcepack_path is None:
-                    ia_resourcepack_path = os.path.join(root, "resourcepack")
-                
-                # 优先级 2: 直接包含 assets 的目录
-                if "assets" in dirs and ia_resourcepack_path is None:
-                    ia_resourcepack_path = root
-
-                # 优先级 3: 直接包含 models 和 textures 的目录 (非标准结构)
-                if "models" in dirs and "textures" in dirs and ia_resourcepack_path is None:
-                    ia_resourcepack_path = root
-
-                # --- 配置文件检测 ---
-                for f in files:
-                    if f.endswith(".yml") or f.endswith(".yaml"):
-                        full_path = os.path.join(root, f)
-                        try:
-                            with open(full_path, 'r', encoding='utf-8') as yml_file:
-                                data = yaml.safe_load(yml_file)
-                                if not data:
-                                    continue
-                                
-                                # 检查关键签名
-                                if "items" in data or "equipments" in data or "armors_rendering" in data:
-                                    ia_items_configs.append(full_path)
-                                elif "categories" in data:
-                                    ia_categories_configs.append(full_path)
-                        except Exception:
-                            continue
-
-            # 如果仍未找到资源包，尝试寻找 textures/models 的父级 (处理非标准结构)
-            if ia_resourcepack_path is None:
-                # 如果有配置文件，默认为提取根目录
-                if ia_items_configs:
-                    ia_resourcepack_path = extract_dir
-
-            if not ia_items_configs:
-                 return jsonify({'error': '未能找到包含物品定义的配置文件 (items/equipments)'}), 400
+            try:
+                tasks, warnings = plan_conversion(
+                    session_upload_dir, manifest, options, session_output_dir, namespace_mapping, user_namespace
+                )
+            except ValueError as e:
+                return {'error': str(e)}, 400
 
             # 4. 运行转换
-            converter = IAConverter()
-            
-            # 加载并合并所有物品配置
-            merged_items_data = {"items": {}, "equipments": {}, "armors_rendering": {}, "templates": {}, "info": {}}
-            
-            for config_path in ia_items_configs:
-                data = converter.load_config(config_path)
-                if not data: continue
-                
-                # 合并逻辑
-                if "info" in data and not merged_items_data["info"]:
-                    merged_items_data["info"] = data["info"] # 使用找到的第一个 info
-                
-                if "items" in data:
-                    merged_items_data.setdefault("items", {}).update(data["items"])
-                    
-                if "equipments" in data:
-                    merged_items_data.setdefault("equipments", {}).update(data["equipments"])
-                    
-                if "armors_rendering" in data:
-                    merged_items_data.setdefault("armors_rendering", {}).update(data["armors_rendering"])
-                    
-                if "templates" in data:
-                    merged_items_data.setdefault("templates", {}).update(data["templates"])
-
-            ia_data = merged_items_data
-            
-            # 如果找到则加载分类
-            if ia_categories_configs:
-                merged_categories = {}
-                for cat_config in ia_categories_configs:
-                    data = converter.load_config(cat_config)
-                    if data and "categories" in data:
-                        merged_categories.update(data["categories"])
-                
-                if merged_categories:
-                    ia_data["categories"] = merged_categories
-
-            # 准备输出路径
-            # CraftEngine 输出结构: resources/<namespace>/...
-            # 使用配置中的命名空间或默认值
-            original_namespace = ia_data.get("info", {}).get("namespace", "converted")
-            namespace = original_namespace
-            
-            # 检查用户是否指定了命名空间
-            user_namespace = request.form.get('namespace')
-            if user_namespace:
-                # 验证命名空间规则: 0-9, a-z, _, -, .
-                if not re.match(r'^[0-9a-z_.-]+$', user_namespace):
-                    return jsonify({'error': '命名空间包含非法字符。仅允许小写字母、数字、下划线、连字符和英文句号。'}), 400
-                namespace = user_namespace
-
-            # 特殊处理：如果资源包结构是非标准的（直接包含 models/textures），则重组为标准结构
-            # 这通常发生在 ia_resourcepack_path 指向了包含 models/textures 的根目录，但缺少 assets/<namespace> 包装的情况
-            if ia_resourcepack_path and os.path.exists(ia_resourcepack_path):
-                # 检查标准结构是否存在
-                assets_path = os.path.join(ia_resourcepack_path, "assets")
-                if not os.path.exists(assets_path):
-                    # 检查是否有models 或 textures
-                    has_models = os.path.exists(os.path.join(ia_resourcepack_path, "models"))
-                    has_textures = os.path.exists(os.path.join(ia_resourcepack_path, "textures"))
-                    
-                    if has_models or has_textures:
-                        print(f"检测到非标准资源包结构，正在重组为 assets/{namespace}/...")
-                        # 创建一个新的临时目录作为资源包根目录，以避免污染原始提取目录或处理路径冲突
-                        restructured_root = os.path.join(session_upload_dir, "restructured_rp")
-                        target_ns_dir = os.path.join(restructured_root, "assets", namespace)
-                        os.makedirs(target_ns_dir, exist_ok=True)
-                        
-                        # 移动文件夹
-                        for folder_name in ["models", "textures", "sounds"]:
-                            src_folder = os.path.join(ia_resourcepack_path, folder_name)
-                            if os.path.exists(src_folder):
-                                dst_folder = os.path.join(target_ns_dir, folder_name)
-                                # 移动文件夹
-                                shutil.move(src_folder, dst_folder)
-                        
-                        # 更新资源包路径指向新的标准结构根目录
-                        ia_resourcepack_path = restructured_root
-                else:
-                    # 标准结构：如果命名空间改变，尝试重命名文件夹以匹配新的命名空间
-                    if namespace != original_namespace:
-                        src_ns_path = os.path.join(assets_path, original_namespace)
-                        dst_ns_path = os.path.join(assets_path, namespace)
-                        if os.path.exists(src_ns_path) and not os.path.exists(dst_ns_path):
-                            try:
-                                print(f"Renaming resource pack namespace: {original_namespace} -> {namespace}")
-                                shutil.move(src_ns_path, dst_ns_path)
-                            except Exception as e:
-                                print(f"Warning: Failed to rename namespace folder: {e}")
-            
-            ce_output_base = os.path.join(session_output_dir, "CraftEngine", "resources", namespace)
-            ce_config_dir = os.path.join(ce_output_base, "configuration", "items", namespace)
-            ce_res_dir = os.path.join(ce_output_base, "resourcepack")
-            
-            # 如果找到 resourcepack 则设置资源路径
-            if ia_resourcepack_path:
-                converter.set_resource_paths(ia_resourcepack_path, ce_res_dir)
-
-            converter.convert(ia_data, namespace=namespace)
-            
-            converter.save_config(ce_config_dir)
+            results = run_conversion_tasks(tasks)
 
             # 5. 压缩结果
             # 获取原始文件名 
-            original_filename = "converted"
-            try:
-                for f in os.listdir(session_upload_dir):
-                    if f.endswith(".zip"):
-                        original_filename = f[:-4] # 移除 .zip
-                        break
-            except:
-                pass
-
-            output_filename = f"{original_filename} [{target_format} by MCC].zip"
-            # 简单的文件名清理，防止非法字符
-            output_filename = re.sub(r'[\\/*?:"<>|]', "", output_filename)
-            
-            output_zip_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
+            upload_filename = get_upload_filename(session_id)
+            original_filename = upload_filename[:-4] if upload_filename else "converted" # 移除 .zip
             # 我们希望压缩包解压后直接是 resources 文件夹，或者 CraftEngine 文件夹
 
-            shutil.make_archive(output_zip_path[:-4], 'zip', session_output_dir, "CraftEngine")
+            output_files = set()
+            for files, _ in results:
+                output_files.update(files)
+            outputs = package_output(
+                session_output_dir, original_filename, target_format, output_files,
+                f'/api/download/{session_id}/{conversion_id}', options['base_manifest']
+            )
 
             # 清理会话文件 
             # shutil.rmtree(session_upload_dir)
             # shutil.rmtree(session_output_dir)
 
-            return jsonify({
+            payload = {
                 'status': 'success',
-                'download_url': f'/api/download/{output_filename}'
+                **outputs,
+                'reference_report': None,
+                'model_report': None,
+                'texture_report': None
+            }
+            if len(tasks) > 1:
+                # 各命名空间的报告分别返回
+                payload['namespaces'] = {task["namespace"]: reports for task, (_, reports) in zip(tasks, results)}
+                if warnings:
+                    payload['warnings'] = warnings
+            else:
+                payload.update(results[0][1])
+            return payload, 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {'error': str(e)}, 500
+
+    return {'error': f'不支持的目标格式: {target_format}'}, 400
+
+def run_batch(batch_id, session_ids, form):
+    """
+    批量转换多个物品包，输出合并为一个 CraftEngine resources/ 压缩包。同步 (Flask) 和异步前端共用此函数。
+    所有物品包共用一个进程池: 先并行扫描，再根据扫描结果建立命名空间索引 (目标命名空间 -> 使用它的物品包)，
+    在写入任何文件之前检查冲突；没有冲突时在同一个进程池中并行转换所有物品包的所有命名空间分组。
+    :param session_ids: 各物品包的会话 ID
+    :param form: 表单参数 (与 /api/convert 相同，不支持 namespace)。
+                 namespace_map 的源命名空间可以写为 <文件名>:<命名空间>，只作用于该物品包
+    :return: (响应数据, HTTP 状态码)，命名空间冲突时返回 409 和 collisions
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    target_format = form.get('target_format', 'CraftEngine') # 默认 CE
+    if target_format != "CraftEngine":
+        return {'error': f'不支持的目标格式: {target_format}'}, 400
+    if form.get('namespace'):
+        return {'error': '批量转换不能指定单一命名空间，请使用 namespace_map'}, 400
+    try:
+        options = parse_conversion_options(form)
+        namespace_mapping = parse_namespace_map(form.get('namespace_map', ''))
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    packs = [] # (session_id, 文件名, 会话目录, 文件系统)
+    for session_id in session_ids:
+        manifest = get_session_manifest(session_id)
+        if manifest is None:
+            return {'error': f'会话已过期或不存在: {session_id}'}, 400
+        session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+        packs.append((session_id, get_upload_filename(session_id), session_upload_dir, manifest))
+
+    conversion_id = str(uuid.uuid4())
+    output_dir = os.path.join(app.config['OUTPUT_FOLDER'], batch_id, conversion_id)
+    os.makedirs(output_dir, exist_ok=True)
+
+    try:
+        with ProcessPoolExecutor(max_workers=min(len(packs), os.cpu_count() or 1)) as executor:
+            # 1. 并行扫描所有物品包 (结果缓存在各会话目录中，生成转换任务时直接读取)
+            list(executor.map(get_session_sources, [pack[2] for pack in packs], [pack[3] for pack in packs]))
+
+            # 2. 生成转换任务并建立命名空间索引
+            plans = []
+            index = {} # 目标命名空间 -> [{"pack", "namespace"}]
+            for session_id, filename, session_upload_dir, manifest in packs:
+                # <文件名>:<命名空间> 优先于只写命名空间的映射
+                prefix = f"{filename}:"
+                pack_mapping = {source: target for source, target in namespace_mapping.items() if ':' not in source}
+                pack_mapping.update({
+                    source[len(prefix):]: target
+                    for source, target in namespace_mapping.items() if source.startswith(prefix)
+                })
+                try:
+                    tasks, warnings = plan_conversion(session_upload_dir, manifest, options, output_dir, pack_mapping)
+                except ValueError as e:
+                    return {'error': f'{filename}: {e}'}, 400
+                for task in tasks:
+                    # 所有分组已经在共享的进程池中并行转换
+                    task["max_workers"] = None
+                    index.setdefault(task["namespace"], []).append({"pack": filename, "namespace": task["original_namespace"]})
+                plans.append((session_id, filename, tasks, warnings))
+
+            collisions = {namespace: owners for namespace, owners in index.items() if len(owners) > 1}
+            if collisions:
+                return {
+                    'error': '多个物品包使用了相同的命名空间，请使用 namespace_map 重命名 (例如 pack.zip:demo=demo2)',
+                    'collisions': collisions
+                }, 409
+
+            # 3. 并行转换所有分组
+            all_tasks = [task for _, _, tasks, _ in plans for task in tasks]
+            results = iter(run_conversion_tasks(all_tasks, executor))
+
+        output_files = set()
+        pack_reports = []
+        for session_id, filename, tasks, warnings in plans:
+            namespaces = {}
+            for task in tasks:
+                files, reports = next(results)
+                output_files.update(files)
+                namespaces[task["namespace"]] = reports
+            pack_reports.append({
+                'filename': filename,
+                'session_id': session_id,
+                'namespaces': namespaces,
+                'warnings': warnings
             })
 
+        outputs = package_output(
+            output_dir, "batch", target_format, output_files,
+            f'/api/download/{batch_id}/{conversion_id}', options['base_manifest']
+        )
+        return {'status': 'success', **outputs, 'packs': pack_reports}, 200
+
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        return {'error': str(e)}, 500
+
+@app.route('/api/preview', methods=['POST'])
+def preview():
+    """
+    单物品预览：只转换指定的物品，并只迁移它们引用的模型和纹理。
+    返回生成的 YAML 片段和一个只包含这些物品的小型资源包，无需转换整个物品包。
+    参数: session_id (来自 /api/analyze)、items (物品 ID，可用逗号分隔或重复传入)、namespace (可选)
+    """
+    item_ids = parse_item_ids(request.form.getlist('items'))
+    payload, status = run_preview(request.form.get('session_id'), item_ids, request.form.get('namespace'))
+    return jsonify(payload), status
+
+def parse_item_ids(values):
+    """解析 items 参数 (可用逗号分隔或重复传入，允许带命名空间)，返回去重后的物品 ID 列表。"""
+    item_ids = []
+    for value in values:
+        for item_id in value.split(','):
+            item_id = item_id.strip().split(':')[-1]
+            if item_id and item_id not in item_ids:
+                item_ids.append(item_id)
+    return item_ids
 
-@app.route('/api/download/<filename>')
+def run_preview(session_id, item_ids, user_namespace=None):
+    """
+    转换会话中的指定物品 (见 /api/preview)。同步 (Flask) 和异步前端共用此函数。
+    :return: (响应数据, HTTP 状态码)
+    """
+    if not session_id:
+        return {'error': '缺少 session_id'}, 400
+    if not item_ids:
+        return {'error': '未指定要预览的物品'}, 400
+
+    session_upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+    manifest = get_session_manifest(session_id)
+    if manifest is None:
+        return {'error': '会话已过期或不存在'}, 400
+
+    try:
+        from src.converters.ia_to_ce import IAConverter
+        from src.overlay import PathOverlay
+        from src.manifest import write_archive
+
+        sources = get_session_sources(session_upload_dir, manifest)
+        item_index = sources.get("item_index", {})
+        missing = [item_id for item_id in item_ids if item_id not in item_index]
+        if missing:
+            return {'error': f'未找到物品: {", ".join(missing)}'}, 404
+
+        original_namespace = sources["info"].get("namespace", "converted")
+        namespace = user_namespace or original_namespace
+        if not re.match(r'^[0-9a-z_.-]+$', namespace):
+            return {'error': '命名空间包含非法字符。仅允许小写字母、数字、下划线、连字符和英文句号。'}, 400
+
+        preview_id = f"preview-{uuid.uuid4()}"
+        preview_output_dir = os.path.join(app.config['OUTPUT_FOLDER'], session_id, preview_id)
+        os.makedirs(preview_output_dir, exist_ok=True)
+
+        converter = IAConverter()
+        converter.closure_only = True
+        overlay = PathOverlay(manifest=manifest)
+        converter.fs = overlay
+
+        # 只加载定义了这些物品的配置文件 (装备定义同样取自这些文件)
+        preview_data = {"items": {}, "equipments": {}, "armors_rendering": {}, "info": sources["info"]}
+        for config_path in dict.fromkeys(item_index[item_id] for item_id in item_ids):
+            data = converter.load_config(config_path)
+            if not data: continue
+            for item_id in item_ids:
+                if item_index[item_id] == config_path and item_id in data.get("items", {}):
+                    preview_data["items"][item_id] = data["items"][item_id]
+            for key in ("equipments", "armors_rendering"):
+                if isinstance(data.get(key), dict):
+                    preview_data[key].update(data[key])
+
+        ia_resourcepack_path = map_resourcepack(overlay, sources["resourcepack_path"], namespace, original_namespace, preview_output_dir)
+
+        ce_output_base = os.path.join(preview_output_dir, "CraftEngine", "resources", namespace)
+        ce_config_dir = os.path.join(ce_output_base, "configuration", "items", namespace)
+        if ia_resourcepack_path:
+            converter.set_resource_paths(ia_resourcepack_path, os.path.join(ce_output_base, "resourcepack"), fs=overlay)
+
+        ce_config = converter.convert(preview_data, namespace=namespace)
+        # 只保留预览物品实际使用的装备，预览不需要分类
+        used_equipments = {
+            ce_item.get("settings", {}).get("equipment", {}).get("asset-id")
+            for ce_item in ce_config["items"].values()
+        }
+        ce_config["equipments"] = {k: v for k, v in ce_config["equipments"].items() if k in used_equipments}
+        ce_config["categories"] = {}
+
+        converter.save_config(ce_config_dir)
+
+        snippet = {key: ce_config[key] for key in ("templates", "items", "equipments") if ce_config[key]}
+        output_filename = f"preview [{', '.join(item_ids)}].zip"
+        output_filename = re.sub(r'[\\/*?:"<>|]', "", output_filename)
+        output_zip_path = os.path.join(preview_output_dir, output_filename)
+        write_archive(output_zip_path, preview_output_dir, converter.output_files)
+
+        return {
+            'status': 'success',
+            'items': list(ce_config["items"].keys()),
+            'yaml': converter._dump_yaml(snippet),
+            'download_url': f'/api/download/{session_id}/{preview_id}/{output_filename}',
+            'reference_report': converter.reference_report
+        }, 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {'error': str(e)}, 500
+
+@app.route('/api/download/<path:filename>')
 def download_file(filename):
-    return send_file(os.path.join(app.config['OUTPUT_FOLDER'], filename), as_attachment=True)
+    file_path = safe_join(app.config['OUTPUT_FOLDER'], filename)
+    if file_path is None or not os.path.isfile(file_path):
+        return jsonify({'error': '文件不存在'}), 404
+    return send_file(file_path, as_attachment=True)
 
-import webbrowser
-from threading import Timer, Lock
+from threading import Timer
 
 # ... existing imports ...
 
@@ -369,8 +1032,12 @@ def shutdown():
     func()
     return jsonify({'status': 'server shutting down...'})
 
+# 监听端口，可通过环境变量 MCC_PORT 修改 (例如启动耗时测试)
+PORT = int(os.environ.get("MCC_PORT", "5000"))
+
 def open_browser():
-    webbrowser.open_new('http://127.0.0.1:5000/')
+    import webbrowser
+    webbrowser.open_new(f'http://127.0.0.1:{PORT}/')
 
 # 心跳全局状态
 last_heartbeat = time.time()
@@ -394,9 +1061,14 @@ def check_heartbeat():
             os._exit(0)
 
 if __name__ == '__main__':
+    # PyInstaller 打包后，并行转换的子进程需要此调用
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     # 仅在非调试模式下打开浏览器 (重载会导致双重打开)
     # 但对于打包的应用，调试通常为 False 或不相关。
-    if not os.environ.get("WERKZEUG_RUN_MAIN"):
+    # 设置 MCC_NO_BROWSER=1 时以无界面方式运行: 不打开浏览器，也不启用心跳超时关闭
+    if not os.environ.get("WERKZEUG_RUN_MAIN") and not os.environ.get("MCC_NO_BROWSER"):
         Timer(1.5, open_browser).start()
         
         # 重置心跳计时器以避免在启动期间超时
@@ -407,4 +1079,4 @@ if __name__ == '__main__':
         monitor_thread = threading.Thread(target=check_heartbeat, daemon=True)
         monitor_thread.start()
         
-    app.run(debug=False, port=5000)
+    app.run(debug=False, port=PORT)
@@ -0,0 +1,280 @@
+"""
+异步服务前端 (aiohttp)，适用于多人同时使用的服务器部署。
+
+上传的请求体按块直接写入磁盘，下载直接从磁盘流式发送，慢速连接只占用事件循环中的一个协程，
+不会占用工作线程；分析和预览等 CPU 密集的工作交给线程池执行，
+转换由调度器排队并在带资源限制的工作进程中执行 (见 src/scheduler.py)。
+路由和转换逻辑与 web/app.py 相同，桌面版仍使用 web/app.py (Flask)。
+
+用法:
+    python web/async_app.py [--host 127.0.0.1] [--port 5000] [--workers 4]
+"""
+import os
+import sys
+import uuid
+import shutil
+import asyncio
+import functools
+import argparse
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+from multidict import MultiDict
+from werkzeug.utils import safe_join
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from web.app import (
+    app as flask_app, analyze_upload, store_upload, run_preview,
+    parse_item_ids, analysis_events, format_sse, get_scheduler, submit_conversion, job_result, describe_job,
+    open_batch_uploads, submit_batch
+)
+
+WEB_ROOT = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_CHUNK_SIZE = 256 * 1024
+EXECUTOR = web.AppKey("executor", ThreadPoolExecutor)
+
+class UploadTooLarge(Exception):
+    pass
+
+async def read_form(request, multiple=False, files=True):
+    """
+    读取表单。multipart 请求中的文件字段按块写入新的会话目录 (每个文件一个会话)，不会整体读入内存。
+    :param multiple: 为 True 时返回所有上传的文件 (批量转换)
+    :param files: 为 False 时不保存文件字段 (读取后丢弃，仍计入大小限制)，用于只需要表单字段的接口
+    :return: (表单字段, (session_id, 文件名) 或 None)；multiple 为 True 时第二项为 [(session_id, 文件名)]
+    """
+    fields = MultiDict()
+    uploads = []
+    if request.content_type != 'multipart/form-data':
+        return MultiDict(await request.post()), [] if multiple else None
+
+    max_size = flask_app.config['MAX_CONTENT_LENGTH']
+    received = 0
+    loop = asyncio.get_running_loop()
+    executor = request.app[EXECUTOR]
+    session_dirs = []
+
+    async def read_chunks(part):
+        nonlocal received
+        while True:
+            chunk = await part.read_chunk(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return
+            received += len(chunk)
+            if received > max_size:
+                raise UploadTooLarge()
+            yield chunk
+
+    try:
+        reader = await request.multipart()
+        async for part in reader:
+            if part.name == 'file' and part.filename:
+                if not files:
+                    async for _ in read_chunks(part):
+                        pass
+                    continue
+                session_id = str(uuid.uuid4())
+                session_upload_dir = os.path.join(flask_app.config['UPLOAD_FOLDER'], session_id)
+                session_dirs.append(session_upload_dir)
+                # 磁盘操作在线程池中执行，不阻塞事件循环
+                await loop.run_in_executor(executor, functools.partial(os.makedirs, session_upload_dir, exist_ok=True))
+                filename = os.path.basename(part.filename)
+                f = await loop.run_in_executor(executor, open, os.path.join(session_upload_dir, filename), 'wb')
+                try:
+                    async for chunk in read_chunks(part):
+                        await loop.run_in_executor(executor, f.write, chunk)
+                finally:
+                    await loop.run_in_executor(executor, f.close)
+                uploads.append((session_id, filename))
+            elif part.name:
+                fields.add(part.name, await part.text())
+    except BaseException:
+        # 文件过大、客户端断开或请求被取消时删除本次请求已写入的会话目录
+        for session_upload_dir in session_dirs:
+            shutil.rmtree(session_upload_dir, ignore_errors=True)
+        raise
+    if multiple:
+        return fields, uploads
+    # 只使用最后一个文件，其余文件的会话目录不会被引用
+    await discard_uploads(request, uploads[:-1])
+    return fields, uploads[-1] if uploads else None
+
+async def discard_uploads(request, uploads):
+    """在线程池中删除不再使用的上传文件的会话目录。"""
+    loop = asyncio.get_running_loop()
+    for session_id, _ in uploads:
+        session_upload_dir = os.path.join(flask_app.config['UPLOAD_FOLDER'], session_id)
+        await loop.run_in_executor(request.app[EXECUTOR], functools.partial(shutil.rmtree, session_upload_dir, ignore_errors=True))
+
+async def run_blocking(request, func, *args):
+    """在线程池中执行 CPU 密集的工作，并将 (响应数据, 状态码) 转换为 JSON 响应。"""
+    loop = asyncio.get_running_loop()
+    payload, status = await loop.run_in_executor(request.app[EXECUTOR], func, *args)
+    return web.json_response(payload, status=status)
+
+async def index(request):
+    return web.FileResponse(os.path.join(WEB_ROOT, 'templates', 'index.html'))
+
+async def analyze(request):
+    try:
+        _, upload = await read_form(request)
+    except UploadTooLarge:
+        return web.json_response({'error': '文件过大'}, status=413)
+    if upload is None:
+        return web.json_response({'error': '没有收到文件'}, status=400)
+    return await run_blocking(request, analyze_upload, *upload)
+
+async def upload(request):
+    try:
+        _, upload = await read_form(request)
+    except UploadTooLarge:
+        return web.json_response({'error': '文件过大'}, status=413)
+    if upload is None:
+        return web.json_response({'error': '没有收到文件'}, status=400)
+    return await run_blocking(request, store_upload, *upload)
+
+async def analyze_stream(request):
+    """以 Server-Sent Events 推送分析进度，每一步分析在线程池中执行。"""
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    await response.prepare(request)
+
+    loop = asyncio.get_running_loop()
+    events = analysis_events(request.match_info['session_id'])
+    while True:
+        item = await loop.run_in_executor(request.app[EXECUTOR], next, events, None)
+        if item is None:
+            break
+        await response.write(format_sse(*item).encode('utf-8'))
+    await response.write_eof()
+    return response
+
+async def convert(request):
+    try:
+        form, upload = await read_form(request)
+    except UploadTooLarge:
+        return web.json_response({'error': '文件过大'}, status=413)
+
+    session_id = form.get('session_id')
+    if session_id and upload is not None:
+        # 转换已有会话时不使用同时上传的文件
+        await discard_uploads(request, [upload])
+    elif not session_id:
+        # 传统模式: 直接上传文件并转换
+        if upload is None:
+            return web.json_response({'error': '无效的请求'}, status=400)
+        session_id, filename = upload
+        loop = asyncio.get_running_loop()
+        payload, status = await loop.run_in_executor(request.app[EXECUTOR], store_upload, session_id, filename)
+        if status != 200:
+            return web.json_response(payload, status=status)
+    job, retry_after = submit_conversion(session_id, form)
+    if job is None:
+        return queue_full_response(retry_after)
+    # 转换在调度器的工作进程中执行，这里只等待结果，不占用线程
+    await asyncio.wrap_future(job.future)
+    payload, status = job_result(job)
+    return web.json_response(payload, status=status)
+
+async def batch(request):
+    try:
+        form, uploads = await read_form(request, multiple=True)
+    except UploadTooLarge:
+        return web.json_response({'error': '文件过大'}, status=413)
+    if not uploads:
+        return web.json_response({'error': '未选择文件'}, status=400)
+    loop = asyncio.get_running_loop()
+    error = await loop.run_in_executor(request.app[EXECUTOR], open_batch_uploads, uploads)
+    if error is not None:
+        payload, status = error
+        return web.json_response(payload, status=status)
+    job, retry_after = submit_batch([session_id for session_id, _ in uploads], form)
+    if job is None:
+        return queue_full_response(retry_after)
+    await asyncio.wrap_future(job.future)
+    payload, status = job_result(job)
+    return web.json_response(payload, status=status)
+
+async def create_job(request):
+    try:
+        form, _ = await read_form(request, files=False)
+    except UploadTooLarge:
+        return web.json_response({'error': '文件过大'}, status=413)
+    session_id = form.get('session_id')
+    if not session_id:
+        return web.json_response({'error': '缺少 session_id'}, status=400)
+    job, retry_after = submit_conversion(session_id, form)
+    if job is None:
+        return queue_full_response(retry_after)
+    payload, _ = describe_job(job)
+    return web.json_response(payload, status=202)
+
+async def job_status(request):
+    payload, status = describe_job(get_scheduler().get(request.match_info['job_id']))
+    return web.json_response(payload, status=status)
+
+def queue_full_response(retry_after):
+    return web.json_response(
+        {'error': '服务器繁忙，转换队列已满，请稍后重试', 'retry_after': retry_after},
+        status=503, headers={'Retry-After': str(retry_after)}
+    )
+
+async def preview(request):
+    try:
+        form, _ = await read_form(request, files=False)
+    except UploadTooLarge:
+        return web.json_response({'error': '文件过大'}, status=413)
+    item_ids = parse_item_ids(form.getall('items', []))
+    return await run_blocking(request, run_preview, form.get('session_id'), item_ids, form.get('namespace'))
+
+async def download(request):
+    file_path = safe_join(flask_app.config['OUTPUT_FOLDER'], request.match_info['filename'])
+    if file_path is None or not os.path.isfile(file_path):
+        return web.json_response({'error': '文件不存在'}, status=404)
+    # FileResponse 从磁盘分块发送 (支持时使用 sendfile)，不会把文件读入内存
+    return web.FileResponse(file_path, headers={
+        'Content-Disposition': f"attachment; filename*=UTF-8''{quote(os.path.basename(file_path))}"
+    })
+
+async def heartbeat(request):
+    # 服务器部署不会因为心跳超时而关闭，保留此接口以兼容前端页面
+    return web.json_response({'status': 'alive'})
+
+def create_app(workers=None):
+    aio_app = web.Application()
+    aio_app[EXECUTOR] = ThreadPoolExecutor(max_workers=workers)
+    aio_app.router.add_get('/', index)
+    aio_app.router.add_static('/static', os.path.join(WEB_ROOT, 'static'))
+    aio_app.router.add_post('/api/analyze', analyze)
+    aio_app.router.add_post('/api/upload', upload)
+    aio_app.router.add_get('/api/analyze/stream/{session_id}', analyze_stream)
+    aio_app.router.add_post('/api/convert', convert)
+    aio_app.router.add_post('/api/batch', batch)
+    aio_app.router.add_post('/api/jobs', create_job)
+    aio_app.router.add_get('/api/jobs/{job_id}', job_status)
+    aio_app.router.add_post('/api/preview', preview)
+    aio_app.router.add_get('/api/download/{filename:.+}', download)
+    aio_app.router.add_post('/api/heartbeat', heartbeat)
+
+    async def shutdown_executor(aio_app):
+        aio_app[EXECUTOR].shutdown(wait=False)
+    aio_app.on_cleanup.append(shutdown_executor)
+    return aio_app
+
+def main():
+    parser = argparse.ArgumentParser(description="MCC Tool 异步服务前端")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCC_PORT", "5000")), help="监听端口")
+    parser.add_argument("--workers", type=int, default=None, help="执行分析和预览的线程数 (默认根据 CPU 数量)")
+    args = parser.parse_args()
+    web.run_app(create_app(args.workers), host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    # 并行转换的子进程需要此调用
+    import multiprocessing
+    multiprocessing.freeze_support()
+    main()
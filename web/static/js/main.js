@@ -47,6 +47,12 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function uploadFile(file) {
+        // 支持 Server-Sent Events 时先上传，再以流的方式获取分析结果
+        if (window.EventSource) {
+            uploadAndStream(file);
+            return;
+        }
+
         const formData = new FormData();
         formData.append('file', file);
 
@@ -82,6 +88,138 @@ document.addEventListener('DOMContentLoaded', () => {
         xhr.send(formData);
     }
 
+    function uploadAndStream(file) {
+        const formData = new FormData();
+        formData.append('file', file);
+
+        const xhr = new XMLHttpRequest();
+        xhr.open('POST', '/api/upload', true);
+
+        xhr.upload.onprogress = (e) => {
+            if (e.lengthComputable) {
+                const percentComplete = (e.loaded / e.total) * 80;
+                updateProgress(percentComplete, "正在上传...");
+            }
+        };
+
+        xhr.onload = function() {
+            let response = {};
+            try {
+                response = JSON.parse(xhr.responseText);
+            } catch(e) {}
+            if (xhr.status === 200) {
+                updateProgress(90, "正在分析...");
+                streamAnalysis(response.session_id);
+            } else {
+                showError(response.error || "发生未知错误。");
+            }
+        };
+
+        xhr.onerror = function() {
+            showError("发生网络错误。");
+        };
+
+        xhr.send(formData);
+    }
+
+    function streamAnalysis(sessionId) {
+        const source = new EventSource(`/api/analyze/stream/${sessionId}`);
+
+        // 部分报告: 第一次收到时显示报告，之后只更新格式和统计
+        source.addEventListener('progress', (e) => {
+            const report = JSON.parse(e.data);
+            if (document.getElementById('report-section')) {
+                updateAnalysisReport(report, false);
+            } else {
+                showAnalysisReport(report, sessionId);
+                updateAnalysisReport(report, false);
+            }
+        });
+
+        source.addEventListener('done', (e) => {
+            source.close();
+            const response = JSON.parse(e.data);
+            if (document.getElementById('report-section')) {
+                updateAnalysisReport(response.report, true);
+            } else {
+                showAnalysisReport(response.report, sessionId);
+            }
+        });
+
+        source.addEventListener('error', (e) => {
+            source.close();
+            let errorMsg = "分析失败。";
+            try {
+                errorMsg = JSON.parse(e.data).error || errorMsg;
+            } catch(err) {}
+            showError(errorMsg);
+        });
+    }
+
+    function updateAnalysisReport(report, done) {
+        document.getElementById('report-formats').innerHTML = formatSourceFormats(report);
+        document.getElementById('report-content-types').textContent = report.content_types.join(', ') || '无';
+        document.getElementById('report-checks').innerHTML = formatChecks(report);
+        document.getElementById('report-stats').innerHTML = formatStats(report);
+        document.getElementById('report-warnings').innerHTML = formatWarnings(report);
+
+        // 目标格式只会随着分析增加，用户已选择的值保持不变
+        const targetSelect = document.getElementById('target-format-select');
+        const current = Array.from(targetSelect.options).filter(o => !o.disabled).map(o => o.value);
+        if (report.available_targets.join() !== current.join()) {
+            const selected = targetSelect.value;
+            targetSelect.innerHTML = formatTargetOptions(report);
+            if (report.available_targets.includes(selected)) targetSelect.value = selected;
+        }
+        const noTargets = report.available_targets.length === 0;
+        targetSelect.disabled = noTargets;
+        document.getElementById('start-convert-btn').disabled = noTargets;
+
+        const stats = document.getElementById('report-stats');
+        stats.classList.toggle('pending', !done);
+    }
+
+    function formatTargetOptions(report) {
+        if (report.available_targets && report.available_targets.length > 0) {
+            return report.available_targets.map(t => `<option value="${t}">${t}</option>`).join('');
+        }
+        return '<option value="" disabled selected>无可用转换</option>';
+    }
+
+    function formatSourceFormats(report) {
+        return report.source_formats && report.source_formats.length > 0 
+            ? report.source_formats.map(f => `<span class="value source-format">${f}</span>`).join(' ')
+            : '<span class="value source-format">未知</span>';
+    }
+
+    function formatWarnings(report) {
+        if (report.warnings && report.warnings.length > 0) {
+            return `
+                <div class="warning-box">
+                    ${report.warnings.map(w => `<p>⚠️ ${w}</p>`).join('')}
+                </div>
+            `;
+        }
+        return '';
+    }
+
+    function formatChecks(report) {
+        return `
+            <li class="${report.completeness.items_config ? 'ok' : 'fail'}">物品配置</li>
+            <li class="${report.completeness.categories_config ? 'ok' : 'fail'}">分类配置</li>
+            <li class="${report.completeness.resource_files ? 'ok' : 'fail'}">资源文件</li>
+        `;
+    }
+
+    function formatStats(report) {
+        return `
+            <li>物品: ${report.details.item_count}</li>
+            <li>纹理: ${report.details.texture_count}</li>
+            <li>模型: ${report.details.model_count}</li>
+            ${report.textures ? `<li>纹理内存 (估算): ${(report.textures.memory_bytes / 1048576).toFixed(1)} MB</li>` : ''}
+        `;
+    }
+
     function startConversion(sessionId) {
         const formData = new FormData();
         formData.append('session_id', sessionId);
@@ -102,69 +240,65 @@ document.addEventListener('DOMContentLoaded', () => {
         const reportSection = document.getElementById('report-section');
         if(reportSection) reportSection.style.display = 'none';
 
-        const xhr = new XMLHttpRequest();
-        xhr.open('POST', '/api/convert', true);
-        
-        xhr.onload = function() {
-            if (xhr.status === 200) {
-                updateProgress(100, "转换完成");
-                const response = JSON.parse(xhr.responseText);
-                showResult(response.download_url);
-            } else {
-                let errorMsg = "转换失败。";
-                try {
-                    const response = JSON.parse(xhr.responseText);
-                    errorMsg = response.error || errorMsg;
-                } catch(e) {}
-                showError(errorMsg);
-            }
-        };
-        
-        let p = 0;
-        const interval = setInterval(() => {
-            if(xhr.readyState === 4) {
-                clearInterval(interval);
-                return;
-            }
-            if(p < 90) {
-                p += 5;
-                updateProgress(p, "正在转换...");
-            }
-        }, 200);
-        
-        xhr.send(formData);
+        // 提交转换任务，轮询任务状态 (排队位置) 直到完成
+        fetch('/api/jobs', { method: 'POST', body: formData })
+            .then(response => response.json().then(data => ({ status: response.status, data })))
+            .then(({ status, data }) => {
+                if (status === 503) {
+                    showError(`${data.error} (约 ${data.retry_after} 秒后)`);
+                } else if (status !== 202) {
+                    showError(data.error || "转换失败。");
+                } else {
+                    pollJob(data.job_id, 0);
+                }
+            })
+            .catch(() => showError("转换失败。"));
+    }
+
+    function pollJob(jobId, progress) {
+        fetch(`/api/jobs/${jobId}`)
+            .then(response => response.json().then(data => ({ status: response.status, data })))
+            .then(({ status, data }) => {
+                if (status !== 200) {
+                    showError(data.error || "转换失败。");
+                    return;
+                }
+                if (data.result) {
+                    if (data.result_status === 200) {
+                        updateProgress(100, "转换完成");
+                        showResult(data.result.download_url);
+                    } else {
+                        showError(data.result.error || "转换失败。");
+                    }
+                    return;
+                }
+                if (data.status === 'queued') {
+                    updateProgress(0, `排队中: 前面还有 ${data.position - 1} 个任务 (预计等待约 ${data.estimated_wait} 秒)`);
+                } else {
+                    progress = Math.min(progress + 5, 90);
+                    updateProgress(progress, "正在转换...");
+                }
+                setTimeout(() => pollJob(jobId, progress), 500);
+            })
+            .catch(() => showError("转换失败。"));
     }
 
     function showAnalysisReport(report, sessionId) {
         progressSection.style.display = 'none';
         
         // 生成目标格式选择器
-        let targetOptions = '';
-        if (report.available_targets && report.available_targets.length > 0) {
-            targetOptions = report.available_targets.map(t => `<option value="${t}">${t}</option>`).join('');
-        } else {
-            targetOptions = '<option value="" disabled selected>无可用转换</option>';
-        }
+        let targetOptions = formatTargetOptions(report);
 
         // 格式化源格式标签
-        let sourceFormatsHtml = report.source_formats && report.source_formats.length > 0 
-            ? report.source_formats.map(f => `<span class="value source-format">${f}</span>`).join(' ')
-            : '<span class="value source-format">未知</span>';
+        let sourceFormatsHtml = formatSourceFormats(report);
 
         // 生成警告信息
-        let warningHtml = '';
-        if (report.warnings && report.warnings.length > 0) {
-            warningHtml = `
-                <div class="warning-box">
-                    ${report.warnings.map(w => `<p>⚠️ ${w}</p>`).join('')}
-                </div>
-            `;
-        }
+        let warningHtml = formatWarnings(report);
 
         let reportHtml = `
             <div id="report-section" class="report-section">
                 <h3>📦 包内容分析</h3>
-                ${warningHtml}
+                <div id="report-warnings">${warningHtml}</div>
                 <div class="report-grid">
                     <div class="report-item" style="grid-column: span 2;">
                         <span class="label">当前文件:</span>
@@ -172,7 +306,7 @@ document.addEventListener('DOMContentLoaded', () => {
                     </div>
                     <div class="report-item">
                         <span class="label">检测到的格式:</span>
-                        <div class="format-list">${sourceFormatsHtml}</div>
+                        <div class="format-list" id="report-formats">${sourceFormatsHtml}</div>
                     </div>
                     <div class="report-item">
                         <span class="label">目标格式:</span>
@@ -186,23 +320,15 @@ document.addEventListener('DOMContentLoaded', () => {
                     </div>
                     <div class="report-item">
                         <span class="label">包含内容:</span>
-                        <span class="value">${report.content_types.join(', ') || '无'}</span>
+                        <span class="value" id="report-content-types">${report.content_types.join(', ') || '无'}</span>
                     </div>
                     <div class="report-item">
                         <span class="label">完整性检查:</span>
-                        <ul class="check-list">
-                            <li class="${report.completeness.items_config ? 'ok' : 'fail'}">物品配置</li>
-                            <li class="${report.completeness.categories_config ? 'ok' : 'fail'}">分类配置</li>
-                            <li class="${report.completeness.resource_files ? 'ok' : 'fail'}">资源文件</li>
-                        </ul>
+                        <ul class="check-list" id="report-checks">${formatChecks(report)}</ul>
                     </div>
                     <div class="report-item">
                         <span class="label">详细统计:</span>
-                        <ul class="stats-list">
-                            <li>物品: ${report.details.item_count}</li>
-                            <li>纹理: ${report.details.texture_count}</li>
-                            <li>模型: ${report.details.model_count}</li>
-                        </ul>
+                        <ul class="stats-list" id="report-stats">${formatStats(report)}</ul>
                     </div>
                 </div>
                 <div class="actions">